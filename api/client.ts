@@ -26,4 +26,26 @@ api.interceptors.response.use(
   }
 );
 
+// Cursor-paginated lists return one page in `data` and, when more rows
+// follow, the cursor for the next page in the X-Next-Cursor header
+export interface Page<T> {
+  items: T[];
+  nextCursor: string | null;
+}
+
+export const getPage = async <T>(
+  url: string,
+  params: Record<string, unknown> = {},
+  cursor: string | null = null
+): Promise<Page<T>> => {
+  const res = await api.get(url, {
+    params: cursor ? { ...params, cursor } : params,
+  });
+  const list = res.data?.data;
+  return {
+    items: Array.isArray(list) ? list : [],
+    nextCursor: res.headers["x-next-cursor"] ?? null,
+  };
+};
+
 export default api;
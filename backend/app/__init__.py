@@ -25,6 +25,10 @@ def create_app():
     # =====================
     app.config.from_object("app.config.Config")
 
+    # orjson-backed JSON for every response (stdlib fallback)
+    from app.utils.serialization import FastJSONProvider
+    app.json = FastJSONProvider(app)
+
     # Safety check (optional but good practice)
     if not app.config.get("JWT_SECRET_KEY"):
         raise RuntimeError("JWT_SECRET_KEY is not set in config.py")
@@ -35,7 +39,18 @@ def create_app():
     db.init_app(app)
     migrate.init_app(app, db)
     jwt.init_app(app)
-    CORS(app, supports_credentials=True)
+    # List routes page through these headers; the browser hides them otherwise
+    CORS(app, supports_credentials=True, expose_headers=["X-Next-Cursor", "X-Total-Count"])
+
+    # Pooled connections must not be shared across a fork (gunicorn
+    # --preload); children drop the parent's pool without closing its sockets
+    if hasattr(os, "register_at_fork"):
+        def dispose_engines_after_fork():
+            with app.app_context():
+                for engine in db.engines.values():
+                    engine.dispose(close=False)
+
+        os.register_at_fork(after_in_child=dispose_engines_after_fork)
 
     # =====================
     # Import models (IMPORTANT for migrations)
@@ -46,6 +61,10 @@ def create_app():
     from app.models.request_model import Request
     from app.models.pickup_model import Pickup
     from app.models.prediction_model import Prediction
+    from app.models.kpi_model import KpiCounter
+    from app.models.rollup_model import ImpactRollup
+    from app.models.forecast_model import ForecastModel
+    from app.models.outbox_model import OutboxJob
 
     # =====================
     # Register blueprints
@@ -55,12 +74,37 @@ def create_app():
     from app.routes.ngo_routes import ngo_bp
     from app.routes.admin_routes import admin_bp
     from app.routes.analytics_routes import analytics_bp
+    from app.commands import commands_bp
 
     app.register_blueprint(auth_bp)
     app.register_blueprint(donor_bp)
     app.register_blueprint(ngo_bp)
     app.register_blueprint(admin_bp)
     app.register_blueprint(analytics_bp)
+    app.register_blueprint(commands_bp)
+
+    # Bump HTTP cache version stamps whenever a transaction writes a table
+    from app.utils.http_cache import register_session_events
+    register_session_events()
+
+    # Stream events and cache invalidations must cross gunicorn workers
+    # and the scheduler process
+    if app.config.get("EVENT_BROKER") == "postgres":
+        from app.services import event_bus
+        from app.utils import http_cache
+        with app.app_context():
+            event_bus.set_broker(event_bus.PostgresBroker(db.engine))
+        http_cache.set_backend(http_cache.BrokerBackend(event_bus.get_broker()))
+
+    if app.config.get("EXPIRY_SCHEDULER_ENABLED"):
+        from app.services.expiry_service import start_background
+        start_background(app)
+
+    from app.services.outbox_service import check_config as check_outbox_config
+    check_outbox_config(app.config)
+    if app.config.get("OUTBOX_WORKER_ENABLED"):
+        from app.services.outbox_service import start_background as start_outbox_worker
+        start_outbox_worker(app)
 
     # =====================
     # Health check route (optional but useful)
@@ -0,0 +1,231 @@
+import click
+from flask import Blueprint
+
+from app import db
+from app.services import location_service
+
+# CLI commands are exposed as `flask <name>` via this blueprint
+commands_bp = Blueprint("commands", __name__, cli_group=None)
+
+
+@commands_bp.cli.command("geocode-backfill")
+@click.option("--batch-size", default=500, show_default=True)
+def geocode_backfill(batch_size):
+    """Geocode donations and users that have no stored coordinates."""
+    updated = location_service.backfill_coordinates(batch_size)
+    click.echo(f"Geocoded {updated} rows")
+
+
+@commands_bp.cli.command("quantity-backfill")
+@click.option("--batch-size", default=1000, show_default=True)
+@click.option("--reparse", is_flag=True, help="Recompute rows that already have a value.")
+def quantity_backfill(batch_size, reparse):
+    """Parse free-text donation quantities into quantity_kg."""
+    from app.services import quantity_service
+
+    updated = quantity_service.backfill_quantities(batch_size, reparse=reparse)
+    click.echo(f"Parsed {updated} quantities")
+
+
+@commands_bp.cli.command("allocate")
+@click.option("--dry-run", is_flag=True, help="Print the plan without claiming.")
+@click.option("--interval", default=0, show_default=True,
+              help="Seconds between commits; 0 runs a single pass.")
+@click.option("--poll", default=15, show_default=True,
+              help="Seconds between incremental syncs of new donations.")
+def allocate(dry_run, interval, poll):
+    """Assign pending donations to verified NGOs in one batch, within kg/day capacity."""
+    import time
+    from app.services.batch_allocation_service import allocator
+
+    plan = allocator.solve()
+    if dry_run:
+        for donation_id, ngo_id, score in plan:
+            click.echo(f"donation {donation_id} -> ngo user {ngo_id} ({score})")
+        return
+
+    if not interval:
+        click.echo(f"Allocated {allocator.commit()} donations")
+        return
+
+    while True:
+        deadline = time.monotonic() + interval
+        while time.monotonic() < deadline:
+            time.sleep(min(poll, max(deadline - time.monotonic(), 0)))
+            allocator.add_new()
+            db.session.remove()
+        click.echo(f"Allocated {allocator.commit()} donations")
+        allocator.solve()
+
+
+@commands_bp.cli.command("allocate-benchmark")
+@click.option("--donations", default=10000, show_default=True)
+@click.option("--ngos", default=1000, show_default=True)
+@click.option("--new", "new_donations", default=200, show_default=True,
+              help="Donations added incrementally after the full solve.")
+@click.option("--seed", default=0, show_default=True)
+def allocate_benchmark(donations, ngos, new_donations, seed):
+    """Time the batch allocator on a random city, fully and incrementally (no database)."""
+    import time
+    from datetime import datetime
+    import numpy as np
+    from app.services.batch_allocation_service import AssignmentSolver, BatchAllocator
+
+    rng = np.random.default_rng(seed)
+    now = datetime.utcnow()
+
+    # NGOs and donations spread over a ~30 km square; capacity in kg/day
+    allocator = BatchAllocator()
+    capacities = {}
+    for ngo_id in range(1, ngos + 1):
+        allocator._ngo_index.add(ngo_id, 22.45 + rng.random() * 0.27, 88.25 + rng.random() * 0.29)
+        allocator._ngo_performance[ngo_id] = float(rng.uniform(40, 100))
+        capacities[ngo_id] = float(rng.integers(20, 200))
+
+    total = donations + new_donations
+    rows = list(zip(
+        range(1, total + 1),
+        rng.integers(1, 13, total).tolist(),
+        [now] * total,
+        (22.45 + rng.random(total) * 0.27).tolist(),
+        (88.25 + rng.random(total) * 0.29).tolist(),
+        rng.uniform(0.5, 20, total).round(1).tolist()
+    ))
+
+    began = time.perf_counter()
+    candidates = list(allocator._candidates(rows, now))
+    candidates_s = time.perf_counter() - began
+    edges = sum(len(c) for _, c, _ in candidates)
+
+    solver = AssignmentSolver(capacities)
+    began = time.perf_counter()
+    for donation_id, options, kg in candidates[:donations]:
+        solver.insert(donation_id, options, size=kg)
+    solve_s = time.perf_counter() - began
+    assigned, weight = len(solver.assigned), solver.total_weight()
+
+    began = time.perf_counter()
+    for donation_id, options, kg in candidates[donations:]:
+        solver.insert(donation_id, options, size=kg)
+    incremental_s = time.perf_counter() - began
+
+    overfull = [n for n, load in solver.load.items() if load > capacities[n] + 1e-6]
+    click.echo(f"{donations} donations x {ngos} NGOs, {edges:,} candidate pairs")
+    click.echo(f"candidates  {candidates_s * 1000:8.0f} ms")
+    click.echo(f"full solve  {solve_s * 1000:8.0f} ms  "
+               f"({assigned} assigned, weight {weight / 10:,.1f})")
+    if new_donations:
+        click.echo(f"incremental {incremental_s * 1000 / new_donations:8.2f} ms per new donation "
+                   f"({len(solver.assigned) - assigned} more assigned)")
+    if overfull:
+        raise click.ClickException(f"{len(overfull)} NGOs over capacity")
+
+
+@commands_bp.cli.command("route-benchmark")
+@click.option("--stops", "-n", multiple=True, type=int, default=(50, 100, 200), show_default=True)
+@click.option("--runs", default=5, show_default=True)
+@click.option("--budget-ms", default=80, show_default=True)
+@click.option("--seed", default=0, show_default=True)
+def route_benchmark(stops, runs, budget_ms, seed):
+    """Time pickup route planning on random city-sized instances."""
+    import numpy as np
+    from app.services import route_service
+
+    rng = np.random.default_rng(seed)
+    click.echo("stops  nn_km  final_km  gain  late_stops  ms_avg  ms_max")
+
+    for n in stops:
+        results = []
+        for _ in range(runs):
+            # Depot plus n pickups in a ~10 km square, expiring in 2-24 h
+            lat = np.concatenate(([22.57], 22.52 + rng.random(n) * 0.1))
+            lon = np.concatenate(([88.36], 88.31 + rng.random(n) * 0.1))
+            km = route_service.haversine_matrix(lat, lon, lat, lon)
+            deadlines = np.concatenate(([0.0], rng.uniform(2, 24, n)))
+
+            order, stats = route_service.solve(km, deadlines, budget_seconds=budget_ms / 1000)
+            clock, previous, late = 0.0, 0, 0
+            for node in order:
+                clock += km[previous, node] / route_service.DEFAULT_SPEED_KMH
+                late += clock > deadlines[node]
+                clock += route_service.DEFAULT_SERVICE_MINUTES / 60
+                previous = node
+            results.append((stats["initialKm"], stats["km"], late, stats["ms"]))
+
+        nn_km, final_km, late, ms = np.array(results).mean(axis=0)
+        click.echo(f"{n:5d}  {nn_km:5.1f}  {final_km:8.1f}  {1 - final_km / nn_km:4.0%}  "
+                   f"{late:10.1f}  {ms:6.1f}  {max(r[3] for r in results):6.1f}")
+
+
+@commands_bp.cli.command("kpi-rebuild")
+def kpi_rebuild():
+    """Recompute the admin KPI counters from the raw tables."""
+    from app.services import kpi_service
+
+    click.echo(f"Rebuilt {kpi_service.rebuild()} counters")
+
+
+@commands_bp.cli.command("rollup-refresh")
+@click.option("--full", is_flag=True, help="Rebuild every day, not just recent ones.")
+def rollup_refresh(full):
+    """Refresh the daily impact rollups behind /api/admin/reports."""
+    from app.services import report_service
+
+    refreshed = report_service.refresh_rollups(full=full)
+    if refreshed is None:
+        click.echo("Another refresh is running; skipped")
+        return
+    click.echo(f"Refreshed {refreshed} days")
+
+
+@commands_bp.cli.command("forecast-fit")
+def forecast_fit():
+    """Refit the per-area demand and waste forecasts (run nightly)."""
+    from app.services import ml_service
+
+    click.echo(f"Fitted {ml_service.train()} models")
+
+
+@commands_bp.cli.command("outbox-worker")
+@click.option("--once", is_flag=True, help="Drain what is due now, then exit.")
+@click.option("--batch-size", default=None, type=int, help="Defaults to OUTBOX_BATCH_SIZE.")
+def outbox_worker(once, batch_size):
+    """Process queued side-effect jobs from the outbox (long running)."""
+    from flask import current_app
+    from app.services import outbox_service
+
+    config = current_app.config
+    if config["OUTBOX_DISPATCH"] == "inline":
+        click.echo("Warning: OUTBOX_DISPATCH=inline, so processes configured like this one "
+                   "queue nothing for this worker; set OUTBOX_WORKER=process", err=True)
+    worker = outbox_service.OutboxWorker.from_config(config)
+    if batch_size:
+        worker.batch_size = batch_size
+
+    if once:
+        while worker.run_once():
+            pass
+        click.echo(f"Outbox: {worker.stats}")
+        return
+
+    worker.run_forever(config["OUTBOX_POLL_SECONDS"], config["OUTBOX_RETENTION_HOURS"])
+
+
+@commands_bp.cli.command("outbox-requeue")
+@click.option("--topic", default=None, help="Only jobs for this topic.")
+def outbox_requeue(topic):
+    """Retry outbox jobs that exhausted their attempts."""
+    from app.services import outbox_service
+
+    click.echo(f"Requeued {outbox_service.requeue_failed(topic)} jobs")
+
+
+@commands_bp.cli.command("expiry-scheduler")
+def expiry_scheduler():
+    """Expire stale donations and raise near-expiry alerts (long running)."""
+    from datetime import timedelta
+    from flask import current_app
+    from app.services.expiry_service import scheduler
+
+    scheduler.alert_window = timedelta(minutes=current_app.config["EXPIRY_ALERT_MINUTES"])
+    scheduler.run_forever(current_app.config["EXPIRY_POLL_SECONDS"])
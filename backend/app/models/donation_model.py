@@ -1,5 +1,7 @@
-from datetime import datetime
+from datetime import datetime, timedelta
 from app import db
+from app.services.search_service import search_document
+from app.utils.serialization import RowSchema
 
 class Donation(db.Model):
     __tablename__ = "donations"
@@ -10,23 +12,69 @@ class Donation(db.Model):
 
     food_type = db.Column(db.String(255), nullable=False)
     quantity = db.Column(db.String(100), nullable=False)
+    # Parsed from quantity on write (see quantity_service.parse_quantity)
+    quantity_kg = db.Column(db.Float)
 
     expiry_hours = db.Column(db.Integer, nullable=False)
     pickup_address = db.Column(db.String(255), nullable=False)
 
+    # Geocoded once on write (see location_service.geocode)
+    latitude = db.Column(db.Float)
+    longitude = db.Column(db.Float)
+
     notes = db.Column(db.Text)
 
     status = db.Column(db.String(50), default="PENDING")
 
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    # created_at + expiry_hours, stored so expiry can be found by index
+    expires_at = db.Column(db.DateTime)
+
+    __table_args__ = (
+        db.Index("ix_donations_status", status),
+        db.Index("ix_donations_created_at", created_at),
+        db.Index("ix_donations_status_expires", status, expires_at),
+        # Matches list_donations' keyset order (created_at, id) per donor
+        db.Index("ix_donations_donor_created", donor_id, created_at.desc(), id.desc()),
+        db.Index("ix_donations_donor_status", donor_id, status),
+        # Full-text search (search_service.donations); food type outranks notes
+        db.Index(
+            "ix_donations_search", search_document((food_type, "A"), (notes, "B")),
+            postgresql_using="gin"
+        ).ddl_if(dialect="postgresql"),
+    )
+
+    def set_expiry(self):
+        self.created_at = self.created_at or datetime.utcnow()
+        self.expires_at = self.created_at + timedelta(hours=self.expiry_hours)
+
+    def set_quantity_kg(self):
+        from app.services.quantity_service import parse_quantity
+        self.quantity_kg = parse_quantity(self.quantity, self.food_type)
 
     def to_dict(self):
         return {
             "id": self.id,
             "foodType": self.food_type,
             "quantity": self.quantity,
+            "quantityKg": self.quantity_kg,
             "expiryWindow": f"{self.expiry_hours} hrs",
             "status": self.status,
             "createdAt": self.created_at.isoformat(),
             "distanceKm": None  # computed later via location_service
         }
+
+
+# Column-level equivalent of Donation.to_dict() for list endpoints
+DONATION_SUMMARY_FIELDS = (
+    ("id", Donation.id),
+    ("foodType", Donation.food_type),
+    ("quantity", Donation.quantity),
+    ("quantityKg", Donation.quantity_kg),
+    ("expiryWindow", Donation.expiry_hours, "{} hrs".format),
+    ("status", Donation.status),
+    ("createdAt", Donation.created_at),
+    ("distanceKm", None),
+)
+
+DONATION_SUMMARY = RowSchema(*DONATION_SUMMARY_FIELDS)
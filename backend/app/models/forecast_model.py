@@ -0,0 +1,29 @@
+import json
+from datetime import datetime
+from app import db
+
+class ForecastModel(db.Model):
+    __tablename__ = "forecast_models"
+
+    id = db.Column(db.Integer, primary_key=True)
+
+    area = db.Column(db.String(100), nullable=False)
+    kind = db.Column(db.String(20), nullable=False)        # demand | waste
+
+    # JSON lists: ridge coefficients [bias, lag_1..lag_n] and the last n
+    # observed periods (oldest first) needed to forecast the next one
+    coefficients = db.Column(db.Text, nullable=False)
+    last_values = db.Column(db.Text, nullable=False)
+
+    trained_through = db.Column(db.Date, nullable=False)   # start of last closed period
+    fitted_at = db.Column(db.DateTime, default=datetime.utcnow)
+
+    __table_args__ = (
+        db.UniqueConstraint("area", "kind", name="uq_forecast_models_area_kind"),
+    )
+
+    def predict_next(self):
+        coefficients = json.loads(self.coefficients)
+        lags = json.loads(self.last_values)
+        value = coefficients[0] + sum(c * v for c, v in zip(coefficients[1:], lags))
+        return max(value, 0.0)
@@ -0,0 +1,11 @@
+from datetime import datetime
+from app import db
+
+class KpiCounter(db.Model):
+    __tablename__ = "kpi_counters"
+
+    # e.g. "live_requests", "saved_kg:2026-10-18"
+    name = db.Column(db.String(100), primary_key=True)
+    value = db.Column(db.Float, nullable=False, default=0)
+
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
@@ -1,4 +1,6 @@
 from app import db
+from app.services.search_service import search_document
+from app.utils.serialization import RowSchema
 
 class NGO(db.Model):
     __tablename__ = "ngos"
@@ -14,6 +16,18 @@ class NGO(db.Model):
 
     is_verified = db.Column(db.Boolean, default=False)
 
+    # The NGO's login; claims (requests.ngo_id) are recorded against it
+    user_id = db.Column(db.Integer, db.ForeignKey("users.id"), unique=True)
+    user = db.relationship("User")
+
+    __table_args__ = (
+        # Full-text search (search_service.ngos); name outranks area
+        db.Index(
+            "ix_ngos_search", search_document((name, "A"), (area, "B")),
+            postgresql_using="gin"
+        ).ddl_if(dialect="postgresql"),
+    )
+
     def to_dict(self):
         return {
             "id": self.id,
@@ -22,3 +36,13 @@ class NGO(db.Model):
             "capacity": self.capacity,
             "performanceScore": self.performance_score
         }
+
+
+# Admin list row: rate and status are display strings
+NGO_SUMMARY = RowSchema(
+    ("id", NGO.id),
+    ("name", NGO.name),
+    ("area", NGO.area),
+    ("rate", NGO.fulfillment_rate, lambda rate: f"{int(rate * 100)}%"),
+    ("status", NGO.is_verified, lambda verified: "VERIFIED" if verified else "PENDING"),
+)
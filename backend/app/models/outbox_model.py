@@ -0,0 +1,26 @@
+from datetime import datetime
+from app import db
+
+class OutboxJob(db.Model):
+    __tablename__ = "outbox_jobs"
+
+    id = db.Column(db.Integer, primary_key=True)
+
+    topic = db.Column(db.String(100), nullable=False)      # e.g. "donation.claimed"
+    payload = db.Column(db.Text, nullable=False)           # JSON
+    # Enqueueing the same key twice keeps the first job; handlers get it too
+    idempotency_key = db.Column(db.String(200), nullable=False, unique=True)
+
+    status = db.Column(db.String(20), nullable=False, default="PENDING")  # PENDING | DONE | FAILED
+    attempts = db.Column(db.Integer, nullable=False, default=0)
+    # Next time a worker may take the job; pushed forward while one holds it
+    available_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)
+    claimed_by = db.Column(db.String(32))
+    last_error = db.Column(db.Text)
+
+    created_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)
+    processed_at = db.Column(db.DateTime)
+
+    __table_args__ = (
+        db.Index("ix_outbox_jobs_status_available", "status", "available_at"),
+    )
@@ -5,7 +5,9 @@ class Pickup(db.Model):
     __tablename__ = "pickups"
 
     id = db.Column(db.Integer, primary_key=True)
-    request_id = db.Column(db.Integer, db.ForeignKey("requests.id"), nullable=False)
+    request_id = db.Column(db.Integer, db.ForeignKey("requests.id"), nullable=False, index=True)
 
     status = db.Column(db.String(50), default="SCHEDULED")
-    verified_at = db.Column(db.DateTime)
+    verified_at = db.Column(db.DateTime, index=True)
+
+    request = db.relationship("Request", back_populates="pickup")
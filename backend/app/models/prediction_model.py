@@ -5,6 +5,8 @@ class Prediction(db.Model):
 
     id = db.Column(db.Integer, primary_key=True)
     period = db.Column(db.String(50))          # e.g. Week 1
+    period_start = db.Column(db.Date, index=True)
+    area = db.Column(db.String(100))           # NULL = all areas
     predicted_kg = db.Column(db.Float)
     actual_kg = db.Column(db.Float)
 
@@ -12,6 +14,8 @@ class Prediction(db.Model):
         return {
             "id": self.id,
             "period": self.period,
+            "periodStart": self.period_start.isoformat() if self.period_start else None,
+            "area": self.area,
             "predictedKg": self.predicted_kg,
             "actualKg": self.actual_kg
         }
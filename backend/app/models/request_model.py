@@ -7,9 +7,18 @@ class Request(db.Model):
     id = db.Column(db.Integer, primary_key=True)
 
     donation_id = db.Column(db.Integer, db.ForeignKey("donations.id"), nullable=False)
-    ngo_id = db.Column(db.Integer, db.ForeignKey("ngos.id"), nullable=False)
+    # The claiming NGO's users.id, as carried in its JWT
+    ngo_id = db.Column(db.Integer, db.ForeignKey("users.id"), nullable=False, index=True)
 
     priority_score = db.Column(db.Float)
     status = db.Column(db.String(50), default="ALLOCATED")
 
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
+
+    donation = db.relationship("Donation", backref=db.backref("requests", lazy="select"))
+    pickup = db.relationship("Pickup", back_populates="request", uselist=False)
+
+    __table_args__ = (
+        # Keyset order of active_requests per NGO
+        db.Index("ix_requests_ngo_created", ngo_id, created_at.desc(), id.desc()),
+    )
@@ -0,0 +1,15 @@
+from datetime import datetime
+from app import db
+
+class ImpactRollup(db.Model):
+    __tablename__ = "impact_rollups"
+
+    # One row per UTC day; reports sum these instead of raw donations
+    day = db.Column(db.Date, primary_key=True)
+
+    saved_kg = db.Column(db.Float, nullable=False, default=0)
+    wasted_kg = db.Column(db.Float, nullable=False, default=0)
+    predicted_kg = db.Column(db.Float, nullable=False, default=0)
+    donations = db.Column(db.Integer, nullable=False, default=0)
+
+    refreshed_at = db.Column(db.DateTime, default=datetime.utcnow)
@@ -1,6 +1,6 @@
 from app import db
 import enum
-from werkzeug.security import generate_password_hash, check_password_hash
+from app.utils import password_hasher
 
 class UserRole(enum.Enum):
     DONOR = 'DONOR'
@@ -21,6 +21,8 @@ class User(db.Model):
 
     # Shared (optional)
     location = db.Column(db.String(200))
+    latitude = db.Column(db.Float)
+    longitude = db.Column(db.Float)
 
     # NGO-specific (nullable for others)
     verified = db.Column(db.Boolean, default=False)
@@ -29,11 +31,15 @@ class User(db.Model):
     # -----------------------
     # Auth helpers
     # -----------------------
+    # Both may raise password_hasher.HashingBusy under load
     def set_password(self, password):
-        self.password_hash = generate_password_hash(password)
+        self.password_hash = password_hasher.hash_password(password)
 
     def check_password(self, password):
-        return check_password_hash(self.password_hash, password)
+        return password_hasher.verify_password(self.password_hash, password)
+
+    def needs_rehash(self):
+        return password_hasher.needs_rehash(self.password_hash)
 
     # -----------------------
     # Role-aware serialization
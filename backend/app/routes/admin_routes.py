@@ -3,7 +3,10 @@ from flask_jwt_extended import jwt_required
 from app.utils.role_guard import role_required
 
 from app import db
-from app.models.ngo_model import NGO
+from app.models.ngo_model import NGO, NGO_SUMMARY
+from app.services import outbox_service, search_service
+from app.utils.http_cache import cached_response
+from app.utils.pagination import count, keyset_page, page_size
 from app.utils.response_helper import success_response
 
 admin_bp = Blueprint("admin", __name__, url_prefix="/api/admin/ngos")
@@ -14,32 +17,37 @@ admin_bp = Blueprint("admin", __name__, url_prefix="/api/admin/ngos")
 @admin_bp.route("", methods=["GET"])
 @jwt_required()
 @role_required("ADMIN")
+@cached_response("ngos")
 def list_ngos():
     search = request.args.get("search", "")
     status = request.args.get("status")
 
-    query = NGO.query
+    filters = [NGO.is_verified == (status == "VERIFIED")] if status else []
+    query = db.session.query(*NGO_SUMMARY.columns).filter(*filters)
 
-    if search:
-        query = query.filter(
-            NGO.name.ilike(f"%{search}%") |
-            NGO.area.ilike(f"%{search}%")
-        )
+    cursor = request.args.get("cursor")
 
-    if status:
-        query = query.filter_by(is_verified=(status == "VERIFIED"))
+    try:
+        if search_service.tokenize(search):
+            # Relevance order over name and area, prefix and typo tolerant
+            ranked = search_service.ngos.search(search, *filters)
+            hits, next_cursor = search_service.page(ranked, page_size(), cursor)
 
-    ngos = query.all()
+            ids = [ngo_id for _, ngo_id in hits]
+            found = {row.id: row for row in query.filter(NGO.id.in_(ids))} if ids else {}
+            ngos = [found[i] for i in ids if i in found]
+            total = len(ranked)
+        else:
+            ngos, next_cursor = keyset_page(query, [(NGO.id, False)], page_size(), cursor)
+            total = count(query)
+    except ValueError:
+        return {"message": "Invalid cursor"}, 400
 
-    return success_response("NGO list", [
-        {
-            "id": ngo.id,
-            "name": ngo.name,
-            "area": ngo.area,
-            "rate": f"{int(ngo.fulfillment_rate * 100)}%",
-            "status": "VERIFIED" if ngo.is_verified else "PENDING"
-        } for ngo in ngos
-    ])
+    headers = {"X-Total-Count": str(total)}
+    if next_cursor:
+        headers["X-Next-Cursor"] = next_cursor
+
+    return success_response("NGO list", NGO_SUMMARY.dicts(ngos), headers)
 
 # =====================
 # NGO Detail
@@ -69,6 +77,7 @@ def ngo_detail(ngo_id):
 def verify_ngo(ngo_id):
     ngo = NGO.query.get_or_404(ngo_id)
     ngo.is_verified = True
+    outbox_service.ngo_verified(ngo_id)
     db.session.commit()
     return success_response("NGO verified")
 
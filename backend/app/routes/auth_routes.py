@@ -1,12 +1,21 @@
 from flask import Blueprint, request
-from flask_jwt_extended import create_access_token, jwt_required, get_jwt_identity
+from flask_jwt_extended import jwt_required, get_jwt_identity
 
 from app import db
+from app.models.ngo_model import NGO
 from app.models.user_model import User, UserRole
+from app.services.location_service import geocode
+from app.utils.jwt_utils import issue_access_token
+from app.utils.password_hasher import HashingBusy
 from app.utils.response_helper import success_response
 
 auth_bp = Blueprint("auth", __name__, url_prefix="/api/auth")
 
+
+def _busy_response():
+    return {"message": "Authentication is busy, please retry"}, 503, {"Retry-After": "1"}
+
+
 # =====================
 # Health Check
 # =====================
@@ -38,7 +47,14 @@ def register():
         role=UserRole(data["role"]),
         location=data.get("location")
     )
-    user.set_password(data["password"])
+    try:
+        user.set_password(data["password"])
+    except HashingBusy:
+        return _busy_response()
+
+    coords = geocode(user.location)
+    if coords:
+        user.latitude, user.longitude = coords
 
     # NGO-specific defaults
     if user.role == UserRole.NGO:
@@ -46,6 +62,11 @@ def register():
         user.performance_score = 50
 
     db.session.add(user)
+
+    # Listed for admin verification; capacity and verification live there
+    if user.role == UserRole.NGO:
+        db.session.add(NGO(name=user.name, area=user.location, user=user))
+
     db.session.commit()
 
     return success_response("User registered successfully", user.to_dict())
@@ -62,13 +83,18 @@ def login():
 
     user = User.query.filter_by(email=data["email"]).first()
 
-    if not user or not user.check_password(data["password"]):
-        return {"message": "Invalid credentials"}, 401
+    try:
+        if not user or not user.check_password(data["password"]):
+            return {"message": "Invalid credentials"}, 401
 
-    access_token = create_access_token(
-        identity=str(user.id),
-        additional_claims={"role": user.role.value}
-    )
+        # Hashing parameters changed since this hash was written
+        if user.needs_rehash():
+            user.set_password(data["password"])
+            db.session.commit()
+    except HashingBusy:
+        return _busy_response()
+
+    access_token = issue_access_token(user)
 
     return success_response("Login successful", {
         "token": access_token,
@@ -1,11 +1,16 @@
-from flask import Blueprint, request
+from flask import Blueprint, current_app, request
 from flask_jwt_extended import jwt_required, get_jwt_identity
 from app.utils.role_guard import role_required
 from sqlalchemy import func
 
 from app import db
-from app.models.donation_model import Donation
+from app.models.donation_model import DONATION_SUMMARY, Donation
+from app.services import event_bus, ingest_service, outbox_service, qr_service, search_service
+from app.services.location_service import geocode, pending_index
+from app.utils.http_cache import cached_response
+from app.utils.pagination import count, keyset_page, page_size
 from app.utils.response_helper import success_response
+from app.utils.streaming import batched, stream_success_response
 
 donor_bp = Blueprint("donor", __name__, url_prefix="/api/donor")
 
@@ -28,17 +33,68 @@ def create_donation():
         notes=data.get("notes")
     )
 
+    donation.set_expiry()
+    donation.set_quantity_kg()
+
+    coords = geocode(donation.pickup_address)
+    if coords:
+        donation.latitude, donation.longitude = coords
+
     db.session.add(donation)
+    outbox_service.donations_created([donation])
     db.session.commit()
 
+    pending_index.add(donation)
+    event_bus.donation_created(donation)
+
     return success_response("Donation created successfully", donation.to_dict())
 
+# =====================
+# Bulk Create Donations
+# =====================
+@donor_bp.route("/donations/bulk", methods=["POST"])
+@jwt_required()
+@role_required("DONOR")
+def bulk_create_donations():
+    """
+    Accepts a JSON array, NDJSON (application/x-ndjson) or CSV (text/csv)
+    body with the same fields as create_donation. The body is read and the
+    response written as streams, so large uploads are never held in memory.
+    """
+    donor_id = int(get_jwt_identity())
+
+    fmt = ingest_service.upload_format(request.content_type)
+    if fmt is None:
+        return {"message": "Send application/json, application/x-ndjson or text/csv"}, 415
+
+    config = current_app.config
+    chunk_size = config.get("BULK_CHUNK_SIZE", 500)
+    results = ingest_service.ingest(
+        donor_id, request.stream, fmt,
+        chunk_size=chunk_size,
+        max_row_bytes=config.get("BULK_MAX_ROW_BYTES", 64 * 1024)
+    )
+
+    totals = {"created": 0, "failed": 0}
+
+    def counted(results):
+        for result in results:
+            totals["created" if "id" in result else "failed"] += 1
+            yield result
+
+    # Results arrive a chunk at a time, so write them a chunk at a time
+    return stream_success_response(
+        "Bulk upload processed", batched(counted(results), chunk_size),
+        key="results", summary=lambda: totals
+    )
+
 # =====================
 # Donor Overview
 # =====================
 @donor_bp.route("/overview", methods=["GET"])
 @jwt_required()
 @role_required("DONOR")
+@cached_response("donations")
 def donor_overview():
     donor_id = int(get_jwt_identity())
 
@@ -51,8 +107,8 @@ def donor_overview():
         Donation.donor_id == donor_id
     ).group_by(Donation.status).all()
 
-    recent = Donation.query \
-        .filter_by(donor_id=donor_id) \
+    recent = db.session.query(*DONATION_SUMMARY.columns) \
+        .filter(Donation.donor_id == donor_id) \
         .order_by(Donation.created_at.desc()) \
         .limit(3).all()
 
@@ -61,7 +117,7 @@ def donor_overview():
         "statusDistribution": {
             status: count for status, count in status_counts
         },
-        "recentActivity": [d.to_dict() for d in recent]
+        "recentActivity": DONATION_SUMMARY.dicts(recent)
     })
 
 # =====================
@@ -70,11 +126,12 @@ def donor_overview():
 @donor_bp.route("/dashboard", methods=["GET"])
 @jwt_required()
 @role_required("DONOR")
+@cached_response("donations")
 def donor_dashboard():
     donor_id = int(get_jwt_identity())
 
-    recent = Donation.query \
-        .filter_by(donor_id=donor_id) \
+    recent = db.session.query(*DONATION_SUMMARY.columns) \
+        .filter(Donation.donor_id == donor_id) \
         .order_by(Donation.created_at.desc()) \
         .limit(5).all()
 
@@ -84,9 +141,22 @@ def donor_dashboard():
 
     return success_response("Dashboard data", {
         "activeAllocations": pending_count,
-        "recentDonations": [d.to_dict() for d in recent]
+        "recentDonations": DONATION_SUMMARY.dicts(recent)
     })
 
+# =====================
+# Pickup QR (shown to the NGO driver at collection)
+# =====================
+@donor_bp.route("/donations/<int:donation_id>/qr", methods=["GET"])
+@jwt_required()
+@role_required("DONOR")
+def donation_qr(donation_id):
+    data = qr_service.pickup_token(donation_id, int(get_jwt_identity()))
+    if data is None:
+        return {"message": "No scheduled pickup for this donation"}, 404
+
+    return success_response("Pickup QR", data)
+
 # =====================
 # List Donations (with search & filter)
 # =====================
@@ -98,22 +168,64 @@ def list_donations():
 
     search = request.args.get("search", "")
     status = request.args.get("status", "ALL")
-    page = int(request.args.get("page", 1))
-    per_page = 10
+    page = max(int(request.args.get("page", 1)), 1)
+    cursor = request.args.get("cursor")
+    per_page = page_size(default=10)
 
-    query = Donation.query.filter(Donation.donor_id == donor_id)
+    if search_service.tokenize(search):
+        return _search_donations(donor_id, search, status, page, per_page)
 
-    if search:
-        query = query.filter(Donation.food_type.ilike(f"%{search}%"))
+    query = db.session.query(*DONATION_SUMMARY.columns).filter(Donation.donor_id == donor_id)
 
     if status != "ALL":
         query = query.filter(Donation.status == status)
 
-    pagination = query.order_by(Donation.created_at.desc()) \
-        .paginate(page=page, per_page=per_page, error_out=False)
+    total = count(query)
+
+    # Page numbers still work but cost an OFFSET; clients should follow nextCursor
+    offset = 0 if cursor else (page - 1) * per_page
+
+    try:
+        donations, next_cursor = keyset_page(
+            query, [(Donation.created_at, True), (Donation.id, True)], per_page, cursor,
+            offset=offset
+        )
+    except ValueError:
+        return {"message": "Invalid cursor"}, 400
+
+    return success_response("Donations fetched", {
+        "items": DONATION_SUMMARY.dicts(donations),
+        "total": total,
+        "page": page,
+        "nextCursor": next_cursor
+    })
+
+
+def _search_donations(donor_id, search, status, page, per_page):
+    """Relevance-ranked search over the donor's own donations (food type and notes)."""
+    filters = [Donation.donor_id == donor_id]
+    if status != "ALL":
+        filters.append(Donation.status == status)
+
+    ranked = search_service.donations.search(search, *filters)
+
+    cursor = request.args.get("cursor")
+    offset = 0 if cursor else (page - 1) * per_page
+
+    try:
+        hits, next_cursor = search_service.page(ranked, per_page, cursor, offset=offset)
+    except ValueError:
+        return {"message": "Invalid cursor"}, 400
+
+    ids = [donation_id for _, donation_id in hits]
+    found = {
+        row.id: row for row in
+        db.session.query(*DONATION_SUMMARY.columns).filter(Donation.id.in_(ids))
+    } if ids else {}
 
     return success_response("Donations fetched", {
-        "items": [d.to_dict() for d in pagination.items],
-        "total": pagination.total,
-        "page": page
+        "items": DONATION_SUMMARY.dicts(found[i] for i in ids if i in found),
+        "total": len(ranked),
+        "page": page,
+        "nextCursor": next_cursor
     })
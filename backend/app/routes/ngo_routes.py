@@ -1,89 +1,213 @@
-from flask import Blueprint, request
+from flask import Blueprint, Response, current_app, request
 from flask_jwt_extended import jwt_required, get_jwt_identity
 from app.utils.role_guard import role_required
 
 from app import db
-from app.models.donation_model import Donation
-from app.models.user_model import User
+from app.models.donation_model import DONATION_SUMMARY, DONATION_SUMMARY_FIELDS, Donation
 from app.models.request_model import Request
-from app.models.pickup_model import Pickup
 
-from app.services.allocation_service import calculate_priority
-from app.services.qr_service import verify_qr
+from app.services.allocation_service import (
+    score_batch,
+    priority_tiers_expression,
+    priority_from_tiers,
+    try_claim
+)
+from app.services import event_bus, route_service, search_service
+from app.services.location_service import distance_between, haversine_km, pending_index
+from app.services.qr_service import QRTokenError, verify_qr
+from app.utils.http_cache import cached_response
+from app.utils.jwt_utils import current_profile
+from app.utils.pagination import count, keyset_page, page_size
 from app.utils.response_helper import success_response
+from app.utils.serialization import RowSchema
+from app.utils.streaming import STREAM_BATCH_ROWS, batched, stream_success_response
 
 ngo_bp = Blueprint("ngo", __name__, url_prefix="/api/ngo")
 
+STREAM_DEFAULT_RADIUS_KM = 10
+STREAM_KEEPALIVE_SECONDS = 15
+
+# Marketplace rows also carry what distance and scoring need
+_CANDIDATE_COLUMNS = (*DONATION_SUMMARY.columns, Donation.latitude, Donation.longitude)
+
+REQUEST_SUMMARY = RowSchema(
+    ("requestId", Request.id.label("request_id")),
+    *DONATION_SUMMARY_FIELDS
+)
+
+
+def _pending_filters(ngo):
+    """WHERE criteria for the marketplace: PENDING, within ?radiusKm= if given."""
+    filters = [Donation.status == "PENDING"]
+
+    # ?radiusKm= narrows the candidates through the spatial index first
+    radius_km = request.args.get("radiusKm", type=float)
+    if radius_km is not None and ngo.latitude is not None and ngo.longitude is not None:
+        hits = pending_index.nearby(ngo.latitude, ngo.longitude, radius_km)
+        filters.append(Donation.id.in_([donation_id for donation_id, _ in hits]))
+
+    return filters
+
+
+def _score_candidates(ngo, candidates):
+    return score_batch(
+        [d.expiry_hours for d, _ in candidates],
+        [distance_km for _, distance_km in candidates],
+        ngo.performance_score
+    )
+
+
+def _serialize(candidates, scores):
+    return DONATION_SUMMARY.dicts(
+        [d for d, _ in candidates],
+        distanceKm=[round(distance_km, 1) for _, distance_km in candidates],
+        priorityScore=scores.tolist()
+    )
+
+
+def _marketplace_vary():
+    """What marketplace responses depend on besides the tables: the caller's
+    cached profile and, with ?radiusKm=, this process's spatial index."""
+    vary = [current_profile()]
+    if request.args.get("radiusKm") is not None:
+        pending_index.sync()
+        vary.append(pending_index.version)
+    return tuple(vary)
+
+
+def _ranked_pending(ngo):
+    tiers = priority_tiers_expression(ngo.latitude, ngo.longitude)
+
+    query = db.session.query(*_CANDIDATE_COLUMNS, tiers.label("tiers")) \
+        .filter(*_pending_filters(ngo))
+
+    return query.order_by(tiers.desc(), Donation.id), tiers
+
+
+def _ranked_page(ngo):
+    """One keyset page of _ranked_pending on (tiers, id); raises ValueError on a bad cursor."""
+    query, tiers = _ranked_pending(ngo)
+
+    return keyset_page(
+        query, [(tiers, True), (Donation.id, False)], page_size(), request.args.get("cursor"),
+        key=lambda row: [row.tiers, row.id]
+    )
+
+
+def _serialize_ranked(ngo, rows):
+    return DONATION_SUMMARY.dicts(
+        rows,
+        distanceKm=[round(distance_between(row, ngo), 1) for row in rows],
+        priorityScore=[priority_from_tiers(row.tiers, ngo.performance_score) for row in rows]
+    )
+
+
+def _serialize_hits(ngo, ids):
+    """Search hits (ids in relevance order) -> marketplace dicts in that order."""
+    found = {
+        row.id: row for row in db.session.query(*_CANDIDATE_COLUMNS).filter(
+            Donation.id.in_(ids), Donation.status == "PENDING"
+        )
+    } if ids else {}
+
+    # Rows claimed since the id set was read drop out
+    candidates = [(found[i], distance_between(found[i], ngo)) for i in ids if i in found]
+    return _serialize(candidates, _score_candidates(ngo, candidates))
+
+
+def _wants_stream():
+    return request.args.get("stream", "").lower() in ("1", "true")
+
+
+def _stream_ranked(ngo, message):
+    """Every ranked pending donation, fetched and encoded STREAM_BATCH_ROWS at a time."""
+    query, _ = _ranked_pending(ngo)
+    rows = query.yield_per(STREAM_BATCH_ROWS)
+    return stream_success_response(
+        message, (_serialize_ranked(ngo, chunk) for chunk in batched(rows))
+    )
+
+
 # =====================
 # NGO Overview (Top 3 recommendations)
 # =====================
 @ngo_bp.route("/overview", methods=["GET"])
 @jwt_required()
 @role_required("NGO")
+@cached_response("donations", "users", vary=_marketplace_vary)
 def ngo_overview():
-    ngo_id = int(get_jwt_identity())
-    ngo = User.query.get_or_404(ngo_id)  # ✅ use User, not NGO
-
-    donations = Donation.query.filter_by(status="PENDING").all()
-    ranked = []
-
-    for d in donations:
-        distance_km = 5  # placeholder
-        score = calculate_priority(d, ngo, distance_km)
-        ranked.append({**d.to_dict(), "priorityScore": score})
+    ngo = current_profile()
+    if ngo is None:
+        return {"message": "User not found"}, 404
 
-    ranked.sort(key=lambda x: x["priorityScore"], reverse=True)
+    query, _ = _ranked_pending(ngo)
 
-    return success_response("NGO overview", ranked[:3])
+    return success_response("NGO overview", _serialize_ranked(ngo, query.limit(3).all()))
 
 # =====================
-# NGO Dashboard (All ranked)
+# NGO Dashboard (All ranked, keyset paginated on (score, id))
 # =====================
 @ngo_bp.route("/dashboard", methods=["GET"])
 @jwt_required()
 @role_required("NGO")
 def ngo_dashboard():
-    ngo_id = int(get_jwt_identity())
-    ngo = User.query.get_or_404(ngo_id)  # ✅
+    ngo = current_profile()
+    if ngo is None:
+        return {"message": "User not found"}, 404
 
-    donations = Donation.query.filter_by(status="PENDING").all()
+    # ?stream=true returns the whole ranking in one incrementally written body
+    if _wants_stream():
+        return _stream_ranked(ngo, "NGO dashboard")
 
-    ranked = []
-    for d in donations:
-        distance_km = 5
-        ranked.append({
-            **d.to_dict(),
-            "priorityScore": calculate_priority(d, ngo, distance_km)
-        })
+    try:
+        rows, next_cursor = _ranked_page(ngo)
+    except ValueError:
+        return {"message": "Invalid cursor"}, 400
 
-    ranked.sort(key=lambda x: x["priorityScore"], reverse=True)
-    return success_response("NGO dashboard", ranked)
+    headers = {"X-Next-Cursor": next_cursor} if next_cursor else None
+    return success_response("NGO dashboard", _serialize_ranked(ngo, rows), headers)
 
 # =====================
-# Browse Food
+# Browse Food (relevance ranked search, cursor paginated)
 # =====================
 @ngo_bp.route("/browse", methods=["GET"])
 @jwt_required()
 @role_required("NGO")
 def browse_food():
-    ngo_id = int(get_jwt_identity())
-    ngo = User.query.get_or_404(ngo_id)  # ✅
+    ngo = current_profile()
+    if ngo is None:
+        return {"message": "User not found"}, 404
 
     search = request.args.get("search", "")
 
-    donations = Donation.query.filter(
-        Donation.status == "PENDING",
-        Donation.food_type.ilike(f"%{search}%")
-    ).all()
+    if not search_service.tokenize(search):
+        # Nothing to match on: same priority order and cursor as the dashboard
+        if _wants_stream():
+            return _stream_ranked(ngo, "Food marketplace")
+        try:
+            rows, next_cursor = _ranked_page(ngo)
+        except ValueError:
+            return {"message": "Invalid cursor"}, 400
+        headers = {"X-Next-Cursor": next_cursor} if next_cursor else None
+        return success_response("Food marketplace", _serialize_ranked(ngo, rows), headers)
 
-    results = []
-    for d in donations:
-        results.append({
-            **d.to_dict(),
-            "priorityScore": calculate_priority(d, ngo, 5)
-        })
+    ranked = search_service.donations.search(search, *_pending_filters(ngo))
 
-    return success_response("Food marketplace", results)
+    if _wants_stream():
+        ids = [donation_id for _, donation_id in ranked]
+        return stream_success_response("Food marketplace", (
+            _serialize_hits(ngo, chunk) for chunk in batched(ids)
+        ))
+
+    try:
+        hits, next_cursor = search_service.page(ranked, page_size(), request.args.get("cursor"))
+    except ValueError:
+        return {"message": "Invalid cursor"}, 400
+
+    headers = {"X-Next-Cursor": next_cursor} if next_cursor else None
+    return success_response(
+        "Food marketplace", _serialize_hits(ngo, [donation_id for _, donation_id in hits]), headers
+    )
 
 # =====================
 # Claim Donation
@@ -93,27 +217,19 @@ def browse_food():
 @role_required("NGO")
 def claim_donation(donation_id):
     ngo_id = int(get_jwt_identity())
-    donation = Donation.query.get_or_404(donation_id)
 
-    if donation.status != "PENDING":
+    if try_claim(donation_id, ngo_id) is None:
+        db.session.rollback()
+        if db.session.get(Donation, donation_id) is None:
+            return {"message": "Donation not found"}, 404
         return {"message": "Donation already claimed"}, 400
 
-    donation.status = "ALLOCATED"
-
-    request_entry = Request(
-        donation_id=donation.id,
-        ngo_id=ngo_id,
-        priority_score=0
-    )
-
-    db.session.add(request_entry)
-    db.session.flush()  # ensure ID is created
-
-    pickup = Pickup(request_id=request_entry.id)
-    db.session.add(pickup)
-
     db.session.commit()
 
+    pending_index.discard(donation_id)
+    route_service.stop_claimed(ngo_id, donation_id)
+    event_bus.donation_claimed(donation_id)
+
     return success_response("Donation claimed successfully")
 
 # =====================
@@ -125,28 +241,111 @@ def claim_donation(donation_id):
 def active_requests():
     ngo_id = int(get_jwt_identity())
 
-    requests = Request.query.filter_by(ngo_id=ngo_id).all()
-    response = []
+    # One round trip: the inner join also skips requests whose donation is gone
+    query = db.session.query(
+        *REQUEST_SUMMARY.columns, Request.created_at.label("request_created_at")
+    ).select_from(Request).join(Request.donation).filter(Request.ngo_id == ngo_id)
 
-    for r in requests:
-        donation = Donation.query.get(r.donation_id)
-        if donation:
-            response.append({
-                "requestId": r.id,
-                **donation.to_dict(),
-                "status": donation.status
-            })
+    try:
+        rows, next_cursor = keyset_page(
+            query, [(Request.created_at, True), (Request.id, True)],
+            page_size(), request.args.get("cursor"),
+            key=lambda row: [row.request_created_at, row.request_id]
+        )
+    except ValueError:
+        return {"message": "Invalid cursor"}, 400
 
-    return success_response("Active requests", response)
+    response = REQUEST_SUMMARY.dicts(rows)
+
+    headers = {"X-Total-Count": str(count(query))}
+    if next_cursor:
+        headers["X-Next-Cursor"] = next_cursor
+
+    return success_response("Active requests", response, headers)
+
+# =====================
+# Pickup Route (visiting order for SCHEDULED pickups)
+# =====================
+@ngo_bp.route("/route", methods=["GET"])
+@jwt_required()
+@role_required("NGO")
+def pickup_route():
+    ngo = current_profile()
+    if ngo is None:
+        return {"message": "User not found"}, 404
+
+    config = current_app.config
+    try:
+        plan = route_service.plan_route(
+            ngo,
+            speed_kmh=config["ROUTE_SPEED_KMH"],
+            service_minutes=config["ROUTE_SERVICE_MINUTES"],
+            budget_seconds=config["ROUTE_PLAN_BUDGET_MS"] / 1000
+        )
+    except ValueError as exc:
+        return {"message": str(exc)}, 400
+
+    return success_response("Pickup route", plan)
 
 # =====================
 # Verify QR
 # =====================
+@ngo_bp.route("/verify", methods=["POST"])
 @ngo_bp.route("/verify/<int:request_id>", methods=["POST"])
 @jwt_required()
 @role_required("NGO")
-def qr_verify(request_id):
-    if verify_qr(request_id):
-        return success_response("Pickup verified")
+def qr_verify(request_id=None):
+    token = (request.get_json(silent=True) or {}).get("token") or request.args.get("token")
+    if not token:
+        return {"message": "QR token is required"}, 400
+
+    try:
+        verified = verify_qr(token, int(get_jwt_identity()), request_id)
+    except QRTokenError as exc:
+        return {"message": str(exc)}, 400
+
+    if verified is None:
+        return {"message": "Verification failed"}, 400
+
+    request_id, donation_id = verified
+    return success_response("Pickup verified", {"requestId": request_id, "donationId": donation_id})
+
+# =====================
+# Live marketplace events (SSE)
+# =====================
+@ngo_bp.route("/stream", methods=["GET"])
+@jwt_required()
+@role_required("NGO")
+def marketplace_stream():
+    ngo = current_profile()
+    if ngo is None:
+        return {"message": "User not found"}, 404
+
+    radius_km = request.args.get("radiusKm", STREAM_DEFAULT_RADIUS_KM, type=float)
+    subscription = event_bus.get_broker().subscribe(event_bus.MARKETPLACE)
+
+    # Nothing below touches the database; hand the connection back now
+    db.session.remove()
+
+    def in_radius(event):
+        lat, lon = event["data"].get("lat"), event["data"].get("lon")
+        if lat is None or ngo.latitude is None or ngo.longitude is None:
+            return True
+        return haversine_km(ngo.latitude, ngo.longitude, lat, lon) <= radius_km
+
+    def generate():
+        try:
+            yield "retry: 5000\n\n"
+            while True:
+                event = subscription.get(timeout=STREAM_KEEPALIVE_SECONDS)
+                if event is None:
+                    yield ": keepalive\n\n"
+                elif in_radius(event):
+                    yield event_bus.format_sse(event)
+        finally:
+            subscription.close()
 
-    return {"message": "Verification failed"}, 400
+    return Response(generate(), mimetype="text/event-stream", headers={
+        "Cache-Control": "no-cache",
+        "X-Accel-Buffering": "no"
+    })
@@ -1,3 +1,13 @@
+import math
+
+import numpy as np
+from sqlalchemy import case, update
+
+from app import db
+from app.services import outbox_service
+from app.services.location_service import DEFAULT_DISTANCE_KM, EARTH_RADIUS_KM
+
+
 def calculate_priority(donation, ngo, distance_km):
     score = 0
 
@@ -21,3 +31,111 @@ def calculate_priority(donation, ngo, distance_km):
     score += (ngo.performance_score / 100) * 10
 
     return round(min(score, 100), 1)
+
+
+# =====================
+# Claiming
+# =====================
+def try_claim(donation_id, ngo_id, priority_score=0):
+    """
+    Atomically move a donation from PENDING to ALLOCATED and record the claim.
+
+    The conditional UPDATE is the only contended statement: the row lock it
+    takes serializes concurrent claimers and every loser sees rowcount 0, so
+    exactly one Request/Pickup pair is ever written per donation. Returns the
+    new Request, or None if the donation was not PENDING. Caller commits.
+    """
+    from app.models.donation_model import Donation
+    from app.models.request_model import Request
+    from app.models.pickup_model import Pickup
+
+    claimed = db.session.execute(
+        update(Donation)
+        .where(Donation.id == donation_id, Donation.status == "PENDING")
+        .values(status="ALLOCATED")
+        .execution_options(synchronize_session=False)
+    )
+
+    if claimed.rowcount != 1:
+        return None
+
+    request_entry = Request(
+        donation_id=donation_id,
+        ngo_id=ngo_id,
+        priority_score=priority_score,
+        pickup=Pickup()
+    )
+    db.session.add(request_entry)
+    outbox_service.donation_claimed(donation_id, ngo_id)
+
+    return request_entry
+
+
+# =====================
+# Batch scoring
+# =====================
+# Vectorized form of calculate_priority over column arrays; calculate_priority
+# stays the reference implementation and both must agree row for row.
+def score_batch(expiry_hours, distance_km, performance_score):
+    expiry = np.asarray(expiry_hours, dtype=np.float64)
+    distance = np.asarray(distance_km, dtype=np.float64)
+    performance = np.asarray(performance_score, dtype=np.float64)
+
+    score = np.where(expiry <= 2, 60, np.where(expiry <= 4, 40, 20)).astype(np.float64)
+    score += np.where(distance <= 3, 30, np.where(distance <= 6, 20, 10))
+    score = score + (performance / 100) * 10
+    score = np.minimum(score, 100)
+
+    # np.round rounds x * 10 and can disagree with round() on halves; scores
+    # only take a handful of distinct values, so round those the Python way.
+    values, inverse = np.unique(score, return_inverse=True)
+    rounded = np.array([round(v, 1) for v in values.tolist()], dtype=np.float64)
+    return rounded[inverse].reshape(score.shape)
+
+
+
+# =====================
+# SQL ranking
+# =====================
+# The same expiry and distance tiers as a CASE expression so the database can
+# ORDER BY ... LIMIT. Distance uses an equirectangular approximation, which is
+# well under 0.1% off haversine at the 3/6 km tier boundaries.
+KM_PER_DEGREE = math.radians(1) * EARTH_RADIUS_KM
+
+
+def _distance_tier(distance_km):
+    if distance_km <= 3:
+        return 30
+    if distance_km <= 6:
+        return 20
+    return 10
+
+
+def priority_tiers_expression(latitude, longitude):
+    from app.models.donation_model import Donation
+
+    expiry_tier = case(
+        (Donation.expiry_hours <= 2, 60),
+        (Donation.expiry_hours <= 4, 40),
+        else_=20
+    )
+
+    if latitude is None or longitude is None:
+        return expiry_tier + _distance_tier(DEFAULT_DISTANCE_KM)
+
+    dy = (Donation.latitude - latitude) * KM_PER_DEGREE
+    dx = (Donation.longitude - longitude) * (KM_PER_DEGREE * math.cos(math.radians(latitude)))
+    distance_sq = dy * dy + dx * dx
+
+    distance_tier = case(
+        (Donation.latitude.is_(None), _distance_tier(DEFAULT_DISTANCE_KM)),
+        (distance_sq <= 3 ** 2, 30),
+        (distance_sq <= 6 ** 2, 20),
+        else_=10
+    )
+
+    return expiry_tier + distance_tier
+
+
+def priority_from_tiers(tiers, performance_score):
+    return round(min(tiers + (performance_score / 100) * 10, 100), 1)
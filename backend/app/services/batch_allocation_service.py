@@ -0,0 +1,344 @@
+import heapq
+import logging
+from datetime import datetime
+
+import numpy as np
+from sqlalchemy import func
+
+from app import db
+from app.services.allocation_service import score_batch, try_claim
+from app.services.location_service import GridIndex, geocode
+
+logger = logging.getLogger(__name__)
+
+# Candidate edges: NGOs further than this are never considered for a donation
+DEFAULT_CUTOFF_KM = 10.0
+# Keep at most this many nearest NGOs per donation so the graph stays sparse
+DEFAULT_MAX_CANDIDATES = 25
+# Used to drop pairs the NGO cannot reach before the donation expires
+DEFAULT_SPEED_KMH = 20.0
+# Weight charged against NGO capacity when a donation's quantity did not parse
+UNKNOWN_DONATION_KG = 5.0
+
+# Slack for float kg sums
+_KG_EPSILON = 1e-6
+
+_SINK = -1
+
+
+class AssignmentSolver:
+    """
+    Max-weight assignment of donations to capacitated NGOs.
+
+    Equivalent to a min-cost flow source -> donation -> NGO -> sink with edge
+    cost -weight, solved one donation at a time (Hungarian style): inserting
+    a donation runs a Dijkstra over the residual graph with node potentials
+    and applies the cheapest improving path, which may re-route or drop
+    earlier donations. Weights are integers; a donation is only assigned
+    when that raises the total weight.
+
+    Each donation uses `size` of its NGO's capacity. With unit sizes (the
+    default) the plan is optimal for the donations inserted so far, so new
+    donations are solved locally instead of recomputing everything. With kg
+    sizes the problem is a knapsack variant: paths that would overfill an
+    NGO are skipped, so every plan fits but is no longer guaranteed optimal.
+    """
+
+    def __init__(self, capacities):
+        # ngo_id -> remaining capacity, in the same unit as donation sizes
+        self.capacity = dict(capacities)
+        self.load = {ngo_id: 0 for ngo_id in self.capacity}
+
+        self.size = {}           # donation_id -> capacity it uses
+        self.edges = {}          # donation_id -> {ngo_id: weight}
+        self.assigned = {}       # donation_id -> ngo_id
+        self.members = {ngo_id: set() for ngo_id in self.capacity}
+
+        self.pot_donation = {}
+        self.pot_ngo = {ngo_id: 0 for ngo_id in self.capacity}
+
+    def __contains__(self, donation_id):
+        return donation_id in self.edges
+
+    def total_weight(self):
+        return sum(self.edges[d][n] for d, n in self.assigned.items())
+
+    def insert(self, donation_id, candidates, size=1):
+        """candidates: {ngo_id: integer weight}. Returns True if assigned."""
+        candidates = {
+            n: w for n, w in candidates.items()
+            if n in self.capacity and w > 0 and size <= self.capacity[n] + _KG_EPSILON
+        }
+        self.size[donation_id] = size
+        self.edges[donation_id] = candidates
+        if not candidates:
+            return False
+
+        self.pot_donation[donation_id] = max(
+            self.pot_ngo[n] + w for n, w in candidates.items()
+        )
+
+        dist, parent, settled_d, settled_n, target = self._shortest_path(donation_id)
+        if target is None:
+            return False
+
+        # Reduced distance back to real cost; only improving paths are applied
+        cost = dist[target] - self.pot_donation[donation_id]
+        if cost < 0:
+            self._augment(parent, target)
+
+        self._update_potentials(dist, settled_d, settled_n, dist[target])
+        return donation_id in self.assigned
+
+    def _shortest_path(self, start):
+        dist = {("d", start): 0}
+        parent = {}
+        settled_d, settled_n = set(), set()
+        heap = [(0, 0, "d", start)]
+        counter = 1
+
+        while heap:
+            d_u, _, kind, u = heapq.heappop(heap)
+            key = (kind, u)
+            if d_u > dist.get(key, float("inf")):
+                continue
+
+            if kind == "z":
+                return dist, parent, settled_d, settled_n, key
+
+            if kind == "d":
+                if u in settled_d:
+                    continue
+                settled_d.add(u)
+                pot_u = self.pot_donation[u]
+                current = self.assigned.get(u)
+
+                if current is not None and u != start:
+                    # Drop u back to unassigned
+                    relaxed = [(("z", _SINK), pot_u)]
+                else:
+                    relaxed = []
+
+                for n, w in self.edges[u].items():
+                    if n == current:
+                        continue
+                    relaxed.append((("n", n), -w + pot_u - self.pot_ngo[n]))
+            else:
+                if u in settled_n:
+                    continue
+                settled_n.add(u)
+                pot_u = self.pot_ngo[u]
+
+                # Room left at u once the donation this path brings in lands
+                arriving = parent[key][1]
+                slack = self.capacity[u] - self.load[u] - self.size[arriving] + _KG_EPSILON
+
+                relaxed = []
+                if slack >= 0:
+                    relaxed.append((("z", _SINK), pot_u))
+
+                for d in self.members[u]:
+                    if slack + self.size[d] >= 0:
+                        relaxed.append((("d", d), self.edges[d][u] + pot_u - self.pot_donation[d]))
+
+            for nxt, reduced in relaxed:
+                candidate = d_u + reduced
+                if candidate < dist.get(nxt, float("inf")):
+                    dist[nxt] = candidate
+                    parent[nxt] = key
+                    heapq.heappush(heap, (candidate, counter, nxt[0], nxt[1]))
+                    counter += 1
+
+        return dist, parent, settled_d, settled_n, None
+
+    def _augment(self, parent, target):
+        path = [target]
+        while path[-1] in parent:
+            path.append(parent[path[-1]])
+        path.reverse()
+
+        # path alternates d -> n -> d -> n ... -> z
+        for i in range(len(path) - 1):
+            (kind_u, u), (kind_v, v) = path[i], path[i + 1]
+
+            if kind_u == "d" and kind_v == "n":
+                previous = self.assigned.get(u)
+                if previous is not None:
+                    self.members[previous].discard(u)
+                    self.load[previous] -= self.size[u]
+                self.assigned[u] = v
+                self.members[v].add(u)
+                self.load[v] += self.size[u]
+            elif kind_u == "d" and kind_v == "z":
+                previous = self.assigned.pop(u)
+                self.members[previous].discard(u)
+                self.load[previous] -= self.size[u]
+
+    def _update_potentials(self, dist, settled_d, settled_n, dist_target):
+        for d in settled_d:
+            delta = dist[("d", d)] - dist_target
+            if delta < 0:
+                self.pot_donation[d] += delta
+        for n in settled_n:
+            delta = dist[("n", n)] - dist_target
+            if delta < 0:
+                self.pot_ngo[n] += delta
+
+
+class BatchAllocator:
+    """
+    Periodically plans the assignment of all PENDING donations to verified
+    NGOs and commits the plan through try_claim. Between commits, add_new()
+    pulls donations created since the last sync into the existing plan.
+    NGO.capacity is kg per day: each NGO gets what is left of it after the
+    kg it has already claimed today, and each donation uses its quantity_kg.
+    Only NGOs linked to a user account are planned for, and claims are made
+    under that user's id like any other claim.
+    """
+
+    def __init__(self, cutoff_km=DEFAULT_CUTOFF_KM, max_candidates=DEFAULT_MAX_CANDIDATES,
+                 speed_kmh=DEFAULT_SPEED_KMH):
+        self.cutoff_km = cutoff_km
+        self.max_candidates = max_candidates
+        self.speed_kmh = speed_kmh
+
+        self.solver = None
+        self._ngo_index = GridIndex(cell_km=max(cutoff_km / 2, 1.0))
+        self._ngo_performance = {}
+        self._watermark = 0
+
+    # ---------------------
+    # Loading
+    # ---------------------
+    def _load_ngos(self):
+        from app.models.donation_model import Donation
+        from app.models.ngo_model import NGO
+        from app.models.request_model import Request
+
+        today = datetime.combine(datetime.utcnow().date(), datetime.min.time())
+        claimed_kg = dict(
+            db.session.query(
+                Request.ngo_id,
+                func.sum(func.coalesce(Donation.quantity_kg, UNKNOWN_DONATION_KG))
+            )
+            .join(Request.donation)
+            .filter(Request.created_at >= today)
+            .group_by(Request.ngo_id)
+            .all()
+        )
+
+        capacities = {}
+        self._ngo_index.clear()
+        self._ngo_performance.clear()
+
+        # Plans are keyed on the NGO's users.id, the id every claim is recorded under
+        ngos = NGO.query.filter(NGO.is_verified.is_(True), NGO.user_id.isnot(None)).all()
+        for ngo in ngos:
+            coords = geocode(ngo.area)
+            remaining = (ngo.capacity or 0) - (claimed_kg.get(ngo.user_id) or 0)
+            if coords is None or remaining <= 0:
+                continue
+
+            capacities[ngo.user_id] = remaining
+            self._ngo_index.add(ngo.user_id, *coords)
+            self._ngo_performance[ngo.user_id] = ngo.performance_score or 0
+
+        return capacities
+
+    def _pending_rows(self, after_id=0):
+        from app.models.donation_model import Donation
+
+        return db.session.query(
+            Donation.id, Donation.expiry_hours, Donation.created_at,
+            Donation.latitude, Donation.longitude, Donation.quantity_kg
+        ).filter(
+            Donation.status == "PENDING",
+            Donation.latitude.isnot(None),
+            Donation.id > after_id
+        ).order_by(Donation.id).all()
+
+    def _candidates(self, rows, now):
+        """Yield (donation_id, {ngo_id: weight}, kg) with weights from score_batch."""
+        donation_ids, sizes, expiry, distance, performance, ngo_ids, owners = [], [], [], [], [], [], []
+
+        for donation_id, expiry_hours, created_at, lat, lon, kg in rows:
+            self._watermark = max(self._watermark, donation_id)
+
+            hours_left = expiry_hours
+            if created_at is not None:
+                hours_left -= (now - created_at).total_seconds() / 3600
+            if hours_left <= 0:
+                continue
+
+            donation_ids.append(donation_id)
+            sizes.append(kg if kg is not None else UNKNOWN_DONATION_KG)
+            for ngo_id, km in self._ngo_index.within(lat, lon, self.cutoff_km, self.max_candidates):
+                if km / self.speed_kmh > hours_left:
+                    continue
+                owners.append(len(donation_ids) - 1)
+                ngo_ids.append(ngo_id)
+                expiry.append(expiry_hours)
+                distance.append(km)
+                performance.append(self._ngo_performance[ngo_id])
+
+        candidates = [{} for _ in donation_ids]
+        if ngo_ids:
+            weights = np.rint(score_batch(expiry, distance, performance) * 10).astype(np.int64)
+            for owner, ngo_id, weight in zip(owners, ngo_ids, weights.tolist()):
+                candidates[owner][ngo_id] = weight
+
+        return zip(donation_ids, candidates, sizes)
+
+    # ---------------------
+    # Planning
+    # ---------------------
+    def solve(self):
+        """Full re-plan over every pending donation."""
+        self._watermark = 0
+        self.solver = AssignmentSolver(self._load_ngos())
+        self._insert(self._pending_rows())
+        return self.plan()
+
+    def add_new(self):
+        """Incrementally fold donations created since the last sync into the plan."""
+        if self.solver is None:
+            return self.solve()
+        self._insert(self._pending_rows(after_id=self._watermark))
+        return self.plan()
+
+    def _insert(self, rows):
+        now = datetime.utcnow()
+        for donation_id, candidates, kg in self._candidates(rows, now):
+            if donation_id not in self.solver:
+                self.solver.insert(donation_id, candidates, size=kg)
+
+    def plan(self):
+        if self.solver is None:
+            return []
+        return sorted(
+            (donation_id, ngo_id, self.solver.edges[donation_id][ngo_id] / 10)
+            for donation_id, ngo_id in self.solver.assigned.items()
+        )
+
+    def commit(self):
+        """Claim every planned pair; pairs whose donation was taken meanwhile are skipped."""
+        from app.services import event_bus
+        from app.services.location_service import pending_index
+
+        applied = 0
+        claimed = []
+        for donation_id, ngo_id, score in self.plan():
+            if try_claim(donation_id, ngo_id, priority_score=score) is not None:
+                applied += 1
+                pending_index.discard(donation_id)
+                claimed.append(donation_id)
+
+        db.session.commit()
+        event_bus.donations_claimed(claimed)
+        logger.info("Batch allocation committed %d of %d planned claims", applied, len(self.plan()))
+
+        self.solver = None
+        return applied
+
+
+allocator = BatchAllocator()
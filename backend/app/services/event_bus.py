@@ -0,0 +1,269 @@
+import json
+import logging
+import queue
+import select
+import threading
+import time
+from abc import ABC, abstractmethod
+
+from sqlalchemy import text
+
+from app.utils.serialization import dumps, loads
+
+logger = logging.getLogger(__name__)
+
+# Event types pushed to NGO clients
+DONATION_CREATED = "donation.created"
+DONATION_CLAIMED = "donation.claimed"
+DONATION_EXPIRING = "donation.expiring"
+
+MARKETPLACE = "marketplace"
+
+
+class Subscription:
+    def __init__(self, broker, channel, maxsize):
+        self._broker = broker
+        self.channel = channel
+        self._queue = queue.Queue(maxsize=maxsize)
+
+    def deliver(self, event):
+        # A slow client loses its oldest events rather than blocking publishers
+        while True:
+            try:
+                self._queue.put_nowait(event)
+                return
+            except queue.Full:
+                try:
+                    self._queue.get_nowait()
+                except queue.Empty:
+                    pass
+
+    def get(self, timeout=None):
+        """Next event, or None if nothing arrived within timeout seconds."""
+        try:
+            return self._queue.get(timeout=timeout)
+        except queue.Empty:
+            return None
+
+    def close(self):
+        self._broker.unsubscribe(self)
+
+
+class Broker(ABC):
+    """
+    Pub/sub interface behind the event stream. InProcessBroker only reaches
+    subscribers in the same process; PostgresBroker relays between gunicorn
+    workers and the scheduler. create_app installs one per EVENT_BROKER.
+    """
+
+    @abstractmethod
+    def publish(self, channel, event):
+        ...
+
+    def publish_many(self, channel, events):
+        """Publish events in order; brokers with a per-message cost batch them."""
+        for event in events:
+            self.publish(channel, event)
+
+    @abstractmethod
+    def subscribe(self, channel, maxsize=100):
+        ...
+
+    @abstractmethod
+    def unsubscribe(self, subscription):
+        ...
+
+
+class InProcessBroker(Broker):
+    def __init__(self):
+        self._subscribers = {}
+        self._lock = threading.Lock()
+
+    def publish(self, channel, event):
+        with self._lock:
+            subscribers = list(self._subscribers.get(channel, ()))
+        for subscription in subscribers:
+            subscription.deliver(event)
+
+    def subscribe(self, channel, maxsize=100):
+        subscription = Subscription(self, channel, maxsize)
+        with self._lock:
+            self._subscribers.setdefault(channel, set()).add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription):
+        with self._lock:
+            subscribers = self._subscribers.get(subscription.channel)
+            if subscribers is not None:
+                subscribers.discard(subscription)
+                if not subscribers:
+                    del self._subscribers[subscription.channel]
+
+    def subscriber_count(self, channel):
+        with self._lock:
+            return len(self._subscribers.get(channel, ()))
+
+
+class PostgresBroker(Broker):
+    """
+    Fans events out across processes with PostgreSQL LISTEN/NOTIFY, so
+    gunicorn workers, the preloading master and `flask expiry-scheduler`
+    all reach every stream. Each process delivers to its own subscribers
+    from one listener thread, started on first subscribe so it runs in the
+    worker rather than the master it was forked from. NOTIFY is best
+    effort: events published while a listener reconnects are lost, which
+    the stream already tolerates. publish_many packs events into as few
+    NOTIFYs as fit the payload cap and sends them in one transaction.
+    """
+
+    PG_CHANNEL = "wfl_events"
+    # NOTIFY payloads are capped at 8000 bytes; leave room for the envelope
+    MAX_PAYLOAD_BYTES = 7800
+
+    def __init__(self, engine, reconnect_seconds=5):
+        self._engine = engine
+        self._reconnect_seconds = reconnect_seconds
+        self._local = InProcessBroker()
+        self._listener = None
+        self._lock = threading.Lock()
+
+    def publish(self, channel, event):
+        self.publish_many(channel, [event])
+
+    def _batches(self, events):
+        batch, size = [], 0
+        for event in events:
+            event_size = len(dumps(event)) + 1
+            if batch and size + event_size > self.MAX_PAYLOAD_BYTES:
+                yield batch
+                batch, size = [], 0
+            batch.append(event)
+            size += event_size
+        if batch:
+            yield batch
+
+    def publish_many(self, channel, events):
+        params = [
+            {"pg_channel": self.PG_CHANNEL,
+             "payload": dumps({"channel": channel, "events": batch}).decode()}
+            for batch in self._batches(events)
+        ]
+        if not params:
+            return
+        with self._engine.connect() as conn:
+            conn.execute(text("SELECT pg_notify(:pg_channel, :payload)"), params)
+            conn.commit()
+
+    def subscribe(self, channel, maxsize=100):
+        self._ensure_listener()
+        return self._local.subscribe(channel, maxsize)
+
+    def unsubscribe(self, subscription):
+        self._local.unsubscribe(subscription)
+
+    def subscriber_count(self, channel):
+        return self._local.subscriber_count(channel)
+
+    def _ensure_listener(self):
+        with self._lock:
+            if self._listener is None or not self._listener.is_alive():
+                self._listener = threading.Thread(
+                    target=self._listen_forever, name="event-listener", daemon=True
+                )
+                self._listener.start()
+
+    def _listen_forever(self):
+        while True:
+            try:
+                self._listen()
+            except Exception:
+                logger.exception("Event listener lost its connection")
+            time.sleep(self._reconnect_seconds)
+
+    def _listen(self):
+        # A dedicated connection held outside the pool for as long as it listens
+        raw = self._engine.raw_connection()
+        raw.detach()
+        conn = raw.driver_connection
+        try:
+            # A pre-ping may have opened a transaction; autocommit needs none
+            conn.rollback()
+            conn.autocommit = True
+            with conn.cursor() as cursor:
+                cursor.execute(f"LISTEN {self.PG_CHANNEL}")
+
+            while True:
+                if select.select([conn], [], [], 30) == ([], [], []):
+                    continue
+                conn.poll()
+                while conn.notifies:
+                    notify = conn.notifies.pop(0)
+                    message = loads(notify.payload)
+                    self._local.publish_many(message["channel"], message["events"])
+        finally:
+            raw.close()
+
+
+_broker = InProcessBroker()
+
+
+def get_broker():
+    return _broker
+
+
+def set_broker(broker):
+    global _broker
+    _broker = broker
+
+
+# =====================
+# Publishing helpers
+# =====================
+def publish(event_type, data):
+    publish_many(event_type, [data])
+
+
+def publish_many(event_type, items):
+    """One event per item, sent together; use for everything one commit produced."""
+    ts = time.time()
+    _broker.publish_many(MARKETPLACE, [{"type": event_type, "data": data, "ts": ts} for data in items])
+
+
+def _created(donation):
+    return {
+        "id": donation.id,
+        "foodType": donation.food_type,
+        "quantity": donation.quantity,
+        "quantityKg": donation.quantity_kg,
+        "expiryHours": donation.expiry_hours,
+        "lat": donation.latitude,
+        "lon": donation.longitude
+    }
+
+
+def donation_created(donation):
+    publish(DONATION_CREATED, _created(donation))
+
+
+def donations_created(donations):
+    publish_many(DONATION_CREATED, [_created(donation) for donation in donations])
+
+
+def donation_claimed(donation_id):
+    publish(DONATION_CLAIMED, {"id": donation_id})
+
+
+def donations_claimed(donation_ids):
+    publish_many(DONATION_CLAIMED, [{"id": donation_id} for donation_id in donation_ids])
+
+
+def donations_expiring(alerts):
+    """alerts: [(donation_id, minutes_left, lat, lon)]."""
+    publish_many(DONATION_EXPIRING, [
+        {"id": donation_id, "minutesLeft": minutes_left, "lat": lat, "lon": lon}
+        for donation_id, minutes_left, lat, lon in alerts
+    ])
+
+
+def format_sse(event):
+    return f"event: {event['type']}\ndata: {json.dumps(event['data'])}\n\n"
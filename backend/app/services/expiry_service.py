@@ -0,0 +1,217 @@
+import heapq
+import logging
+import threading
+import time
+from datetime import datetime, timedelta
+
+from flask import current_app
+from sqlalchemy import func, update
+
+from app import db
+from app.services import event_bus
+from app.services.location_service import pending_index
+from app.utils.cache import TTLCache
+
+logger = logging.getLogger(__name__)
+
+EXPIRED = "EXPIRED"
+
+# Ids per UPDATE when bulk-expiring
+BATCH_SIZE = 500
+
+
+class ExpiryScheduler:
+    """
+    Min-heaps of PENDING donations keyed on expires_at, plus a second heap for
+    near-expiry alerts (expires_at - alert window). Due donations are expired
+    in batched UPDATEs guarded by status = 'PENDING', so a claim that wins the
+    race is never overwritten and running twice is harmless.
+
+    State is rebuilt from one indexed (status, expires_at) scan on start and
+    then kept current by pulling donations with id above a watermark. Ids are
+    not committed in order (a bulk upload can commit after a later single
+    create), so a periodic rescan of every PENDING row picks up the ones the
+    watermark skipped; already scheduled donations are left as they are.
+    """
+
+    def __init__(self, alert_minutes=45, rescan_seconds=300):
+        self.alert_window = timedelta(minutes=alert_minutes)
+        self.rescan_seconds = rescan_seconds
+        self._scanned_at = 0.0
+        self._expiries = []
+        self._alerts = []
+        self._scheduled = {}
+        self._watermark = 0
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._scheduled)
+
+    def schedule(self, donation_id, expires_at, lat=None, lon=None):
+        with self._lock:
+            if donation_id in self._scheduled:
+                return
+            self._scheduled[donation_id] = (lat, lon)
+            self._watermark = max(self._watermark, donation_id)
+            heapq.heappush(self._expiries, (expires_at, donation_id))
+            heapq.heappush(self._alerts, (expires_at - self.alert_window, donation_id, expires_at))
+
+    def _load(self, after_id=0):
+        from app.models.donation_model import Donation
+
+        rows = db.session.query(
+            Donation.id, Donation.expires_at, Donation.latitude, Donation.longitude
+        ).filter(
+            Donation.status == "PENDING",
+            Donation.expires_at.isnot(None),
+            Donation.id > after_id
+        ).order_by(Donation.expires_at)
+
+        for donation_id, expires_at, lat, lon in rows.yield_per(1000):
+            self.schedule(donation_id, expires_at, lat, lon)
+
+    def rebuild(self):
+        with self._lock:
+            self._expiries.clear()
+            self._alerts.clear()
+            self._scheduled.clear()
+            self._watermark = 0
+        self._load()
+        self._scanned_at = time.monotonic()
+
+    def sync(self):
+        if time.monotonic() - self._scanned_at > self.rescan_seconds:
+            self._load()
+            self._scanned_at = time.monotonic()
+        else:
+            self._load(after_id=self._watermark)
+
+    def next_due(self):
+        with self._lock:
+            times = [heap[0][0] for heap in (self._expiries, self._alerts) if heap]
+        return min(times) if times else None
+
+    def _pop_due(self, heap, now):
+        due = []
+        with self._lock:
+            while heap and heap[0][0] <= now:
+                due.append(heapq.heappop(heap))
+        return due
+
+    def tick(self, now=None):
+        """Raise due alerts and expire due donations; returns rows expired."""
+        from app.models.donation_model import Donation
+
+        now = now or datetime.utcnow()
+
+        alerts = [alert for alert in self._pop_due(self._alerts, now) if alert[2] > now]
+
+        # Claims happen in other processes, so ask the database which are still up
+        pending = set()
+        for start in range(0, len(alerts), BATCH_SIZE):
+            chunk = [donation_id for _, donation_id, _ in alerts[start:start + BATCH_SIZE]]
+            pending.update(donation_id for donation_id, in db.session.query(Donation.id).filter(
+                Donation.id.in_(chunk), Donation.status == "PENDING"
+            ))
+
+        expiring = []
+        for _, donation_id, expires_at in alerts:
+            lat, lon = self._scheduled.get(donation_id, (None, None))
+            if donation_id in pending:
+                minutes_left = int((expires_at - now).total_seconds() // 60)
+                expiring.append((donation_id, minutes_left, lat, lon))
+        event_bus.donations_expiring(expiring)
+
+        due = [donation_id for _, donation_id in self._pop_due(self._expiries, now)]
+        expired = 0
+
+        for start in range(0, len(due), BATCH_SIZE):
+            chunk = due[start:start + BATCH_SIZE]
+            result = db.session.execute(
+                update(Donation)
+                .where(Donation.id.in_(chunk), Donation.status == "PENDING")
+                .values(status=EXPIRED)
+                .execution_options(synchronize_session=False)
+            )
+            db.session.commit()
+            expired += result.rowcount
+
+        with self._lock:
+            for donation_id in due:
+                self._scheduled.pop(donation_id, None)
+        for donation_id in due:
+            pending_index.discard(donation_id)
+
+        if expired:
+            logger.info("Expired %d donations", expired)
+        return expired
+
+    def run_forever(self, poll_seconds=30, stop_event=None):
+        self.rebuild()
+        while stop_event is None or not stop_event.is_set():
+            try:
+                self.sync()
+                self.tick()
+            except Exception:
+                logger.exception("Expiry scheduler tick failed")
+                db.session.rollback()
+            finally:
+                db.session.remove()
+
+            next_due = self.next_due()
+            wait = poll_seconds
+            if next_due is not None:
+                wait = min(wait, max((next_due - datetime.utcnow()).total_seconds(), 0.5))
+            if stop_event is not None:
+                stop_event.wait(wait)
+            else:
+                time.sleep(wait)
+
+
+scheduler = ExpiryScheduler()
+
+
+def start_background(app):
+    """Run the scheduler on a daemon thread of this process."""
+    scheduler.alert_window = timedelta(minutes=app.config.get("EXPIRY_ALERT_MINUTES", 45))
+
+    def run():
+        with app.app_context():
+            scheduler.run_forever(app.config.get("EXPIRY_POLL_SECONDS", 30))
+
+    thread = threading.Thread(target=run, name="expiry-scheduler", daemon=True)
+    thread.start()
+    return thread
+
+
+# =====================
+# Admin alerts
+# =====================
+_alerts_cache = TTLCache(maxsize=1, ttl=10)
+
+
+def _compute_alerts():
+    from app.models.donation_model import Donation
+
+    minutes = current_app.config.get("EXPIRY_ALERT_MINUTES", 45)
+    now = datetime.utcnow()
+
+    expiring = db.session.query(func.count(Donation.id)).filter(
+        Donation.status == "PENDING",
+        Donation.expires_at > now,
+        Donation.expires_at <= now + timedelta(minutes=minutes)
+    ).scalar() or 0
+
+    if not expiring:
+        return []
+
+    return [{
+        "type": "CRITICAL",
+        "msg": f"{expiring} donations expiring within {minutes} mins.",
+        "time": "Just now"
+    }]
+
+
+def expiry_alerts():
+    _alerts_cache.ttl = current_app.config.get("KPI_CACHE_SECONDS", 10)
+    return _alerts_cache.get_or_set("alerts", _compute_alerts)
@@ -0,0 +1,108 @@
+from datetime import datetime
+
+from app import db
+from app.models.donation_model import Donation
+from app.models.pickup_model import Pickup
+from app.models.request_model import Request
+from app.utils.serialization import RowSchema
+from app.utils.streaming import STREAM_BATCH_ROWS, batched
+
+FORMATS = ("ndjson", "csv")
+
+
+def _iso(value):
+    return value.isoformat() if value is not None else None
+
+
+# dataset -> (fields, time column used by from/to, select_from/join setup)
+DATASETS = {
+    "donations": (
+        (
+            ("id", Donation.id),
+            ("donorId", Donation.donor_id),
+            ("foodType", Donation.food_type),
+            ("quantity", Donation.quantity),
+            ("quantityKg", Donation.quantity_kg),
+            ("expiryHours", Donation.expiry_hours),
+            ("pickupAddress", Donation.pickup_address),
+            ("latitude", Donation.latitude),
+            ("longitude", Donation.longitude),
+            ("status", Donation.status),
+            ("createdAt", Donation.created_at, _iso),
+            ("expiresAt", Donation.expires_at, _iso),
+        ),
+        Donation.created_at,
+        lambda query: query,
+    ),
+    "requests": (
+        (
+            ("id", Request.id),
+            ("donationId", Request.donation_id),
+            ("ngoId", Request.ngo_id),
+            ("priorityScore", Request.priority_score),
+            ("status", Request.status),
+            ("createdAt", Request.created_at, _iso),
+        ),
+        Request.created_at,
+        lambda query: query,
+    ),
+    "pickups": (
+        (
+            ("id", Pickup.id),
+            ("requestId", Pickup.request_id),
+            ("donationId", Request.donation_id),
+            ("ngoId", Request.ngo_id),
+            ("status", Pickup.status),
+            ("verifiedAt", Pickup.verified_at, _iso),
+            ("claimedAt", Request.created_at, _iso),
+        ),
+        Request.created_at,
+        lambda query: query.select_from(Pickup).join(Pickup.request),
+    ),
+}
+
+SCHEMAS = {name: RowSchema(*fields) for name, (fields, _, _) in DATASETS.items()}
+
+
+def header(dataset):
+    return [field[0] for field in DATASETS[dataset][0]]
+
+
+def _day_bounds(start, end):
+    lo = datetime.combine(start, datetime.min.time()) if start else None
+    hi = datetime.combine(end, datetime.max.time()) if end else None
+    return lo, hi
+
+
+def row_batches(dataset, start=None, end=None, batch_size=STREAM_BATCH_ROWS):
+    """
+    Lists of raw row tuples in id order. yield_per streams through a
+    server-side cursor on PostgreSQL, so memory holds one batch at a time.
+    """
+    fields, time_column, setup = DATASETS[dataset]
+    schema = SCHEMAS[dataset]
+
+    query = setup(db.session.query(*schema.columns))
+
+    lo, hi = _day_bounds(start, end)
+    if lo is not None:
+        query = query.filter(time_column >= lo)
+    if hi is not None:
+        query = query.filter(time_column <= hi)
+
+    query = query.order_by(schema.columns[0]).yield_per(batch_size)
+    return batched(query, batch_size)
+
+
+def dict_batches(dataset, start=None, end=None):
+    schema = SCHEMAS[dataset]
+    for batch in row_batches(dataset, start, end):
+        yield schema.dicts(batch)
+
+
+def csv_batches(dataset, start=None, end=None):
+    """Row tuples with datetimes rendered the same way as the JSON export."""
+    schema = SCHEMAS[dataset]
+    names = header(dataset)
+    for batch in row_batches(dataset, start, end):
+        yield [[row[name] for name in names] for row in schema.dicts(batch)]
@@ -0,0 +1,325 @@
+import codecs
+import csv
+import io
+import json
+import logging
+from datetime import datetime, timedelta
+
+from sqlalchemy import insert
+from sqlalchemy.exc import SQLAlchemyError
+
+from app import db
+from app.models.donation_model import Donation
+from app.services import event_bus, outbox_service
+from app.services.location_service import geocode, pending_index
+from app.services.quantity_service import parse_quantity
+
+logger = logging.getLogger(__name__)
+
+READ_SIZE = 64 * 1024
+
+# Upload formats by Content-Type (parameters such as charset are ignored)
+JSON = "application/json"
+NDJSON = "application/x-ndjson"
+CSV = "text/csv"
+
+CONTENT_TYPES = {
+    JSON: JSON,
+    NDJSON: NDJSON,
+    "application/jsonl": NDJSON,
+    "application/jsonlines": NDJSON,
+    CSV: CSV,
+}
+
+
+class IngestError(ValueError):
+    """The upload itself cannot be read any further (not a single bad row)."""
+
+
+def upload_format(content_type):
+    return CONTENT_TYPES.get((content_type or "").split(";")[0].strip().lower())
+
+
+# =====================
+# Streaming parsers
+# =====================
+# Each parser yields (row_number, dict | None, error | None) and never holds
+# more than one row plus one read buffer in memory.
+def _iter_text(stream):
+    decoder = codecs.getincrementaldecoder("utf-8-sig")()
+    while True:
+        chunk = stream.read(READ_SIZE)
+        if not chunk:
+            tail = decoder.decode(b"", final=True)
+            if tail:
+                yield tail
+            return
+        text = decoder.decode(chunk)
+        if text:
+            yield text
+
+
+def iter_json_array(stream, max_row_bytes):
+    decoder = json.JSONDecoder()
+    chunks = _iter_text(stream)
+    buffer = ""
+    pos = 0
+    started = False
+    expect_value = True
+    row = 0
+
+    while True:
+        # Skip whitespace and separators between array items
+        while pos < len(buffer) and buffer[pos] in " \t\r\n":
+            pos += 1
+
+        if pos >= len(buffer):
+            chunk = next(chunks, None)
+            if chunk is None:
+                raise IngestError("Unexpected end of JSON array")
+            buffer = buffer[pos:] + chunk
+            pos = 0
+            continue
+
+        char = buffer[pos]
+        if not started:
+            if char != "[":
+                raise IngestError("Expected a JSON array")
+            started = True
+            pos += 1
+            continue
+
+        if char == "]" and (row == 0 or not expect_value):
+            return
+        if char == "," and not expect_value:
+            expect_value = True
+            pos += 1
+            continue
+        if not expect_value:
+            raise IngestError(f"Expected ',' or ']' after row {row}")
+
+        try:
+            value, end = decoder.raw_decode(buffer, pos)
+        except json.JSONDecodeError:
+            # Possibly a row split across reads; pull more text and retry
+            if len(buffer) - pos > max_row_bytes:
+                raise IngestError(f"Row {row + 1} is not valid JSON or exceeds {max_row_bytes} bytes")
+            chunk = next(chunks, None)
+            if chunk is None:
+                raise IngestError(f"Row {row + 1} is not valid JSON")
+            buffer = buffer[pos:] + chunk
+            pos = 0
+            continue
+
+        # A number or literal at the very end of the buffer may be truncated
+        if end == len(buffer) and not isinstance(value, (dict, list, str)):
+            chunk = next(chunks, None)
+            if chunk is not None:
+                buffer = buffer[pos:] + chunk
+                pos = 0
+                continue
+
+        row += 1
+        expect_value = False
+        pos = end
+        if isinstance(value, dict):
+            yield row, value, None
+        else:
+            yield row, None, "Row must be a JSON object"
+
+        # Drop consumed text so the buffer stays one read plus one row
+        if pos > READ_SIZE:
+            buffer = buffer[pos:]
+            pos = 0
+
+
+def iter_ndjson(stream, max_row_bytes):
+    # readline on the raw request stream reads a few bytes at a time
+    stream = io.BufferedReader(stream, READ_SIZE)
+    row = 0
+    while True:
+        line = stream.readline(max_row_bytes + 1)
+        if not line:
+            return
+
+        if len(line) > max_row_bytes and not line.endswith(b"\n"):
+            # Consume the rest of the oversized line before moving on
+            while line and not line.endswith(b"\n"):
+                line = stream.readline(READ_SIZE)
+            row += 1
+            yield row, None, f"Row exceeds {max_row_bytes} bytes"
+            continue
+
+        line = line.strip()
+        if not line:
+            continue
+
+        row += 1
+        try:
+            value = json.loads(line)
+        except (ValueError, UnicodeDecodeError):
+            yield row, None, "Row is not valid JSON"
+            continue
+
+        if isinstance(value, dict):
+            yield row, value, None
+        else:
+            yield row, None, "Row must be a JSON object"
+
+
+def iter_csv(stream, max_row_bytes):
+    csv.field_size_limit(max_row_bytes)
+    text = io.TextIOWrapper(io.BufferedReader(stream, READ_SIZE), encoding="utf-8-sig", newline="")
+    reader = csv.DictReader(text)
+
+    row = 0
+    while True:
+        try:
+            record = next(reader)
+        except StopIteration:
+            return
+        except (csv.Error, UnicodeDecodeError) as exc:
+            raise IngestError(f"Row {row + 1}: {exc}")
+
+        row += 1
+        if None in record:
+            yield row, None, "Row has more fields than the header"
+            continue
+        yield row, record, None
+
+
+PARSERS = {JSON: iter_json_array, NDJSON: iter_ndjson, CSV: iter_csv}
+
+
+# =====================
+# Validation
+# =====================
+def _text(data, key, max_length, required=True):
+    value = data.get(key)
+    if value is None or (isinstance(value, str) and not value.strip()):
+        if required:
+            raise ValueError(f"{key} is required")
+        return None
+
+    if isinstance(value, (dict, list, bool)):
+        raise ValueError(f"{key} must be a string")
+
+    value = str(value).strip()
+    if max_length and len(value) > max_length:
+        raise ValueError(f"{key} must be at most {max_length} characters")
+    return value
+
+
+def validate_row(data):
+    """Row dict from any upload format -> Donation column values. Raises ValueError."""
+    expiry = data.get("expiryHours")
+    try:
+        if isinstance(expiry, bool) or expiry is None:
+            raise ValueError
+        expiry_hours = int(str(expiry).strip())
+    except ValueError:
+        raise ValueError("expiryHours must be a whole number of hours")
+    if expiry_hours <= 0:
+        raise ValueError("expiryHours must be positive")
+
+    return {
+        "food_type": _text(data, "foodType", 255),
+        "quantity": _text(data, "quantity", 100),
+        "expiry_hours": expiry_hours,
+        "pickup_address": _text(data, "pickupAddress", 255),
+        "notes": _text(data, "notes", None, required=False),
+    }
+
+
+# =====================
+# Ingestion
+# =====================
+def _insert_chunk(donor_id, chunk):
+    """Insert validated rows in one transaction; returns the transient Donations."""
+    now = datetime.utcnow()
+    geocoded = {}
+    params = []
+
+    for _, values in chunk:
+        address = values["pickup_address"]
+        if address not in geocoded:
+            geocoded[address] = geocode(address)
+        lat, lon = geocoded[address] or (None, None)
+
+        params.append({
+            **values,
+            "donor_id": donor_id,
+            "status": "PENDING",
+            "created_at": now,
+            "expires_at": now + timedelta(hours=values["expiry_hours"]),
+            "quantity_kg": parse_quantity(values["quantity"], values["food_type"]),
+            "latitude": lat,
+            "longitude": lon,
+        })
+
+    # One executemany (batched multi-row INSERT ... RETURNING) per chunk
+    ids = db.session.scalars(
+        insert(Donation).returning(Donation.id, sort_by_parameter_order=True),
+        params
+    ).all()
+
+    donations = [Donation(id=donation_id, **p) for donation_id, p in zip(ids, params)]
+    outbox_service.donations_created(donations)
+    db.session.commit()
+    return donations
+
+
+def _flush(donor_id, pending):
+    """pending: [(row, values, error)] in upload order; yields their results."""
+    chunk = [(row, values) for row, values, error in pending if error is None]
+    saved = {}
+    failed = None
+
+    if chunk:
+        try:
+            donations = _insert_chunk(donor_id, chunk)
+        except SQLAlchemyError:
+            db.session.rollback()
+            logger.exception("Bulk donation chunk of %d rows failed", len(chunk))
+            failed = "Could not be saved"
+        else:
+            for (row, _), donation in zip(chunk, donations):
+                pending_index.add(donation)
+                saved[row] = donation.id
+            # One NOTIFY for the chunk rather than one per row
+            event_bus.donations_created(donations)
+
+    for row, _, error in pending:
+        if error is None and failed is None:
+            yield {"row": row, "id": saved[row]}
+        else:
+            yield {"row": row, "error": error or failed}
+
+
+def ingest(donor_id, stream, fmt, chunk_size=500, max_row_bytes=64 * 1024):
+    """
+    Validate and insert donations from an upload stream, yielding one result
+    per row ({"row", "id"} or {"row", "error"}) in upload order. Rows are
+    inserted chunk_size at a time, each chunk in its own transaction, so rows
+    before a malformed upload tail stay saved.
+    """
+    pending = []
+    try:
+        for row, data, error in PARSERS[fmt](stream, max_row_bytes):
+            values = None
+            if error is None:
+                try:
+                    values = validate_row(data)
+                except ValueError as exc:
+                    error = str(exc)
+
+            pending.append((row, values, error))
+            if len(pending) >= chunk_size:
+                yield from _flush(donor_id, pending)
+                pending = []
+    except IngestError as exc:
+        yield from _flush(donor_id, pending)
+        yield {"row": None, "error": str(exc)}
+        return
+
+    yield from _flush(donor_id, pending)
@@ -0,0 +1,139 @@
+from datetime import datetime
+
+from flask import current_app
+from sqlalchemy import func
+from sqlalchemy.dialects import postgresql, sqlite
+
+from app import db
+from app.models.kpi_model import KpiCounter
+from app.utils.cache import TTLCache
+
+# Counter names
+LIVE_REQUESTS = "live_requests"
+PICKUPS_TOTAL = "pickups_total"
+PICKUPS_COMPLETED = "pickups_completed"
+
+
+def saved_key(day):
+    return f"saved_kg:{day.isoformat()}"
+
+
+_overview_cache = TTLCache(maxsize=1, ttl=10)
+
+
+# =====================
+# Write path
+# =====================
+def bump(name, delta=1):
+    """Add delta to a counter inside the caller's transaction (upsert)."""
+    now = datetime.utcnow()
+    dialect = db.session.get_bind().dialect.name
+
+    if dialect in ("postgresql", "sqlite"):
+        insert = postgresql.insert if dialect == "postgresql" else sqlite.insert
+        stmt = insert(KpiCounter).values(name=name, value=delta, updated_at=now)
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[KpiCounter.name],
+            set_={"value": KpiCounter.value + delta, "updated_at": now}
+        )
+        db.session.execute(stmt)
+        return
+
+    updated = db.session.query(KpiCounter).filter_by(name=name).update(
+        {"value": KpiCounter.value + delta, "updated_at": now},
+        synchronize_session=False
+    )
+    if not updated:
+        db.session.add(KpiCounter(name=name, value=delta, updated_at=now))
+
+
+def saved_totals(donations):
+    """{ISO day: kg} over donations with a parsed weight, keyed by creation day."""
+    totals = {}
+    for donation in donations:
+        if not donation.quantity_kg:
+            continue
+        day = (donation.created_at or datetime.utcnow()).date().isoformat()
+        totals[day] = totals.get(day, 0) + donation.quantity_kg
+    return totals
+
+
+def record_saved(totals):
+    """Apply saved_totals(); one upsert per day."""
+    for day, total in totals.items():
+        bump(f"saved_kg:{day}", total)
+
+
+def record_claim():
+    bump(LIVE_REQUESTS)
+    bump(PICKUPS_TOTAL)
+
+
+def record_pickup_verified():
+    bump(PICKUPS_COMPLETED)
+
+
+# =====================
+# Read path
+# =====================
+def _read_counters(names):
+    rows = db.session.query(KpiCounter.name, KpiCounter.value) \
+        .filter(KpiCounter.name.in_(names)).all()
+    values = dict.fromkeys(names, 0)
+    values.update(rows)
+    return values
+
+
+def _compute_overview():
+    today = saved_key(datetime.utcnow().date())
+    counters = _read_counters([today, LIVE_REQUESTS, PICKUPS_TOTAL, PICKUPS_COMPLETED])
+
+    total_pickups = counters[PICKUPS_TOTAL]
+    completed_pickups = counters[PICKUPS_COMPLETED]
+    fulfillment_rate = round((completed_pickups / total_pickups) * 100, 2) if total_pickups else 0
+
+    saved_today = counters[today]
+    if float(saved_today).is_integer():
+        saved_today = int(saved_today)
+
+    return {
+        "totalSavedToday": f"{saved_today} kg",
+        "liveRequests": int(counters[LIVE_REQUESTS]),
+        "avgPickup": "38m",
+        "fulfillmentRate": f"{fulfillment_rate}%"
+    }
+
+
+def overview_kpis():
+    _overview_cache.ttl = current_app.config.get("KPI_CACHE_SECONDS", 10)
+    return _overview_cache.get_or_set("overview", _compute_overview)
+
+
+# =====================
+# Rebuild
+# =====================
+def rebuild():
+    """Recompute every counter from the raw tables (backfill / repair)."""
+    from app.models.donation_model import Donation
+    from app.models.request_model import Request
+    from app.models.pickup_model import Pickup
+
+    counters = {
+        LIVE_REQUESTS: db.session.query(func.count(Request.id)).scalar() or 0,
+        PICKUPS_TOTAL: db.session.query(func.count(Pickup.id)).scalar() or 0,
+        PICKUPS_COMPLETED: db.session.query(func.count(Pickup.id))
+        .filter(Pickup.verified_at.isnot(None)).scalar() or 0,
+    }
+
+    day = func.date(Donation.created_at)
+    for created_on, total in db.session.query(day, func.sum(Donation.quantity_kg)) \
+            .filter(Donation.created_at.isnot(None)).group_by(day).all():
+        created_on = created_on if isinstance(created_on, str) else created_on.isoformat()
+        counters[f"saved_kg:{created_on}"] = total or 0
+
+    db.session.query(KpiCounter).delete(synchronize_session=False)
+    db.session.add_all(KpiCounter(name=name, value=value) for name, value in counters.items())
+    db.session.commit()
+
+    _overview_cache.clear()
+    return len(counters)
@@ -0,0 +1,252 @@
+import csv
+import math
+import os
+import re
+import threading
+import time
+
+from app import db
+
+EARTH_RADIUS_KM = 6371.0
+
+# Used when either side of a donation–NGO pair could not be geocoded
+DEFAULT_DISTANCE_KM = 5
+
+# =====================
+# Offline gazetteer
+# =====================
+# Known pickup areas → (lat, lon). Extend via GAZETTEER_PATH (CSV: name,lat,lon).
+GAZETTEER = {
+    "downtown": (22.5726, 88.3639),
+    "sector 5": (22.5697, 88.4337),
+    "salt lake": (22.5867, 88.4171),
+    "east wing plaza": (22.5355, 88.3952),
+    "west side corporate hub": (22.5850, 88.3050),
+    "suburban lane": (22.6420, 88.4312),
+    "new town": (22.5958, 88.4795),
+    "park street": (22.5535, 88.3520),
+    "howrah": (22.5958, 88.2636),
+    "ballygunge": (22.5280, 88.3659),
+}
+
+_COORD_RE = re.compile(r"^\s*(-?\d+(?:\.\d+)?)\s*,\s*(-?\d+(?:\.\d+)?)\s*$")
+
+_gazetteer_keys = None
+
+
+def _load_gazetteer():
+    global _gazetteer_keys
+
+    path = os.getenv("GAZETTEER_PATH")
+    if path and os.path.exists(path):
+        with open(path, newline="", encoding="utf-8") as fh:
+            for row in csv.reader(fh):
+                if len(row) >= 3:
+                    GAZETTEER[row[0].strip().lower()] = (float(row[1]), float(row[2]))
+
+    # Longest names first so "sector 5" wins over "sector"
+    _gazetteer_keys = sorted(GAZETTEER, key=len, reverse=True)
+
+
+def _match_place(address):
+    if _gazetteer_keys is None:
+        _load_gazetteer()
+
+    text = address.lower()
+    for key in _gazetteer_keys:
+        if key in text:
+            return key
+
+    return None
+
+
+def geocode(address):
+    """Resolve an address to (lat, lon) using the offline gazetteer, or None."""
+    if not address:
+        return None
+
+    match = _COORD_RE.match(address)
+    if match:
+        return float(match.group(1)), float(match.group(2))
+
+    place = _match_place(address)
+    return GAZETTEER[place] if place else None
+
+
+def resolve_area(address):
+    """Gazetteer place name an address falls in, or None."""
+    return _match_place(address) if address else None
+
+
+def haversine_km(lat1, lon1, lat2, lon2):
+    p1, p2 = math.radians(lat1), math.radians(lat2)
+    dp = p2 - p1
+    dl = math.radians(lon2 - lon1)
+    a = math.sin(dp / 2) ** 2 + math.cos(p1) * math.cos(p2) * math.sin(dl / 2) ** 2
+    return 2 * EARTH_RADIUS_KM * math.asin(math.sqrt(a))
+
+
+def distance_between(donation, user):
+    if None in (donation.latitude, donation.longitude, user.latitude, user.longitude):
+        return DEFAULT_DISTANCE_KM
+    return haversine_km(donation.latitude, donation.longitude, user.latitude, user.longitude)
+
+
+# =====================
+# Spatial index of pending donations
+# =====================
+class GridIndex:
+    """Uniform lat/lon grid; radius queries only touch the cells they overlap."""
+
+    def __init__(self, cell_km=2.0):
+        self.cell_deg = cell_km / 111.0
+        self._cells = {}
+        self._points = {}
+
+    def _cell(self, lat, lon):
+        return int(math.floor(lat / self.cell_deg)), int(math.floor(lon / self.cell_deg))
+
+    def __len__(self):
+        return len(self._points)
+
+    def __contains__(self, key):
+        return key in self._points
+
+    def add(self, key, lat, lon):
+        self.remove(key)
+        cell = self._cell(lat, lon)
+        self._points[key] = (lat, lon, cell)
+        self._cells.setdefault(cell, set()).add(key)
+
+    def remove(self, key):
+        point = self._points.pop(key, None)
+        if point is None:
+            return
+        bucket = self._cells.get(point[2])
+        if bucket is not None:
+            bucket.discard(key)
+            if not bucket:
+                del self._cells[point[2]]
+
+    def clear(self):
+        self._cells.clear()
+        self._points.clear()
+
+    def within(self, lat, lon, radius_km, limit=None):
+        """Return [(key, distance_km)] inside radius_km, nearest first."""
+        dlat = radius_km / 111.0
+        dlon = radius_km / (111.0 * max(math.cos(math.radians(lat)), 0.01))
+
+        row_lo, col_lo = self._cell(lat - dlat, lon - dlon)
+        row_hi, col_hi = self._cell(lat + dlat, lon + dlon)
+
+        hits = []
+        for row in range(row_lo, row_hi + 1):
+            for col in range(col_lo, col_hi + 1):
+                for key in self._cells.get((row, col), ()):
+                    plat, plon, _ = self._points[key]
+                    dist = haversine_km(lat, lon, plat, plon)
+                    if dist <= radius_km:
+                        hits.append((key, dist))
+
+        hits.sort(key=lambda h: (h[1], h[0]))
+        return hits[:limit] if limit else hits
+
+
+class PendingDonationIndex:
+    """
+    Process-local index of PENDING donations with coordinates.
+
+    New rows are pulled incrementally by id watermark; a periodic full rebuild
+    drops donations that other workers claimed. Callers still filter the
+    returned ids by status in SQL, so a stale entry never leaks a claimed row.
+    version changes whenever the indexed set may have.
+    """
+
+    def __init__(self, cell_km=2.0, rebuild_seconds=300):
+        self._grid = GridIndex(cell_km)
+        self._lock = threading.Lock()
+        self._watermark = 0
+        self._built_at = 0.0
+        self.rebuild_seconds = rebuild_seconds
+        self.version = 0
+
+    def _load(self, after_id=0):
+        from app.models.donation_model import Donation
+
+        rows = db.session.query(
+            Donation.id, Donation.latitude, Donation.longitude
+        ).filter(
+            Donation.status == "PENDING",
+            Donation.latitude.isnot(None),
+            Donation.id > after_id
+        ).all()
+
+        for donation_id, lat, lon in rows:
+            self._grid.add(donation_id, lat, lon)
+            self._watermark = max(self._watermark, donation_id)
+        if rows:
+            self.version += 1
+
+    def sync(self):
+        with self._lock:
+            if time.monotonic() - self._built_at > self.rebuild_seconds:
+                self._grid.clear()
+                self._watermark = 0
+                self._load()
+                self._built_at = time.monotonic()
+                self.version += 1
+            else:
+                self._load(after_id=self._watermark)
+
+    def add(self, donation):
+        if donation.latitude is None or donation.longitude is None:
+            return
+        with self._lock:
+            self._grid.add(donation.id, donation.latitude, donation.longitude)
+            self.version += 1
+
+    def discard(self, donation_id):
+        with self._lock:
+            if donation_id in self._grid:
+                self._grid.remove(donation_id)
+                self.version += 1
+
+    def nearby(self, lat, lon, radius_km, limit=None):
+        self.sync()
+        with self._lock:
+            return self._grid.within(lat, lon, radius_km, limit)
+
+
+pending_index = PendingDonationIndex()
+
+
+# =====================
+# Backfill
+# =====================
+def backfill_coordinates(batch_size=500):
+    from app.models.donation_model import Donation
+    from app.models.user_model import User
+
+    updated = 0
+    for model, column in ((Donation, "pickup_address"), (User, "location")):
+        last_id = 0
+        while True:
+            rows = model.query.filter(
+                model.id > last_id,
+                model.latitude.is_(None),
+                getattr(model, column).isnot(None)
+            ).order_by(model.id).limit(batch_size).all()
+
+            if not rows:
+                break
+
+            for row in rows:
+                coords = geocode(getattr(row, column))
+                if coords:
+                    row.latitude, row.longitude = coords
+                    updated += 1
+            last_id = rows[-1].id
+            db.session.commit()
+
+    return updated
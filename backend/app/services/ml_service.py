@@ -0,0 +1,233 @@
+import json
+import threading
+from datetime import datetime, timedelta
+
+import numpy as np
+from flask import current_app
+from sqlalchemy import func
+
+from app import db
+from app.models.forecast_model import ForecastModel
+from app.models.prediction_model import Prediction
+from app.services.location_service import resolve_area
+
+KINDS = ("demand", "waste")
+
+# Statuses that count towards each series
+_KIND_STATUSES = {
+    "demand": ("ALLOCATED", "PICKED_UP"),
+    "waste": ("EXPIRED",),
+}
+
+UNKNOWN_AREA = "unknown"
+
+
+def period_start(day):
+    """Forecasts are weekly; periods start on Monday."""
+    return day - timedelta(days=day.weekday())
+
+
+def current_period():
+    return period_start(datetime.utcnow().date())
+
+
+def _as_date(value):
+    if isinstance(value, str):
+        return datetime.strptime(value[:10], "%Y-%m-%d").date()
+    return value
+
+
+# =====================
+# History
+# =====================
+def _history(kind, first_period, periods):
+    """(areas, Y) where Y[a, t] is the kg for area a in period t."""
+    from app.models.donation_model import Donation
+
+    lo = datetime.combine(first_period, datetime.min.time())
+    hi = lo + timedelta(weeks=periods)
+
+    day = func.date(Donation.created_at)
+    rows = db.session.query(
+        Donation.pickup_address, day, func.sum(Donation.quantity_kg)
+    ).filter(
+        Donation.created_at >= lo,
+        Donation.created_at < hi,
+        Donation.status.in_(_KIND_STATUSES[kind])
+    ).group_by(Donation.pickup_address, day).all()
+
+    area_of = {}
+    cells = {}
+    for address, created_on, total in rows:
+        if address not in area_of:
+            area_of[address] = resolve_area(address) or UNKNOWN_AREA
+        t = (period_start(_as_date(created_on)) - first_period).days // 7
+        key = (area_of[address], t)
+        cells[key] = cells.get(key, 0.0) + float(total or 0)
+
+    areas = sorted({area for area, _ in cells})
+    index = {area: i for i, area in enumerate(areas)}
+
+    Y = np.zeros((len(areas), periods))
+    for (area, t), total in cells.items():
+        Y[index[area], t] = total
+
+    return areas, Y
+
+
+# =====================
+# Training
+# =====================
+def fit_ridge(Y, lags, alpha):
+    """
+    Fit one ridge AR(lags) model per row of Y in a single batched solve.
+
+    Returns (coefficients [A, lags + 1], last_values [A, lags]); coefficient
+    0 is the bias, the rest weight the previous periods oldest first.
+    """
+    A, T = Y.shape
+    windows = np.lib.stride_tricks.sliding_window_view(Y, lags, axis=1)[:, :-1]
+    X = np.concatenate([np.ones(windows.shape[:2] + (1,)), windows], axis=2)
+    y = Y[:, lags:]
+
+    penalty = alpha * np.eye(lags + 1)
+    penalty[0, 0] = 0  # do not shrink the bias
+
+    XtX = np.einsum("atp,atq->apq", X, X) + penalty
+    Xty = np.einsum("atp,at->ap", X, y)
+    coefficients = np.linalg.solve(XtX, Xty[..., None])[..., 0]
+
+    return coefficients, Y[:, T - lags:]
+
+
+def train(history_periods=None):
+    """Refit every (area, kind) model over closed periods and store forecasts."""
+    config = current_app.config
+    lags = config.get("FORECAST_LAGS", 4)
+    alpha = config.get("FORECAST_RIDGE_ALPHA", 1.0)
+    periods = max(history_periods or config.get("FORECAST_HISTORY_PERIODS", 52), lags + 2)
+
+    last_closed = current_period() - timedelta(weeks=1)
+    first_period = last_closed - timedelta(weeks=periods - 1)
+    next_period = current_period()
+    now = datetime.utcnow()
+
+    fitted = 0
+    for kind in KINDS:
+        areas, Y = _history(kind, first_period, periods)
+        if not areas:
+            continue
+
+        coefficients, last_values = fit_ridge(Y, lags, alpha)
+
+        existing = {
+            m.area: m for m in ForecastModel.query.filter_by(kind=kind).all()
+        }
+        for i, area in enumerate(areas):
+            model = existing.get(area) or ForecastModel(area=area, kind=kind)
+            model.coefficients = json.dumps(coefficients[i].round(6).tolist())
+            model.last_values = json.dumps(last_values[i].tolist())
+            model.trained_through = last_closed
+            model.fitted_at = now
+            db.session.add(model)
+            fitted += 1
+
+        if kind == "demand":
+            _store_predictions(areas, Y, coefficients, last_values, last_closed, next_period)
+
+    db.session.commit()
+    invalidate()
+    return fitted
+
+
+def _store_predictions(areas, Y, coefficients, last_values, last_closed, next_period):
+    forecasts = np.maximum(
+        coefficients[:, 0] + np.einsum("ap,ap->a", coefficients[:, 1:], last_values), 0
+    )
+
+    rows = {
+        (p.period_start, p.area): p
+        for p in Prediction.query.filter(
+            Prediction.period_start.in_([last_closed, next_period])
+        ).all()
+    }
+    year, week, _ = next_period.isocalendar()
+
+    for i, area in enumerate(areas):
+        prediction = rows.get((next_period, area)) or Prediction(
+            period_start=next_period, area=area
+        )
+        prediction.period = f"{year}-W{week:02d}"
+        prediction.predicted_kg = round(float(forecasts[i]), 2)
+        db.session.add(prediction)
+
+        # The period that just closed now has an actual to compare against
+        closed = rows.get((last_closed, area))
+        if closed is not None:
+            closed.actual_kg = float(Y[i, -1])
+
+
+# =====================
+# Inference
+# =====================
+# (period, {(area, kind): (kg, trained_through)}). Replaced whole and never
+# mutated, so readers can use a snapshot after releasing the lock.
+_cache = None
+_cache_generation = 0
+_cache_lock = threading.Lock()
+
+
+def invalidate():
+    global _cache, _cache_generation
+    with _cache_lock:
+        _cache = None
+        _cache_generation += 1
+
+
+def _load_forecasts():
+    global _cache
+
+    period = current_period()
+    with _cache_lock:
+        snapshot, generation = _cache, _cache_generation
+    # A new period closing invalidates every cached forecast
+    if snapshot is not None and snapshot[0] == period:
+        return snapshot[1]
+
+    forecasts = {
+        (m.area, m.kind): (round(m.predict_next(), 2), m.trained_through)
+        for m in ForecastModel.query.all()
+    }
+
+    with _cache_lock:
+        # A retrain that finished meanwhile has newer models than these
+        if _cache_generation == generation:
+            _cache = (period, forecasts)
+    return forecasts
+
+
+def is_stale(trained_through):
+    """
+    Whether a model fitted through trained_through forecasts an earlier
+    period than the current one (train has not run since a period closed).
+    """
+    return trained_through is not None \
+        and _as_date(trained_through) < current_period() - timedelta(weeks=1)
+
+
+def forecast(kind, area=None):
+    """
+    (forecast, trained_through): next-period kg per area (or for one area)
+    and the oldest period the models behind it were trained through, None
+    without a model. Pass trained_through to is_stale before trusting it.
+    """
+    if kind not in KINDS:
+        raise ValueError(f"kind must be one of {', '.join(KINDS)}")
+
+    forecasts = _load_forecasts()
+    if area is not None:
+        return forecasts.get((area.lower(), kind), (0.0, None))
+
+    kind_forecasts = {a: entry for (a, k), entry in forecasts.items() if k == kind}
+    trained = [through for _, through in kind_forecasts.values()]
+    return {a: kg for a, (kg, _) in kind_forecasts.items()}, min(trained, default=None)
@@ -0,0 +1,356 @@
+import logging
+import random
+import threading
+import time
+import uuid
+from datetime import datetime, timedelta
+
+from flask import current_app
+from sqlalchemy import func, select, update
+from sqlalchemy.dialects import postgresql, sqlite
+
+from app import db
+from app.models.outbox_model import OutboxJob
+from app.services import kpi_service
+from app.utils.serialization import dumps, loads
+
+logger = logging.getLogger(__name__)
+notifications = logging.getLogger("app.notifications")
+
+PENDING = "PENDING"
+DONE = "DONE"
+FAILED = "FAILED"
+
+# Topics
+DONATION_CREATED = "donation.created"
+DONATION_CLAIMED = "donation.claimed"
+PICKUP_VERIFIED = "pickup.verified"
+NGO_VERIFIED = "ngo.verified"
+
+_handlers = {}
+
+
+def handler(topic):
+    """Register fn(payload, idempotency_key) as the consumer of topic."""
+    def register(fn):
+        _handlers[topic] = fn
+        return fn
+    return register
+
+
+# =====================
+# Producing
+# =====================
+def enqueue(topic, payload, key=None, delay_seconds=0):
+    """
+    Queue a job inside the caller's transaction, so it exists exactly when
+    the change that caused it commits. A key already in the table is a
+    no-op. With OUTBOX_DISPATCH = "inline" the handler runs right here
+    instead, in that same transaction. Caller commits.
+    """
+    if current_app.config.get("OUTBOX_DISPATCH") == "inline":
+        _handlers[topic](payload, key)
+        return
+
+    now = datetime.utcnow()
+    values = {
+        "topic": topic,
+        "payload": dumps(payload).decode(),
+        "idempotency_key": key or f"{topic}:{uuid.uuid4().hex}",
+        "status": PENDING,
+        "attempts": 0,
+        "available_at": now + timedelta(seconds=delay_seconds),
+        "created_at": now
+    }
+
+    dialect = db.session.get_bind().dialect.name
+    if dialect in ("postgresql", "sqlite"):
+        insert = postgresql.insert if dialect == "postgresql" else sqlite.insert
+        db.session.execute(
+            insert(OutboxJob).values(**values)
+            .on_conflict_do_nothing(index_elements=[OutboxJob.idempotency_key])
+        )
+        return
+
+    db.session.add(OutboxJob(**values))
+
+
+def donations_created(donations):
+    enqueue(DONATION_CREATED, {"savedKg": kpi_service.saved_totals(donations)})
+
+
+def donation_claimed(donation_id, ngo_id):
+    # A donation is claimed at most once, so its id makes a natural key
+    enqueue(DONATION_CLAIMED, {"donationId": donation_id, "ngoId": ngo_id},
+            key=f"{DONATION_CLAIMED}:{donation_id}")
+
+
+def pickup_verified(request_id, donation_id, ngo_id):
+    enqueue(PICKUP_VERIFIED, {"requestId": request_id, "donationId": donation_id, "ngoId": ngo_id},
+            key=f"{PICKUP_VERIFIED}:{request_id}")
+
+
+def ngo_verified(ngo_id):
+    enqueue(NGO_VERIFIED, {"ngoId": ngo_id})
+
+
+# =====================
+# Handlers
+# =====================
+# Each runs in the transaction that marks its job DONE, so database side
+# effects apply exactly once; anything external should dedupe on the key.
+@handler(DONATION_CREATED)
+def _donation_created(payload, key):
+    kpi_service.record_saved(payload["savedKg"])
+
+
+@handler(DONATION_CLAIMED)
+def _donation_claimed(payload, key):
+    kpi_service.record_claim()
+    notifications.info("Donation %s claimed by NGO %s", payload["donationId"], payload["ngoId"])
+
+
+@handler(PICKUP_VERIFIED)
+def _pickup_verified(payload, key):
+    kpi_service.record_pickup_verified()
+
+
+@handler(NGO_VERIFIED)
+def _ngo_verified(payload, key):
+    # Logged until a delivery channel (email/SMS) exists
+    notifications.info("NGO %s verified", payload["ngoId"])
+
+
+# =====================
+# Worker
+# =====================
+def _backoff(attempts, base, maximum):
+    """Exponential with 20% jitter so failing jobs do not retry in lockstep."""
+    delay = min(base * 2 ** max(attempts - 1, 0), maximum)
+    return delay * random.uniform(0.8, 1.2)
+
+
+class OutboxWorker:
+    """
+    Drains outbox_jobs in batches. Claiming a batch stamps it with a token
+    and pushes available_at past the lease, so other workers skip it
+    (PostgreSQL also uses SKIP LOCKED) and a crashed worker's jobs come
+    back once the lease lapses. A job is marked DONE in its handler's
+    transaction only while this worker still holds it; failures retry
+    with exponential backoff and end as FAILED after max_attempts.
+    """
+
+    def __init__(self, batch_size=100, lease_seconds=60, max_attempts=8,
+                 backoff_seconds=5, max_backoff_seconds=900):
+        self.batch_size = batch_size
+        self.lease_seconds = lease_seconds
+        self.max_attempts = max_attempts
+        self.backoff_seconds = backoff_seconds
+        self.max_backoff_seconds = max_backoff_seconds
+
+        self.stats = {"done": 0, "retried": 0, "failed": 0, "lost": 0, "lagSeconds": 0.0}
+
+    @classmethod
+    def from_config(cls, config):
+        return cls(
+            batch_size=config.get("OUTBOX_BATCH_SIZE", 100),
+            lease_seconds=config.get("OUTBOX_LEASE_SECONDS", 60),
+            max_attempts=config.get("OUTBOX_MAX_ATTEMPTS", 8),
+            backoff_seconds=config.get("OUTBOX_BACKOFF_SECONDS", 5),
+            max_backoff_seconds=config.get("OUTBOX_MAX_BACKOFF_SECONDS", 900)
+        )
+
+    def _claim(self):
+        now = datetime.utcnow()
+        token = uuid.uuid4().hex
+
+        due = select(OutboxJob.id).where(
+            OutboxJob.status == PENDING,
+            OutboxJob.available_at <= now
+        ).order_by(OutboxJob.available_at, OutboxJob.id).limit(self.batch_size)
+        if db.session.get_bind().dialect.name == "postgresql":
+            due = due.with_for_update(skip_locked=True)
+
+        jobs = db.session.execute(
+            update(OutboxJob)
+            .where(OutboxJob.id.in_(due))
+            .values(
+                claimed_by=token,
+                attempts=OutboxJob.attempts + 1,
+                available_at=now + timedelta(seconds=self.lease_seconds)
+            )
+            .returning(OutboxJob.id, OutboxJob.topic, OutboxJob.payload,
+                       OutboxJob.idempotency_key, OutboxJob.attempts, OutboxJob.created_at)
+            .execution_options(synchronize_session=False)
+        ).all()
+        db.session.commit()
+
+        return token, sorted(jobs, key=lambda job: job.id)
+
+    def _finish(self, job, token, values):
+        return db.session.execute(
+            update(OutboxJob)
+            .where(OutboxJob.id == job.id, OutboxJob.claimed_by == token)
+            .values(claimed_by=None, **values)
+            .execution_options(synchronize_session=False)
+        ).rowcount == 1
+
+    def _run(self, job, token):
+        try:
+            fn = _handlers.get(job.topic)
+            if fn is None:
+                raise LookupError(f"No handler for topic {job.topic!r}")
+            fn(loads(job.payload), job.idempotency_key)
+
+            if not self._finish(job, token, {
+                "status": DONE, "processed_at": datetime.utcnow(), "last_error": None
+            }):
+                # Lease ran out and another worker owns the job now
+                db.session.rollback()
+                self.stats["lost"] += 1
+                return
+
+            db.session.commit()
+            self.stats["done"] += 1
+        except Exception as exc:
+            db.session.rollback()
+
+            dead = job.attempts >= self.max_attempts
+            delay = _backoff(job.attempts, self.backoff_seconds, self.max_backoff_seconds)
+            logger.warning("Outbox job %s (%s) attempt %d failed: %r",
+                           job.id, job.topic, job.attempts, exc)
+
+            self._finish(job, token, {
+                "status": FAILED if dead else PENDING,
+                "available_at": datetime.utcnow() + timedelta(seconds=delay),
+                "last_error": repr(exc)[:2000]
+            })
+            db.session.commit()
+            self.stats["failed" if dead else "retried"] += 1
+
+    def run_once(self):
+        """Claim and process one batch; returns how many jobs it held."""
+        token, jobs = self._claim()
+        if not jobs:
+            self.stats["lagSeconds"] = 0.0
+            return 0
+
+        now = datetime.utcnow()
+        self.stats["lagSeconds"] = max((now - job.created_at).total_seconds() for job in jobs)
+        for job in jobs:
+            self._run(job, token)
+        return len(jobs)
+
+    def run_forever(self, poll_seconds=1.0, retention_hours=72, stop_event=None):
+        prune_every, pruned_at = 3600, 0.0
+        while stop_event is None or not stop_event.is_set():
+            processed = 0
+            try:
+                processed = self.run_once()
+                if time.monotonic() - pruned_at > prune_every:
+                    prune(retention_hours)
+                    pruned_at = time.monotonic()
+            except Exception:
+                logger.exception("Outbox batch failed")
+                db.session.rollback()
+            finally:
+                db.session.remove()
+
+            if processed:
+                logger.info("Outbox: %d jobs, lag %.1fs, totals %s",
+                            processed, self.stats["lagSeconds"], self.stats)
+                # A full batch means more is probably waiting
+                if processed >= self.batch_size:
+                    continue
+
+            if stop_event is not None:
+                stop_event.wait(poll_seconds)
+            else:
+                time.sleep(poll_seconds)
+
+
+def check_config(config):
+    """Raise RuntimeError unless OUTBOX_DISPATCH and OUTBOX_WORKER agree."""
+    dispatch, worker = config.get("OUTBOX_DISPATCH"), config.get("OUTBOX_WORKER", "none")
+    if dispatch not in ("queue", "inline"):
+        raise RuntimeError(f"OUTBOX_DISPATCH must be 'queue' or 'inline', not {dispatch!r}")
+    if worker not in ("process", "thread", "none"):
+        raise RuntimeError(f"OUTBOX_WORKER must be 'process', 'thread' or 'none', not {worker!r}")
+    if dispatch == "queue" and worker == "none":
+        raise RuntimeError("OUTBOX_DISPATCH=queue needs OUTBOX_WORKER set; nothing would drain the jobs")
+    if dispatch == "inline" and worker != "none":
+        raise RuntimeError(f"OUTBOX_WORKER={worker} with OUTBOX_DISPATCH=inline; no jobs would be written")
+
+
+def start_background(app):
+    """Run a worker on a daemon thread of this process."""
+    worker = OutboxWorker.from_config(app.config)
+
+    def run():
+        with app.app_context():
+            worker.run_forever(app.config.get("OUTBOX_POLL_SECONDS", 1.0),
+                               app.config.get("OUTBOX_RETENTION_HOURS", 72))
+
+    thread = threading.Thread(target=run, name="outbox-worker", daemon=True)
+    thread.start()
+    return thread
+
+
+# =====================
+# Maintenance and metrics
+# =====================
+def prune(retention_hours=72):
+    """Delete DONE jobs older than retention_hours."""
+    cutoff = datetime.utcnow() - timedelta(hours=retention_hours)
+    deleted = db.session.query(OutboxJob).filter(
+        OutboxJob.status == DONE, OutboxJob.processed_at < cutoff
+    ).delete(synchronize_session=False)
+    db.session.commit()
+    return deleted
+
+
+def requeue_failed(topic=None):
+    """Give FAILED jobs a fresh set of attempts."""
+    query = db.session.query(OutboxJob).filter(OutboxJob.status == FAILED)
+    if topic:
+        query = query.filter(OutboxJob.topic == topic)
+
+    requeued = query.update({
+        "status": PENDING, "attempts": 0, "available_at": datetime.utcnow()
+    }, synchronize_session=False)
+    db.session.commit()
+    return requeued
+
+
+def queue_stats():
+    """
+    Queue depth and lag: per topic, jobs waiting (due now or backing off),
+    failed for good, and the age of the oldest job that is due.
+    """
+    now = datetime.utcnow()
+    due = (OutboxJob.status == PENDING) & (OutboxJob.available_at <= now)
+
+    rows = db.session.query(
+        OutboxJob.topic,
+        func.sum(db.case((OutboxJob.status == PENDING, 1), else_=0)),
+        func.sum(db.case((due, 1), else_=0)),
+        func.sum(db.case((OutboxJob.status == FAILED, 1), else_=0)),
+        func.min(db.case((due, OutboxJob.created_at), else_=None))
+    ).filter(OutboxJob.status != DONE).group_by(OutboxJob.topic).all()
+
+    topics = {}
+    for topic, pending, ready, failed, oldest in rows:
+        topics[topic] = {
+            "pending": int(pending or 0),
+            "due": int(ready or 0),
+            "failed": int(failed or 0),
+            "lagSeconds": round((now - oldest).total_seconds(), 1) if oldest else 0.0
+        }
+
+    return {
+        "pending": sum(t["pending"] for t in topics.values()),
+        "due": sum(t["due"] for t in topics.values()),
+        "failed": sum(t["failed"] for t in topics.values()),
+        "lagSeconds": max((t["lagSeconds"] for t in topics.values()), default=0.0),
+        "topics": topics
+    }
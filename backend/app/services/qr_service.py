@@ -1,18 +1,227 @@
+import base64
+import hashlib
+import hmac
+import threading
+import time
 from datetime import datetime
+
+from flask import current_app
+from sqlalchemy import and_, exists, select, update
+
 from app import db
-from app.models.pickup_model import Pickup
 from app.models.donation_model import Donation
+from app.models.pickup_model import Pickup
+from app.models.request_model import Request
+from app.services import outbox_service
+from app.utils.cache import TTLCache
 
-def verify_qr(request_id):
-    pickup = Pickup.query.filter_by(request_id=request_id).first()
-    if not pickup:
-        return False
+TOKEN_PREFIX = "WFL1"
+
+# Truncated HMAC-SHA256: 128 bits is plenty against online forgery
+_SIGNATURE_BYTES = 16
+
+
+class QRTokenError(ValueError):
+    """Token is malformed, forged, expired or already used."""
+
+
+# =====================
+# Tokens
+# =====================
+def _key():
+    config = current_app.config
+    return (config.get("QR_SIGNING_KEY") or config["SECRET_KEY"]).encode()
+
+
+def _sign(body):
+    digest = hmac.new(_key(), body.encode(), hashlib.sha256).digest()[:_SIGNATURE_BYTES]
+    return base64.urlsafe_b64encode(digest).decode().rstrip("=")
+
+
+def issue_token(request_id, donation_id, ttl_seconds=None):
+    """'WFL1.<request>.<donation>.<expires unix>.<signature>' for the pickup QR."""
+    if ttl_seconds is None:
+        ttl_seconds = current_app.config.get("QR_TOKEN_SECONDS", 6 * 3600)
+    expires = int(time.time()) + ttl_seconds
+
+    body = f"{TOKEN_PREFIX}.{request_id}.{donation_id}.{expires}"
+    return f"{body}.{_sign(body)}", datetime.utcfromtimestamp(expires)
+
+
+def parse_token(token):
+    """
+    Check signature and expiry in memory and return (request_id,
+    donation_id, expires). Raises QRTokenError; touches no database.
+    """
+    if not isinstance(token, str) or len(token) > 128:
+        raise QRTokenError("Invalid QR code")
+
+    body, _, signature = token.strip().rpartition(".")
+    parts = body.split(".")
+    if len(parts) != 4 or parts[0] != TOKEN_PREFIX:
+        raise QRTokenError("Invalid QR code")
+
+    if not hmac.compare_digest(signature, _sign(body)):
+        raise QRTokenError("Invalid QR code")
+
+    try:
+        request_id, donation_id, expires = (int(part) for part in parts[1:])
+    except ValueError:
+        raise QRTokenError("Invalid QR code")
+
+    if expires <= time.time():
+        raise QRTokenError("QR code has expired")
+
+    return request_id, donation_id, expires
 
-    pickup.status = "VERIFIED"
-    pickup.verified_at = datetime.utcnow()
 
-    donation = Donation.query.get(pickup.request_id)
-    donation.status = "PICKED_UP"
+# =====================
+# Replay cache
+# =====================
+class SeenTokens:
+    """
+    Bounded set of recently redeemed signatures, each kept until its token
+    expires. Per process, and LRU-evicted when full: it exists to turn
+    repeated scans away before they reach the database, while the
+    conditional UPDATE stays the guarantee that a pickup is verified once.
+    """
 
-    db.session.commit()
+    def __init__(self, maxsize=10000):
+        self._seen = TTLCache(maxsize=maxsize)
+        self._lock = threading.Lock()
+
+    def claim(self, signature, expires):
+        """True the first time a signature is presented, False on replays."""
+        with self._lock:
+            if self._seen.get(signature) is not None:
+                return False
+            self._seen.set(signature, True, ttl=max(expires - time.time(), 1))
+            return True
+
+    def release(self, signature):
+        self._seen.pop(signature)
+
+    def clear(self):
+        self._seen.clear()
+
+
+seen_tokens = SeenTokens()
+
+
+# =====================
+# Verification
+# =====================
+def _verify_statement(request_id, donation_id, ngo_id, now):
+    """
+    PostgreSQL: one statement. The pickup UPDATE runs as a data-modifying
+    CTE and the donation only moves to PICKED_UP if it returned a row.
+    """
+    owned = exists().where(
+        Request.id == Pickup.request_id,
+        Request.donation_id == donation_id,
+        Request.ngo_id == ngo_id
+    )
+    verified = (
+        update(Pickup)
+        .where(Pickup.request_id == request_id, Pickup.status == "SCHEDULED", owned)
+        .values(status="VERIFIED", verified_at=now)
+        .returning(Pickup.id)
+        .cte("verified_pickup")
+    )
+
+    return (
+        update(Donation)
+        .where(Donation.id == donation_id, exists(select(verified.c.id)))
+        .values(status="PICKED_UP")
+        .returning(Donation.id)
+        .add_cte(verified)
+    )
+
+
+def _verify_rows(request_id, donation_id, ngo_id, now):
+    """Apply the pickup and donation transition; True if this call made it."""
+    if db.session.get_bind().dialect.name == "postgresql":
+        stmt = _verify_statement(request_id, donation_id, ngo_id, now)
+        return db.session.execute(stmt).first() is not None
+
+    # Elsewhere: the same conditional writes as two statements in one transaction
+    verified = db.session.execute(
+        update(Pickup)
+        .where(
+            Pickup.request_id == request_id,
+            Pickup.status == "SCHEDULED",
+            Pickup.request_id.in_(select(Request.id).where(and_(
+                Request.id == request_id,
+                Request.donation_id == donation_id,
+                Request.ngo_id == ngo_id
+            )))
+        )
+        .values(status="VERIFIED", verified_at=now)
+        .execution_options(synchronize_session=False)
+    )
+    if verified.rowcount != 1:
+        return False
+
+    db.session.execute(
+        update(Donation)
+        .where(Donation.id == donation_id)
+        .values(status="PICKED_UP")
+        .execution_options(synchronize_session=False)
+    )
     return True
+
+
+def verify_qr(token, ngo_id, request_id=None):
+    """
+    Redeem a pickup QR token for ngo_id. Forged, expired and replayed tokens
+    raise QRTokenError before any query runs. Returns the (request_id,
+    donation_id) verified, or None when the pickup is not this NGO's or was
+    already verified. Commits.
+    """
+    token_request_id, donation_id, expires = parse_token(token)
+    if request_id is not None and request_id != token_request_id:
+        raise QRTokenError("QR code is for a different pickup")
+
+    signature = token.strip().rpartition(".")[2]
+    if not seen_tokens.claim(signature, expires):
+        raise QRTokenError("QR code has already been used")
+
+    try:
+        redeemed = _verify_rows(token_request_id, donation_id, ngo_id, datetime.utcnow())
+        if redeemed:
+            outbox_service.pickup_verified(token_request_id, donation_id, ngo_id)
+            db.session.commit()
+        else:
+            db.session.rollback()
+    except Exception:
+        db.session.rollback()
+        redeemed = False
+        raise
+    finally:
+        # Nothing was redeemed, so the rightful NGO may still scan this code
+        if not redeemed:
+            seen_tokens.release(signature)
+
+    if not redeemed:
+        return None
+
+    return token_request_id, donation_id
+
+
+def pickup_token(donation_id, donor_id):
+    """
+    QR token for the donor's donation once an NGO has claimed it, or None
+    when it has no scheduled pickup.
+    """
+    row = db.session.query(Request.id) \
+        .join(Request.pickup).join(Request.donation) \
+        .filter(
+            Request.donation_id == donation_id,
+            Donation.donor_id == donor_id,
+            Pickup.status == "SCHEDULED"
+        ).first()
+    if row is None:
+        return None
+
+    token, expires_at = issue_token(row.id, donation_id)
+    return {"token": token, "requestId": row.id, "expiresAt": expires_at.isoformat()}
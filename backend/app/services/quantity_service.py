@@ -0,0 +1,154 @@
+import json
+import os
+import re
+from functools import lru_cache
+
+from sqlalchemy import update
+
+from app import db
+
+# =====================
+# Units
+# =====================
+# Mass and volume units → kg (liquids are taken at ~1 kg per litre)
+MASS_UNITS = {
+    "kg": 1.0, "kgs": 1.0, "kilo": 1.0, "kilos": 1.0, "kilogram": 1.0, "kilograms": 1.0,
+    "g": 0.001, "gm": 0.001, "gms": 0.001, "gram": 0.001, "grams": 0.001,
+    "lb": 0.45359237, "lbs": 0.45359237, "pound": 0.45359237, "pounds": 0.45359237,
+    "oz": 0.028349523, "ounce": 0.028349523, "ounces": 0.028349523,
+    "l": 1.0, "ltr": 1.0, "ltrs": 1.0, "litre": 1.0, "litres": 1.0, "liter": 1.0, "liters": 1.0,
+    "ml": 0.001,
+}
+
+# Count units, converted per food type below
+COUNT_UNITS = {
+    "portion": "portion", "portions": "portion",
+    "serving": "portion", "servings": "portion",
+    "plate": "portion", "plates": "portion",
+    "meal": "portion", "meals": "portion",
+    "tray": "tray", "trays": "tray",
+    "packet": "packet", "packets": "packet", "pack": "packet", "packs": "packet",
+    "box": "packet", "boxes": "packet",
+    "piece": "piece", "pieces": "piece", "pcs": "piece", "loaf": "piece", "loaves": "piece",
+}
+
+# kg per count unit by food type keyword; "default" applies when nothing matches.
+# Extend or override via QUANTITY_CONVERSIONS_PATH (JSON of the same shape).
+CONVERSIONS = {
+    "default": {"portion": 0.35, "tray": 3.0, "packet": 0.5, "piece": 0.1},
+    "rice": {"portion": 0.3, "tray": 4.0},
+    "biryani": {"portion": 0.4, "tray": 5.0},
+    "bread": {"packet": 0.4, "piece": 0.4},
+    "roti": {"piece": 0.04, "packet": 0.4},
+    "fruit": {"piece": 0.15, "packet": 1.0},
+    "vegetable": {"packet": 1.0},
+    "sandwich": {"piece": 0.2, "packet": 0.4},
+    "milk": {"packet": 0.5},
+}
+
+# "15 kg", "1.5kg", "1/2 kg", "10-12 trays", "40 large packets"; a bare
+# number means kg. One word may sit between the amount and its unit.
+_QUANTITY_RE = re.compile(
+    r"(?P<a>\d+(?:\.\d+)?)(?:\s*/\s*(?P<b>\d+(?:\.\d+)?))?"
+    r"(?:\s*(?:-|to)\s*(?P<c>\d+(?:\.\d+)?))?"
+    r"(?:\s*(?P<unit>[a-z]+)(?:\s+(?P<next>[a-z]+))?)?"
+)
+
+_food_keys = None
+
+
+def _load_conversions():
+    global _food_keys
+
+    path = os.getenv("QUANTITY_CONVERSIONS_PATH")
+    if path and os.path.exists(path):
+        with open(path, encoding="utf-8") as fh:
+            for food, units in json.load(fh).items():
+                CONVERSIONS.setdefault(food.strip().lower(), {}).update(units)
+
+    # Longest names first so "fried rice" wins over "rice"
+    _food_keys = sorted((k for k in CONVERSIONS if k != "default"), key=len, reverse=True)
+
+
+def _count_factor(unit, food_type):
+    if _food_keys is None:
+        _load_conversions()
+
+    if food_type:
+        text = food_type.lower()
+        for key in _food_keys:
+            if key in text and unit in CONVERSIONS[key]:
+                return CONVERSIONS[key][unit]
+
+    return CONVERSIONS["default"].get(unit)
+
+
+@lru_cache(maxsize=4096)
+def parse_quantity(text, food_type=None):
+    """Free-text quantity → kg, or None when no amount can be read."""
+    if not text:
+        return None
+
+    match = _QUANTITY_RE.search(text.lower())
+    if match is None:
+        return None
+
+    amount = float(match.group("a"))
+    if match.group("b"):
+        divisor = float(match.group("b"))
+        if not divisor:
+            return None
+        amount /= divisor
+    elif match.group("c"):
+        # Ranges count as their midpoint
+        amount = (amount + float(match.group("c"))) / 2
+
+    if match.group("unit") is None:
+        return round(amount, 3)
+
+    for unit in (match.group("unit"), match.group("next")):
+        if unit in MASS_UNITS:
+            return round(amount * MASS_UNITS[unit], 3)
+
+        if unit in COUNT_UNITS:
+            factor = _count_factor(COUNT_UNITS[unit], food_type)
+            return round(amount * factor, 3) if factor is not None else None
+
+    return None
+
+
+# =====================
+# Backfill
+# =====================
+def backfill_quantities(batch_size=1000, reparse=False):
+    """
+    Fill donations.quantity_kg in id-ordered chunks, one commit per chunk.
+    With reparse, every row is recomputed (after changing conversions).
+    """
+    from app.models.donation_model import Donation
+
+    updated = 0
+    last_id = 0
+    while True:
+        query = db.session.query(Donation.id, Donation.quantity, Donation.food_type) \
+            .filter(Donation.id > last_id)
+        if not reparse:
+            query = query.filter(Donation.quantity_kg.is_(None))
+        rows = query.order_by(Donation.id).limit(batch_size).all()
+
+        if not rows:
+            break
+
+        params = [
+            {"id": donation_id, "quantity_kg": parse_quantity(quantity, food_type)}
+            for donation_id, quantity, food_type in rows
+        ]
+        params = [p for p in params if reparse or p["quantity_kg"] is not None]
+        if params:
+            db.session.execute(update(Donation), params)
+            updated += len(params)
+
+        last_id = rows[-1][0]
+        db.session.commit()
+
+    return updated
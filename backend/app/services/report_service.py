@@ -0,0 +1,201 @@
+import threading
+import time
+from datetime import date, datetime, timedelta
+
+from flask import current_app
+from sqlalchemy import func, text
+from sqlalchemy.dialects import postgresql, sqlite
+
+from app import db
+from app.models.rollup_model import ImpactRollup
+
+GRANULARITIES = ("day", "week", "month")
+
+# Days before the newest rollup that are always recomputed, so late pickups
+# and status changes on recent donations land in the right bucket
+REFRESH_LOOKBACK_DAYS = 7
+
+# Any fixed bigint; names the PostgreSQL advisory lock held while refreshing
+REFRESH_LOCK_KEY = 0x77666C726F6C6C
+
+_last_refresh = 0.0
+_refresh_lock = threading.Lock()
+
+
+def _as_date(value):
+    if isinstance(value, str):
+        return date.fromisoformat(value[:10])
+    if isinstance(value, datetime):
+        return value.date()
+    return value
+
+
+def _day_range(start, end):
+    return (
+        datetime.combine(start, datetime.min.time()),
+        datetime.combine(end + timedelta(days=1), datetime.min.time())
+    )
+
+
+# =====================
+# Rollup refresh
+# =====================
+def _daily_totals(start, end):
+    from app.models.donation_model import Donation
+    from app.models.pickup_model import Pickup
+    from app.models.prediction_model import Prediction
+    from app.models.request_model import Request
+
+    lo, hi = _day_range(start, end)
+    weight = Donation.quantity_kg
+    totals = {}
+
+    def add(rows, field):
+        for day, value in rows:
+            if day is None:
+                continue
+            bucket = totals.setdefault(_as_date(day), {
+                "saved_kg": 0, "wasted_kg": 0, "predicted_kg": 0, "donations": 0
+            })
+            bucket[field] += value or 0
+
+    created_day = func.date(Donation.created_at)
+    add(db.session.query(created_day, func.count(Donation.id))
+        .filter(Donation.created_at >= lo, Donation.created_at < hi)
+        .group_by(created_day), "donations")
+
+    add(db.session.query(created_day, func.sum(weight))
+        .filter(Donation.created_at >= lo, Donation.created_at < hi,
+                Donation.status == "EXPIRED")
+        .group_by(created_day), "wasted_kg")
+
+    verified_day = func.date(Pickup.verified_at)
+    add(db.session.query(verified_day, func.sum(weight))
+        .join(Pickup.request).join(Request.donation)
+        .filter(Pickup.verified_at >= lo, Pickup.verified_at < hi)
+        .group_by(verified_day), "saved_kg")
+
+    add(db.session.query(Prediction.period_start, func.sum(Prediction.predicted_kg))
+        .filter(Prediction.period_start >= start, Prediction.period_start <= end)
+        .group_by(Prediction.period_start), "predicted_kg")
+
+    return totals
+
+
+def _try_lock():
+    """Take the transaction-scoped refresh lock; False if another process holds it."""
+    if db.session.get_bind().dialect.name != "postgresql":
+        return True
+    return db.session.execute(
+        text("SELECT pg_try_advisory_xact_lock(:key)"), {"key": REFRESH_LOCK_KEY}
+    ).scalar()
+
+
+def _upsert(rows):
+    dialect = db.session.get_bind().dialect.name
+    if dialect in ("postgresql", "sqlite"):
+        insert = postgresql.insert if dialect == "postgresql" else sqlite.insert
+        stmt = insert(ImpactRollup)
+        db.session.execute(stmt.on_conflict_do_update(
+            index_elements=[ImpactRollup.day],
+            set_={column: stmt.excluded[column] for column in (
+                "saved_kg", "wasted_kg", "predicted_kg", "donations", "refreshed_at"
+            )}
+        ), rows)
+        return
+
+    for row in rows:
+        db.session.merge(ImpactRollup(**row))
+
+
+def refresh_rollups(full=False):
+    """
+    Recompute rollup rows from the last refreshed day (minus a lookback) to
+    today. Rows are upserted under an advisory lock, so concurrent refreshes
+    neither collide on the day key nor repeat work; returns None when
+    another process is already refreshing.
+    """
+    from app.models.donation_model import Donation
+
+    if not _try_lock():
+        db.session.rollback()
+        return None
+
+    today = datetime.utcnow().date()
+    newest = None if full else db.session.query(func.max(ImpactRollup.day)).scalar()
+
+    if newest is not None:
+        start = _as_date(newest) - timedelta(days=REFRESH_LOOKBACK_DAYS)
+    else:
+        first = db.session.query(func.min(Donation.created_at)).scalar()
+        start = _as_date(first) if first else today
+
+    totals = _daily_totals(start, today)
+
+    # Days that no longer have any activity
+    db.session.query(ImpactRollup).filter(
+        ImpactRollup.day >= start, ImpactRollup.day.notin_(list(totals))
+    ).delete(synchronize_session=False)
+
+    now = datetime.utcnow()
+    if totals:
+        _upsert([{"day": day, "refreshed_at": now, **values} for day, values in totals.items()])
+    db.session.commit()
+
+    return len(totals)
+
+
+def _ensure_fresh():
+    global _last_refresh
+
+    interval = current_app.config.get("REPORT_REFRESH_SECONDS", 300)
+    if time.monotonic() - _last_refresh < interval:
+        return
+
+    # One refresh per process at a time; other readers use the current rows
+    if not _refresh_lock.acquire(blocking=False):
+        return
+    try:
+        if time.monotonic() - _last_refresh >= interval:
+            refresh_rollups()
+            _last_refresh = time.monotonic()
+    finally:
+        _refresh_lock.release()
+
+
+# =====================
+# Queries
+# =====================
+def _bucket(day, granularity):
+    if granularity == "day":
+        return day, day.isoformat()
+    if granularity == "week":
+        start = day - timedelta(days=day.weekday())
+        year, week, _ = start.isocalendar()
+        return start, f"{year}-W{week:02d}"
+    start = day.replace(day=1)
+    return start, start.strftime("%Y-%m")
+
+
+def impact_report(start, end, granularity="week"):
+    if granularity not in GRANULARITIES:
+        raise ValueError(f"granularity must be one of {', '.join(GRANULARITIES)}")
+
+    _ensure_fresh()
+
+    rows = ImpactRollup.query \
+        .filter(ImpactRollup.day >= start, ImpactRollup.day <= end) \
+        .order_by(ImpactRollup.day).all()
+
+    buckets = {}
+    for row in rows:
+        key, name = _bucket(_as_date(row.day), granularity)
+        bucket = buckets.setdefault(key, {
+            "name": name, "saved": 0, "wasted": 0, "predicted": 0, "donations": 0
+        })
+        bucket["saved"] += row.saved_kg
+        bucket["wasted"] += row.wasted_kg
+        bucket["predicted"] += row.predicted_kg
+        bucket["donations"] += row.donations
+
+    return [buckets[key] for key in sorted(buckets)]
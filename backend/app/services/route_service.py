@@ -0,0 +1,422 @@
+import math
+import threading
+import time
+from datetime import datetime, timedelta
+
+import numpy as np
+
+from app import db
+from app.services.batch_allocation_service import DEFAULT_SPEED_KMH
+from app.services.location_service import EARTH_RADIUS_KM
+from app.utils.cache import TTLCache
+
+# Minutes spent loading at each pickup
+DEFAULT_SERVICE_MINUTES = 5
+# Search stops improving the route after this long and returns the best so far
+DEFAULT_BUDGET_SECONDS = 0.08
+# One hour past a donation's expiry costs as much as this many extra km,
+# so local search only trades lateness for distance when nothing else helps
+LATE_PENALTY_KM = 1000.0
+
+# 2-opt moves tried per pass, best distance gain first
+_TWO_OPT_CANDIDATES = 16
+_OR_OPT_SEGMENTS = (1, 2, 3)
+_EPS = 1e-9
+
+
+def haversine_matrix(lat_a, lon_a, lat_b, lon_b):
+    """Great-circle km between every point of a (rows) and of b (columns)."""
+    p1 = np.radians(np.asarray(lat_a, dtype=np.float64))[:, None]
+    p2 = np.radians(np.asarray(lat_b, dtype=np.float64))[None, :]
+    dl = np.radians(np.asarray(lon_b, dtype=np.float64))[None, :] \
+        - np.radians(np.asarray(lon_a, dtype=np.float64))[:, None]
+
+    a = np.sin((p2 - p1) / 2) ** 2 + np.cos(p1) * np.cos(p2) * np.sin(dl / 2) ** 2
+    return 2 * EARTH_RADIUS_KM * np.arcsin(np.sqrt(np.clip(a, 0.0, 1.0)))
+
+
+# =====================
+# Distance matrices
+# =====================
+class DistanceMatrix:
+    """
+    Symmetric km matrix over an NGO's depot (slot 0) and its pickup stops.
+
+    Adding a stop computes one row against the existing slots; removing one
+    moves the last slot into its place. Storage grows by doubling, so
+    neither operation recomputes or copies the whole matrix.
+    """
+
+    def __init__(self, depot, capacity=16):
+        self.depot = depot
+        self._lock = threading.Lock()
+        self._keys = [None]
+        self._slots = {}
+        self._lat = np.empty(capacity)
+        self._lon = np.empty(capacity)
+        self._km = np.zeros((capacity, capacity))
+        self._lat[0], self._lon[0] = depot
+
+    def __len__(self):
+        return len(self._keys) - 1
+
+    def __contains__(self, key):
+        return key in self._slots
+
+    def _grow(self):
+        size = len(self._keys)
+        capacity = self._km.shape[0] * 2
+
+        km = np.zeros((capacity, capacity))
+        km[:size, :size] = self._km[:size, :size]
+        self._km = km
+        self._lat = np.resize(self._lat, capacity)
+        self._lon = np.resize(self._lon, capacity)
+
+    def _add(self, key, lat, lon):
+        if key in self._slots:
+            return
+        if len(self._keys) == self._km.shape[0]:
+            self._grow()
+
+        slot = len(self._keys)
+        self._keys.append(key)
+        self._slots[key] = slot
+        self._lat[slot], self._lon[slot] = lat, lon
+
+        row = haversine_matrix([lat], [lon], self._lat[:slot + 1], self._lon[:slot + 1])[0]
+        self._km[slot, :slot + 1] = row
+        self._km[:slot + 1, slot] = row
+
+    def _remove(self, key):
+        slot = self._slots.pop(key, None)
+        if slot is None:
+            return
+
+        last = len(self._keys) - 1
+        if slot != last:
+            moved = self._keys[last]
+            self._keys[slot] = moved
+            self._slots[moved] = slot
+            self._lat[slot], self._lon[slot] = self._lat[last], self._lon[last]
+            self._km[slot, :last] = self._km[last, :last]
+            self._km[:last, slot] = self._km[:last, last]
+            self._km[slot, slot] = 0.0
+        self._keys.pop()
+
+    def add(self, key, lat, lon):
+        with self._lock:
+            self._add(key, lat, lon)
+
+    def discard(self, key):
+        with self._lock:
+            self._remove(key)
+
+    def sync(self, stops):
+        """
+        Make the stop set equal to stops ({key: (lat, lon)}) and return
+        (keys, km) for depot + stops in that order, km being a private copy.
+        """
+        with self._lock:
+            for key in [k for k in self._slots if k not in stops]:
+                self._remove(key)
+            for key, (lat, lon) in stops.items():
+                self._add(key, lat, lon)
+
+            keys = list(stops)
+            index = np.array([0] + [self._slots[key] for key in keys], dtype=np.intp)
+            return keys, self._km[np.ix_(index, index)]
+
+
+class RouteMatrixCache:
+    """Per-NGO distance matrices, kept warm between plans and claims."""
+
+    def __init__(self, maxsize=256, ttl=3600):
+        self._matrices = TTLCache(maxsize=maxsize, ttl=ttl)
+
+    def get(self, ngo_id, depot):
+        matrix = self._matrices.get(ngo_id)
+        if matrix is None or matrix.depot != depot:
+            matrix = DistanceMatrix(depot)
+        # Re-set on every use so active NGOs stay cached
+        self._matrices.set(ngo_id, matrix)
+        return matrix
+
+    def peek(self, ngo_id):
+        return self._matrices.get(ngo_id)
+
+    def clear(self):
+        self._matrices.clear()
+
+
+matrices = RouteMatrixCache()
+
+
+# =====================
+# Solver
+# =====================
+def _evaluate(tour, km, deadlines, speed_kmh, service_hours):
+    """
+    (distance km, hours late summed over stops, per-stop lateness) for a
+    closed tour; the last is aligned with tour[1:-1].
+    """
+    legs = km[tour[:-1], tour[1:]]
+    arrival = np.cumsum(legs[:-1]) / speed_kmh + service_hours * np.arange(len(legs) - 1)
+    late = np.maximum(arrival - deadlines[tour[1:-1]], 0.0)
+    return float(legs.sum()), float(late.sum()), late
+
+
+def _nearest_neighbour(km, deadlines, speed_kmh, service_hours):
+    """Closest next stop that can still be reached in time, else the closest."""
+    n = km.shape[0]
+    open_ = np.ones(n, dtype=bool)
+    open_[0] = False
+
+    tour = [0]
+    current, clock = 0, 0.0
+    for _ in range(n - 1):
+        row = np.where(open_, km[current], np.inf)
+        in_time = open_ & (clock + row / speed_kmh <= deadlines)
+        nxt = int(np.argmin(np.where(in_time, row, np.inf) if in_time.any() else row))
+
+        clock += km[current, nxt] / speed_kmh + service_hours
+        open_[nxt] = False
+        tour.append(nxt)
+        current = nxt
+
+    tour.append(0)
+    return np.array(tour, dtype=np.intp)
+
+
+def _two_opt(tour, cost, score, deadline):
+    """Try the best segment reversals by distance gain; first improvement wins."""
+    km = score.km
+    a, b = tour[:-1], tour[1:]
+    edge = km[a, b]
+    gain = km[a[:, None], a[None, :]] + km[b[:, None], b[None, :]] \
+        - edge[:, None] - edge[None, :]
+    gain[np.tril_indices(len(a), 1)] = np.inf
+
+    late = cost[1] > 0
+    flat = gain.ravel()
+    count = min(_TWO_OPT_CANDIDATES, flat.size)
+    best = np.argpartition(flat, count - 1)[:count]
+
+    for move in best[np.argsort(flat[best])]:
+        if time.perf_counter() > deadline:
+            break
+        # With every stop on time only shorter tours can be better
+        if flat[move] >= -_EPS and not late:
+            break
+        if not np.isfinite(flat[move]):
+            break
+
+        i, j = divmod(int(move), len(a))
+        candidate = tour.copy()
+        candidate[i + 1:j + 1] = candidate[i + 1:j + 1][::-1]
+        candidate_cost = score(candidate)
+        if score.total(candidate_cost) < score.total(cost) - _EPS:
+            return candidate, candidate_cost
+
+    return None
+
+
+def _or_opt(tour, cost, score, deadline):
+    """Move a run of 1-3 consecutive stops (either way round) to a better spot."""
+    km = score.km
+    x, y = tour[:-1], tour[1:]
+    edge = km[x, y]
+    positions = np.arange(len(x))
+
+    for length in _OR_OPT_SEGMENTS:
+        starts = np.arange(1, len(tour) - length)
+        if not len(starts):
+            break
+
+        first, last = tour[starts], tour[starts + length - 1]
+        before, after = tour[starts - 1], tour[starts + length]
+        removed = km[before, first] + km[last, after] - km[before, after]
+
+        # Cost of re-inserting run s between x[k] and y[k], for every (s, k)
+        forward = km[x[None, :], first[:, None]] + km[last[:, None], y[None, :]] - edge
+        backward = km[x[None, :], last[:, None]] + km[first[:, None], y[None, :]] - edge
+        delta = np.minimum(forward, backward) - removed[:, None]
+        delta[(positions >= starts[:, None] - 1) & (positions < starts[:, None] + length)] = np.inf
+
+        flat = delta.ravel()
+        improving = np.flatnonzero(flat < -_EPS)
+        moves = improving[np.argsort(flat[improving])][:_TWO_OPT_CANDIDATES].tolist()
+
+        if cost[1] > 0:
+            # Runs holding a late stop may be worth moving even if that is
+            # longer: try each one's best spot earlier in the tour, latest first
+            lateness = np.convolve(cost[2], np.ones(length), "valid")
+            for s in np.argsort(-lateness)[:_TWO_OPT_CANDIDATES].tolist():
+                if lateness[s] <= 0:
+                    break
+                if s > 0:
+                    moves.append(s * len(x) + int(np.argmin(delta[s, :s])))
+
+        for move in moves:
+            if time.perf_counter() > deadline:
+                return None
+
+            s, k = divmod(move, len(x))
+            i = s + 1
+            run = tour[i:i + length]
+            if backward[s, k] < forward[s, k]:
+                run = run[::-1]
+            rest = np.concatenate((tour[:i], tour[i + length:]))
+            at = k + 1 if k < i else k + 1 - length
+
+            candidate = np.concatenate((rest[:at], run, rest[at:]))
+            candidate_cost = score(candidate)
+            if score.total(candidate_cost) < score.total(cost) - _EPS:
+                return candidate, candidate_cost
+
+    return None
+
+
+class _Score:
+    def __init__(self, km, deadlines, speed_kmh, service_hours):
+        self.km = km
+        self.deadlines = deadlines
+        self.speed_kmh = speed_kmh
+        self.service_hours = service_hours
+
+    def __call__(self, tour):
+        return _evaluate(tour, self.km, self.deadlines, self.speed_kmh, self.service_hours)
+
+    @staticmethod
+    def total(cost):
+        return cost[0] + LATE_PENALTY_KM * cost[1]
+
+
+def solve(km, deadlines, speed_kmh=DEFAULT_SPEED_KMH,
+          service_minutes=DEFAULT_SERVICE_MINUTES, budget_seconds=DEFAULT_BUDGET_SECONDS):
+    """
+    Visiting order for a closed tour from node 0 (the depot) through every
+    other node of km. deadlines[i] is hours from now until node i expires
+    (deadlines[0] is ignored). Nearest-neighbour construction is improved
+    by 2-opt and Or-opt moves until neither helps or budget_seconds runs
+    out. Returns (order, stats) where order lists the non-depot nodes.
+    """
+    started = time.perf_counter()
+    deadline = started + budget_seconds
+
+    km = np.asarray(km, dtype=np.float64)
+    deadlines = np.asarray(deadlines, dtype=np.float64).copy()
+    deadlines[0] = np.inf
+
+    score = _Score(km, deadlines, speed_kmh, service_minutes / 60)
+    tour = _nearest_neighbour(km, deadlines, speed_kmh, score.service_hours)
+    cost = initial = score(tour)
+
+    if len(tour) > 4:
+        while time.perf_counter() < deadline:
+            step = _two_opt(tour, cost, score, deadline) or _or_opt(tour, cost, score, deadline)
+            if step is None:
+                break
+            tour, cost = step
+
+    return tour[1:-1].tolist(), {
+        "initialKm": initial[0],
+        "km": cost[0],
+        "lateHours": cost[1],
+        "ms": (time.perf_counter() - started) * 1000
+    }
+
+
+# =====================
+# NGO routes
+# =====================
+def _scheduled_stops(ngo_id):
+    from app.models.donation_model import Donation
+    from app.models.pickup_model import Pickup
+    from app.models.request_model import Request
+
+    return db.session.query(
+        Request.id, Donation.id, Donation.food_type, Donation.pickup_address,
+        Donation.latitude, Donation.longitude,
+        Donation.expires_at, Donation.created_at, Donation.expiry_hours
+    ).select_from(Request).join(Request.pickup).join(Request.donation).filter(
+        Request.ngo_id == ngo_id,
+        Pickup.status == "SCHEDULED"
+    ).order_by(Request.id).all()
+
+
+def _expires_at(row):
+    if row.expires_at is not None:
+        return row.expires_at
+    return (row.created_at or datetime.utcnow()) + timedelta(hours=row.expiry_hours)
+
+
+def plan_route(ngo, speed_kmh=DEFAULT_SPEED_KMH, service_minutes=DEFAULT_SERVICE_MINUTES,
+               budget_seconds=DEFAULT_BUDGET_SECONDS):
+    """
+    Visiting order for the NGO's SCHEDULED pickups, starting and ending at
+    the NGO. Raises ValueError when the NGO has no coordinates. Pickups
+    without coordinates cannot be placed and are listed as unrouted.
+    """
+    if ngo.latitude is None or ngo.longitude is None:
+        raise ValueError("NGO location is unknown")
+
+    now = datetime.utcnow()
+    rows, unrouted = {}, []
+    for row in _scheduled_stops(ngo.id):
+        if row.latitude is None or row.longitude is None:
+            unrouted.append(row[0])
+        else:
+            rows[row[0]] = row
+
+    matrix = matrices.get(ngo.id, (ngo.latitude, ngo.longitude))
+    keys, km = matrix.sync({key: (row.latitude, row.longitude) for key, row in rows.items()})
+
+    expires = [_expires_at(rows[key]) for key in keys]
+    deadlines = [math.inf] + [(at - now).total_seconds() / 3600 for at in expires]
+
+    order, stats = solve(km, deadlines, speed_kmh, service_minutes, budget_seconds)
+
+    stops, clock, previous = [], 0.0, 0
+    for node in order:
+        clock += km[previous, node] / speed_kmh
+        row = rows[keys[node - 1]]
+        stops.append({
+            "requestId": row[0],
+            "donationId": row[1],
+            "foodType": row.food_type,
+            "pickupAddress": row.pickup_address,
+            "lat": row.latitude,
+            "lon": row.longitude,
+            "legKm": round(float(km[previous, node]), 2),
+            "etaMinutes": round(clock * 60),
+            "expiresInMinutes": round(deadlines[node] * 60),
+            "late": clock > deadlines[node]
+        })
+        clock += service_minutes / 60
+        previous = node
+
+    return {
+        "stops": stops,
+        "totalKm": round(stats["km"], 2),
+        "lateStops": sum(stop["late"] for stop in stops),
+        "unrouted": unrouted,
+        "planMs": round(stats["ms"], 1)
+    }
+
+
+def stop_claimed(ngo_id, donation_id):
+    """Add a fresh claim to the NGO's cached matrix, if this worker holds one."""
+    matrix = matrices.peek(ngo_id)
+    if matrix is None:
+        return
+
+    from app.models.donation_model import Donation
+    from app.models.request_model import Request
+
+    row = db.session.query(Request.id, Donation.latitude, Donation.longitude) \
+        .join(Request.donation) \
+        .filter(Request.donation_id == donation_id, Request.ngo_id == ngo_id) \
+        .first()
+    if row is not None and row.latitude is not None and row.longitude is not None:
+        matrix.add(row[0], row.latitude, row.longitude)
@@ -0,0 +1,400 @@
+import bisect
+import math
+import re
+import threading
+import time
+
+from flask import current_app
+from sqlalchemy import func, literal_column
+
+from app import db
+from app.utils.cache import TTLCache
+from app.utils.pagination import decode_cursor, encode_cursor
+
+_TOKEN_RE = re.compile(r"[a-z0-9]+")
+
+# Query tokens shorter than this only match whole terms, never prefixes
+MIN_PREFIX_LENGTH = 2
+# Query tokens at least this long also match terms one edit away
+MIN_TYPO_LENGTH = 4
+# Bound on how many vocabulary terms a single prefix may expand to
+MAX_PREFIX_EXPANSIONS = 64
+
+# Relative weight of how a query token matched a term
+EXACT, PREFIX, TYPO = 1.0, 0.7, 0.5
+
+# Ids per query when narrowing in-memory hits by SQL criteria
+FALLBACK_FILTER_BATCH = 500
+
+
+def tokenize(text):
+    return _TOKEN_RE.findall(text.lower()) if text else []
+
+
+def _deletes(term):
+    return {term[:i] + term[i + 1:] for i in range(len(term))}
+
+
+def _within_one_edit(a, b):
+    """Optimal string alignment distance <= 1 (substitution, indel or transposition)."""
+    if a == b:
+        return True
+    la, lb = len(a), len(b)
+    if abs(la - lb) > 1:
+        return False
+
+    if la == lb:
+        diff = [i for i in range(la) if a[i] != b[i]]
+        if len(diff) == 1:
+            return True
+        return (len(diff) == 2 and diff[1] == diff[0] + 1
+                and a[diff[0]] == b[diff[1]] and a[diff[1]] == b[diff[0]])
+
+    if la > lb:
+        a, b = b, a
+    i = 0
+    while i < len(a) and a[i] == b[i]:
+        i += 1
+    return a[i:] == b[i + 1:]
+
+
+# =====================
+# Inverted index
+# =====================
+class InvertedIndex:
+    """
+    In-memory inverted index over weighted text fields.
+
+    Each query token matches whole terms, vocabulary terms it prefixes and
+    (for longer tokens) terms one edit away, found through a deletion
+    neighbourhood map. A document must match every query token; it scores
+    the sum over tokens of match weight x idf x field weight, so hits in a
+    heavier field (food type over notes, name over area) rank first.
+    """
+
+    def __init__(self):
+        self._postings = {}     # term -> {doc_id: field weight}
+        self._docs = {}         # doc_id -> terms
+        self._vocabulary = []   # sorted terms, for prefix ranges
+        self._neighbours = {}   # term or term minus one char -> {terms}
+
+    def __len__(self):
+        return len(self._docs)
+
+    def __contains__(self, doc_id):
+        return doc_id in self._docs
+
+    def add(self, doc_id, fields):
+        """fields: [(text, weight)]."""
+        self.remove(doc_id)
+
+        weights = {}
+        for text, weight in fields:
+            for term in tokenize(text):
+                weights[term] = weights.get(term, 0) + weight
+
+        for term, weight in weights.items():
+            postings = self._postings.get(term)
+            if postings is None:
+                postings = self._postings[term] = {}
+                bisect.insort(self._vocabulary, term)
+                for key in _deletes(term) | {term}:
+                    self._neighbours.setdefault(key, set()).add(term)
+            postings[doc_id] = weight
+
+        self._docs[doc_id] = tuple(weights)
+
+    def remove(self, doc_id):
+        terms = self._docs.pop(doc_id, None)
+        if terms is None:
+            return
+
+        for term in terms:
+            postings = self._postings[term]
+            postings.pop(doc_id, None)
+            if postings:
+                continue
+
+            del self._postings[term]
+            del self._vocabulary[bisect.bisect_left(self._vocabulary, term)]
+            for key in _deletes(term) | {term}:
+                bucket = self._neighbours.get(key)
+                if bucket is not None:
+                    bucket.discard(term)
+                    if not bucket:
+                        del self._neighbours[key]
+
+    def clear(self):
+        self._postings.clear()
+        self._docs.clear()
+        self._vocabulary.clear()
+        self._neighbours.clear()
+
+    def _expand(self, token):
+        """{term: match weight} for one query token."""
+        matches = {}
+
+        if len(token) >= MIN_TYPO_LENGTH:
+            for key in _deletes(token) | {token}:
+                for term in self._neighbours.get(key, ()):
+                    if _within_one_edit(token, term):
+                        matches[term] = TYPO
+
+        if len(token) >= MIN_PREFIX_LENGTH:
+            lo = bisect.bisect_left(self._vocabulary, token)
+            hi = bisect.bisect_left(self._vocabulary, token + "\uffff")
+            prefixed = self._vocabulary[lo:hi]
+            if len(prefixed) > MAX_PREFIX_EXPANSIONS:
+                # Keep the most common completions
+                prefixed = sorted(prefixed, key=lambda t: -len(self._postings[t]))
+                prefixed = prefixed[:MAX_PREFIX_EXPANSIONS]
+            for term in prefixed:
+                matches[term] = max(matches.get(term, 0), PREFIX)
+
+        if token in self._postings:
+            matches[token] = EXACT
+
+        return matches
+
+    def search(self, text):
+        """Every matching doc as [(score, doc_id)], best first (ties by id)."""
+        tokens = list(dict.fromkeys(tokenize(text)))
+        if not tokens:
+            return []
+
+        total = len(self._docs) or 1
+        scored = None
+
+        for token in tokens:
+            best = {}
+            for term, match in self._expand(token).items():
+                postings = self._postings[term]
+                idf = math.log(1 + total / len(postings))
+                for doc_id, weight in postings.items():
+                    if scored is not None and doc_id not in scored:
+                        continue
+                    score = match * idf * weight
+                    if score > best.get(doc_id, 0):
+                        best[doc_id] = score
+
+            if scored is None:
+                scored = best
+            else:
+                scored = {doc_id: scored[doc_id] + s for doc_id, s in best.items()}
+            if not scored:
+                return []
+
+        return sorted(((round(s, 6), doc_id) for doc_id, s in scored.items()),
+                      key=lambda r: (-r[0], r[1]))
+
+
+class SyncedSearchIndex:
+    """
+    InvertedIndex kept in step with a table: new rows are pulled by id
+    watermark, and an optional periodic full rebuild picks up edits.
+    Ranked results are cached per query for a short TTL.
+    """
+
+    def __init__(self, loader, rebuild_seconds=None, cache_size=256):
+        self._loader = loader
+        self._index = InvertedIndex()
+        self._lock = threading.Lock()
+        self._watermark = 0
+        self._built_at = None
+        self.rebuild_seconds = rebuild_seconds
+        self._results = TTLCache(maxsize=cache_size, ttl=30)
+
+    def __len__(self):
+        return len(self._index)
+
+    def _load(self, after_id=0):
+        for doc_id, fields in self._loader(after_id):
+            self._index.add(doc_id, fields)
+            self._watermark = max(self._watermark, doc_id)
+
+    def sync(self):
+        with self._lock:
+            stale = self.rebuild_seconds is not None and self._built_at is not None \
+                and time.monotonic() - self._built_at > self.rebuild_seconds
+            if self._built_at is None or stale:
+                self._index.clear()
+                self._watermark = 0
+                self._load()
+                self._built_at = time.monotonic()
+                self._results.clear()
+            else:
+                self._load(after_id=self._watermark)
+
+    def invalidate(self):
+        self._results.clear()
+
+    def _ranked(self, text):
+        key = " ".join(tokenize(text))
+        ranked = self._results.get(key)
+        if ranked is None:
+            self.sync()
+            with self._lock:
+                ranked = self._index.search(key)
+            self._results.set(key, ranked, current_app.config.get("SEARCH_CACHE_SECONDS", 30))
+        return ranked
+
+    def search(self, text):
+        """Ranked [(score, doc_id)] for text."""
+        return self._ranked(text)
+
+
+# =====================
+# Paging over ranked results
+# =====================
+def page(ranked, limit, cursor=None, offset=0):
+    """
+    Slice ranked [(score, id)] after cursor (from the previous page), or
+    from offset when there is none. Returns (page, next_cursor or None).
+    Raises ValueError on a bad cursor.
+    """
+    start = offset
+    if cursor:
+        score, doc_id = decode_cursor(cursor, 2)
+        if not isinstance(score, (int, float)) or not isinstance(doc_id, int):
+            raise ValueError("Invalid cursor")
+        key = (-float(score), int(doc_id))
+        lo, hi = 0, len(ranked)
+        while lo < hi:
+            mid = (lo + hi) // 2
+            if (-ranked[mid][0], ranked[mid][1]) <= key:
+                lo = mid + 1
+            else:
+                hi = mid
+        start = lo
+
+    rows = ranked[start:start + limit]
+    more = start + limit < len(ranked)
+    return rows, (encode_cursor(rows[-1]) if more and rows else None)
+
+
+# =====================
+# Table search
+# =====================
+# Literals rather than bind parameters: PostgreSQL only uses an expression
+# index when the query repeats the indexed expression verbatim.
+_TS_CONFIG = literal_column("'simple'::regconfig")
+
+
+def search_document(*fields):
+    """
+    Weighted tsvector over [(column, weight letter)]. Both the GIN index
+    and TableSearch build it from here so the two expressions match.
+    """
+    vectors = [
+        func.setweight(
+            func.to_tsvector(_TS_CONFIG, func.coalesce(column, literal_column("''"))),
+            literal_column(f"'{weight}'")
+        )
+        for column, weight in fields
+    ]
+    document = vectors[0]
+    for vector in vectors[1:]:
+        document = document.op("||")(vector)
+    return document
+
+
+def prefix_query(text):
+    """tsquery text where every token must match a term it prefixes."""
+    return " & ".join(f"{token}:*" for token in dict.fromkeys(tokenize(text)))
+
+
+class TableSearch:
+    """
+    Ranked search over a table's text, narrowed by SQL criteria.
+
+    On PostgreSQL the table's search_document is matched against a prefix
+    tsquery through its GIN expression index and ranked with ts_rank, with
+    the criteria in the same WHERE: nothing is held in memory and only rows
+    the caller may see are scored. Other databases (SQLite in development
+    and tests) fall back to an in-memory SyncedSearchIndex whose hits are
+    narrowed by the criteria in SQL.
+    """
+
+    def __init__(self, model, index_name, fallback):
+        self._model = model
+        self.index_name = index_name
+        self.fallback = fallback
+
+    def _document(self):
+        # The indexed expression itself, so the planner can match the index
+        model = self._model()
+        index = next(i for i in model.__table__.indexes if i.name == self.index_name)
+        return model.id, index.expressions[0]
+
+    def search(self, text, *criteria):
+        """Ranked [(score, id)] of rows matching text and every criterion."""
+        if db.session.get_bind().dialect.name == "postgresql":
+            return self._search_sql(text, criteria)
+        return self._search_fallback(text, criteria)
+
+    def _search_sql(self, text, criteria):
+        id_column, document = self._document()
+        query = func.to_tsquery(_TS_CONFIG, prefix_query(text))
+
+        rows = db.session.query(id_column, func.ts_rank(document, query)) \
+            .filter(document.op("@@")(query), *criteria)
+
+        return sorted(((round(score, 6), row_id) for row_id, score in rows),
+                      key=lambda r: (-r[0], r[1]))
+
+    def _search_fallback(self, text, criteria):
+        ranked = self.fallback.search(text)
+        if not criteria or not ranked:
+            return ranked
+
+        id_column = self._model().id
+        allowed = set()
+        for start in range(0, len(ranked), FALLBACK_FILTER_BATCH):
+            chunk = [row_id for _, row_id in ranked[start:start + FALLBACK_FILTER_BATCH]]
+            allowed.update(row_id for row_id, in db.session.query(id_column).filter(
+                id_column.in_(chunk), *criteria
+            ))
+        return [r for r in ranked if r[1] in allowed]
+
+
+# =====================
+# Indexes
+# =====================
+def _donation_model():
+    from app.models.donation_model import Donation
+    return Donation
+
+
+def _ngo_model():
+    from app.models.ngo_model import NGO
+    return NGO
+
+
+def _donation_rows(after_id):
+    Donation = _donation_model()
+
+    rows = db.session.query(Donation.id, Donation.food_type, Donation.notes) \
+        .filter(Donation.id > after_id).order_by(Donation.id).yield_per(5000)
+
+    for donation_id, food_type, notes in rows:
+        yield donation_id, [(food_type, 2.0), (notes, 1.0)]
+
+
+def _ngo_rows(after_id):
+    NGO = _ngo_model()
+
+    rows = db.session.query(NGO.id, NGO.name, NGO.area) \
+        .filter(NGO.id > after_id).order_by(NGO.id)
+
+    for ngo_id, name, area in rows:
+        yield ngo_id, [(name, 2.0), (area, 1.0)]
+
+
+# Fallback indexes are rebuilt periodically: ids do not commit in order, so
+# the watermark alone can skip rows, and NGOs get renamed.
+donations = TableSearch(
+    _donation_model, "ix_donations_search", SyncedSearchIndex(_donation_rows, rebuild_seconds=300)
+)
+ngos = TableSearch(
+    _ngo_model, "ix_ngos_search", SyncedSearchIndex(_ngo_rows, rebuild_seconds=300)
+)
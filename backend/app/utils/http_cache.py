@@ -0,0 +1,255 @@
+import hashlib
+import logging
+import threading
+from abc import ABC, abstractmethod
+from collections import namedtuple
+from functools import wraps
+
+from flask import current_app, request
+from flask_jwt_extended import get_jwt_identity
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+
+from app.utils.cache import TTLCache
+
+logger = logging.getLogger(__name__)
+
+# What is stored per cached response
+CachedResponse = namedtuple("CachedResponse", ["versions", "etag", "body", "mimetype", "headers"])
+
+_PENDING_KEY = "http_cache_tables"
+
+
+# =====================
+# Backends
+# =====================
+class CacheBackend(ABC):
+    """
+    Storage for cached responses and per-table version stamps. The in-memory
+    backend below is per process: a write elsewhere only reaches it through
+    BrokerBackend, which create_app installs with EVENT_BROKER=postgres.
+    Install any other implementation with set_backend().
+    """
+
+    @abstractmethod
+    def get(self, key):
+        ...
+
+    @abstractmethod
+    def set(self, key, value, ttl):
+        ...
+
+    @abstractmethod
+    def versions(self, tables):
+        """Current stamp of each table, as a tuple in the given order."""
+
+    @abstractmethod
+    def bump(self, tables):
+        ...
+
+
+class InMemoryBackend(CacheBackend):
+    def __init__(self, maxsize=2048):
+        self._responses = TTLCache(maxsize=maxsize, ttl=30)
+        self._versions = {}
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        return self._responses.get(key)
+
+    def set(self, key, value, ttl):
+        self._responses.set(key, value, ttl)
+
+    def versions(self, tables):
+        return tuple(self._versions.get(table, 0) for table in tables)
+
+    def bump(self, tables):
+        with self._lock:
+            for table in tables:
+                self._versions[table] = self._versions.get(table, 0) + 1
+
+
+class BrokerBackend(InMemoryBackend):
+    """
+    InMemoryBackend whose bumps are also published on an event broker and
+    applied by every process subscribed to it (PostgresBroker: LISTEN/
+    NOTIFY), so a commit in one gunicorn worker, the expiry scheduler or
+    the batch allocator invalidates entries everywhere. A bump applies
+    locally at once and elsewhere when the notification lands; one lost
+    while a listener reconnects leaves entries to HTTP_CACHE_SECONDS.
+    """
+
+    CHANNEL = "http_cache"
+
+    def __init__(self, broker, maxsize=2048):
+        super().__init__(maxsize)
+        self._broker = broker
+        self._subscription = None
+        self._listener = None
+        self._listener_lock = threading.Lock()
+
+    def versions(self, tables):
+        self._ensure_listener()
+        return super().versions(tables)
+
+    def bump(self, tables):
+        super().bump(tables)
+        try:
+            self._broker.publish(self.CHANNEL, {"tables": sorted(tables)})
+        except Exception:
+            logger.exception("Could not publish cache invalidation for %s", sorted(tables))
+
+    def _ensure_listener(self):
+        # Started by the first cached request, so it runs in the worker
+        # process rather than the master it was forked from
+        if self._listener is not None and self._listener.is_alive():
+            return
+        with self._listener_lock:
+            if self._listener is not None and self._listener.is_alive():
+                return
+            if self._subscription is not None:
+                self._subscription.close()
+            self._subscription = self._broker.subscribe(self.CHANNEL, maxsize=10000)
+            self._listener = threading.Thread(
+                target=self._apply_forever, args=(self._subscription,),
+                name="http-cache-listener", daemon=True
+            )
+            self._listener.start()
+
+    def _apply_forever(self, subscription):
+        while True:
+            message = subscription.get(timeout=30)
+            if message is not None:
+                # Our own bumps come back too; a second increment is harmless
+                InMemoryBackend.bump(self, message["tables"])
+
+
+_backend = InMemoryBackend()
+
+
+def get_backend():
+    return _backend
+
+
+def set_backend(backend):
+    global _backend
+    _backend = backend
+
+
+# =====================
+# Invalidation
+# =====================
+# Tables written in a transaction are collected on the session and bumped
+# only once it commits, so readers never cache a state that rolled back.
+def _pending(session):
+    return session.info.setdefault(_PENDING_KEY, set())
+
+
+def _after_flush(session, flush_context):
+    pending = _pending(session)
+    for obj in (*session.new, *session.dirty, *session.deleted):
+        table = getattr(obj, "__table__", None)
+        if table is not None:
+            pending.add(table.name)
+
+
+def _do_orm_execute(state):
+    # Bulk INSERT/UPDATE/DELETE statements never reach the flush
+    if state.is_insert or state.is_update or state.is_delete:
+        table = getattr(state.statement, "table", None)
+        if table is not None:
+            _pending(state.session).add(table.name)
+
+
+def _after_commit(session):
+    tables = session.info.pop(_PENDING_KEY, None)
+    if tables:
+        _backend.bump(tables)
+
+
+def _after_rollback(session):
+    session.info.pop(_PENDING_KEY, None)
+
+
+def register_session_events():
+    if event.contains(Session, "after_commit", _after_commit):
+        return
+    event.listen(Session, "after_flush", _after_flush)
+    event.listen(Session, "do_orm_execute", _do_orm_execute)
+    event.listen(Session, "after_commit", _after_commit)
+    event.listen(Session, "after_rollback", _after_rollback)
+
+
+# =====================
+# Conditional GET
+# =====================
+def _etag_matches(etag):
+    header = request.headers.get("If-None-Match")
+    if not header:
+        return False
+    return header.strip() == "*" or etag in (tag.strip() for tag in header.split(","))
+
+
+def _respond(entry):
+    headers = dict(entry.headers)
+    headers["ETag"] = entry.etag
+    headers["Cache-Control"] = "private, no-cache"
+
+    if _etag_matches(entry.etag):
+        return current_app.response_class(status=304, headers=headers)
+
+    return current_app.response_class(entry.body, mimetype=entry.mimetype, headers=headers)
+
+
+def cached_response(*tables, vary=None):
+    """
+    Cache a GET view's 200 responses per (endpoint, user, query string).
+    An entry is served while the version stamps of tables are unchanged,
+    so a hit costs no query and no serialization. vary() returns anything
+    else the response depends on (process-local caches, say) and is part
+    of the key. Responses carry a strong ETag and answer If-None-Match
+    with 304. Apply below the auth decorators.
+    """
+    def wrapper(fn):
+        @wraps(fn)
+        def decorator(*args, **kwargs):
+            config = current_app.config
+            if not config.get("HTTP_CACHE_ENABLED", True):
+                return fn(*args, **kwargs)
+
+            backend = _backend
+            key = (
+                request.endpoint,
+                get_jwt_identity(),
+                tuple(sorted(request.args.items(multi=True))),
+                tuple(sorted(kwargs.items())),
+                vary() if vary is not None else None
+            )
+            # Read the stamps before running the view: a write that lands
+            # while it runs makes this entry stale rather than hiding the write
+            versions = backend.versions(tables)
+
+            entry = backend.get(key)
+            if entry is not None and entry.versions == versions:
+                return _respond(entry)
+
+            response = current_app.make_response(fn(*args, **kwargs))
+            if response.status_code != 200 or response.is_streamed:
+                return response
+
+            body = response.get_data()
+            entry = CachedResponse(
+                versions=versions,
+                etag=f'"{hashlib.sha1(body).hexdigest()}"',
+                body=body,
+                mimetype=response.mimetype,
+                headers=tuple(
+                    (name, value) for name, value in response.headers.items()
+                    if name not in ("Content-Type", "Content-Length")
+                )
+            )
+            backend.set(key, entry, config.get("HTTP_CACHE_SECONDS", 30))
+            return _respond(entry)
+
+        return decorator
+    return wrapper
@@ -0,0 +1,91 @@
+import logging
+import random
+from collections import namedtuple
+
+from flask import current_app
+from flask_jwt_extended import create_access_token, get_jwt, get_jwt_identity
+
+from app.utils.cache import TTLCache
+
+logger = logging.getLogger(__name__)
+
+# What authenticated routes need about the caller, without a User row.
+# Nothing admin-toggled lives here: NGO verification is on the ngos table.
+UserProfile = namedtuple(
+    "UserProfile",
+    ["id", "role", "performance_score", "latitude", "longitude"]
+)
+
+_profiles = TTLCache(maxsize=4096, ttl=60)
+
+
+# =====================
+# Tokens
+# =====================
+def issue_access_token(user):
+    # Role never changes for a user, so it is safe to carry in the token;
+    # mutable fields (score, location) come from the profile cache instead.
+    return create_access_token(
+        identity=str(user.id),
+        additional_claims={"role": user.role.value}
+    )
+
+
+def current_user_id():
+    return int(get_jwt_identity())
+
+
+def current_role():
+    return get_jwt().get("role")
+
+
+# =====================
+# Profile cache
+# =====================
+def _load_profile(user_id):
+    from app.models.user_model import User
+
+    user = User.query.get(user_id)
+    if user is None:
+        return None
+
+    return UserProfile(
+        id=user.id,
+        role=user.role.value,
+        performance_score=user.performance_score or 0,
+        latitude=user.latitude,
+        longitude=user.longitude
+    )
+
+
+def get_profile(user_id):
+    profile = _profiles.get(user_id)
+    if profile is None:
+        profile = _load_profile(user_id)
+        if profile is not None:
+            _profiles.ttl = current_app.config.get("PROFILE_CACHE_SECONDS", 60)
+            _profiles.set(user_id, profile)
+    return profile
+
+
+def current_profile():
+    return get_profile(current_user_id())
+
+
+def invalidate_profile(user_id):
+    # Local to this process; other workers pick the change up within the TTL
+    _profiles.pop(user_id)
+
+
+# =====================
+# Logging
+# =====================
+def log_sampled(level, msg, *args):
+    """Log at level, but only for a sampled fraction of calls below WARNING."""
+    if not logger.isEnabledFor(level):
+        return
+    if level < logging.WARNING:
+        rate = current_app.config.get("AUTH_LOG_SAMPLE_RATE", 0.01)
+        if random.random() >= rate:
+            return
+    logger.log(level, msg, *args)
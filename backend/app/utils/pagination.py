@@ -0,0 +1,189 @@
+import base64
+import json
+import logging
+from datetime import datetime
+
+from flask import current_app, request
+from sqlalchemy import and_, func, literal, or_, select, text, tuple_
+
+from app import db
+from app.utils.cache import TTLCache
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_PAGE_SIZE = 50
+MAX_PAGE_SIZE = 200
+
+COUNT_STRATEGIES = ("exact", "cached", "estimate")
+
+_counts = TTLCache(maxsize=4096, ttl=30)
+
+
+# =====================
+# Cursor tokens
+# =====================
+def encode_cursor(values):
+    """Opaque, URL-safe token for the sort key of the last row on a page."""
+    payload = [
+        {"dt": v.isoformat()} if isinstance(v, datetime) else v
+        for v in values
+    ]
+    raw = json.dumps(payload, separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_cursor(token, size):
+    """Inverse of encode_cursor; raises ValueError for anything malformed."""
+    try:
+        raw = base64.urlsafe_b64decode(token + "=" * (-len(token) % 4))
+        payload = json.loads(raw)
+    except (ValueError, TypeError):
+        raise ValueError("Invalid cursor")
+
+    if not isinstance(payload, list) or len(payload) != size:
+        raise ValueError("Invalid cursor")
+
+    return [_decode_value(v) for v in payload]
+
+
+def _decode_value(value):
+    if isinstance(value, dict):
+        # Only shape encode_cursor writes: {"dt": "<ISO datetime>"}
+        if set(value) != {"dt"} or not isinstance(value["dt"], str):
+            raise ValueError("Invalid cursor")
+        try:
+            return datetime.fromisoformat(value["dt"])
+        except ValueError:
+            raise ValueError("Invalid cursor")
+
+    if value is not None and not isinstance(value, (str, int, float)):
+        raise ValueError("Invalid cursor")
+    return value
+
+
+def page_size(default=DEFAULT_PAGE_SIZE, maximum=MAX_PAGE_SIZE):
+    """?limit= clamped to [1, maximum]."""
+    return max(1, min(request.args.get("limit", default, type=int), maximum))
+
+
+# =====================
+# Keyset pages
+# =====================
+def _check_types(order, values):
+    for (column, _), value in zip(order, values):
+        try:
+            expected = column.type.python_type
+        except NotImplementedError:
+            continue
+        if expected is float:
+            expected = (int, float)
+        if not isinstance(value, expected) or (isinstance(value, bool) and expected is not bool):
+            raise ValueError("Invalid cursor")
+
+
+def _after(order, values):
+    """WHERE clause selecting rows strictly after values in the given order."""
+    # Bind cursor values with the column types so datetimes compare correctly
+    values = [literal(v, column.type) for (column, _), v in zip(order, values)]
+
+    directions = {descending for _, descending in order}
+    if len(directions) == 1:
+        # Uniform direction: one row-value comparison the index can seek on
+        columns = tuple_(*(column for column, _ in order))
+        return columns < tuple_(*values) if directions.pop() else columns > tuple_(*values)
+
+    clauses = []
+    for i, (column, descending) in enumerate(order):
+        equal = [c == v for (c, _), v in zip(order[:i], values[:i])]
+        step = column < values[i] if descending else column > values[i]
+        clauses.append(and_(*equal, step))
+    return or_(*clauses)
+
+
+def keyset_page(query, order, limit, cursor=None, key=None, offset=0):
+    """
+    One page of query ordered by order = [(column, descending)], which must
+    end in a unique column (usually the primary key). key(row) returns the
+    row's values for those columns; by default they are read as attributes
+    named after each column. Returns (rows, next_cursor or None) and raises
+    ValueError on a bad cursor. Every page is an index seek, so page 1000
+    costs the same as page 1; offset exists only for legacy page numbers.
+    """
+    if key is None:
+        names = [column.key for column, _ in order]
+        key = lambda row: [getattr(row, name) for name in names]
+
+    if cursor:
+        values = decode_cursor(cursor, len(order))
+        _check_types(order, values)
+        query = query.filter(_after(order, values))
+
+    query = query.order_by(None).order_by(*(column.desc() if descending else column.asc()
+                             for column, descending in order))
+    if offset:
+        query = query.offset(offset)
+    rows = query.limit(limit + 1).all()
+
+    if len(rows) <= limit:
+        return rows, None
+
+    rows = rows[:limit]
+    return rows, encode_cursor(key(rows[-1]))
+
+
+# =====================
+# Counts
+# =====================
+def _statement_key(stmt):
+    compiled = stmt.compile(dialect=db.session.get_bind().dialect)
+    return str(compiled), tuple(sorted((k, repr(v)) for k, v in compiled.params.items()))
+
+
+def _exact(stmt):
+    return db.session.execute(
+        select(func.count()).select_from(stmt.order_by(None).subquery())
+    ).scalar() or 0
+
+
+def _estimate(stmt):
+    """Planner row estimate (PostgreSQL only); None when unavailable."""
+    bind = db.session.get_bind()
+    if bind.dialect.name != "postgresql":
+        return None
+
+    try:
+        sql = str(stmt.order_by(None).compile(
+            dialect=bind.dialect, compile_kwargs={"literal_binds": True}
+        ))
+        # Savepoint so a failed EXPLAIN does not abort the caller's transaction
+        with db.session.begin_nested():
+            plan = db.session.execute(text(f"EXPLAIN (FORMAT JSON) {sql}")).scalar()
+        return int(plan[0]["Plan"]["Plan Rows"])
+    except Exception:
+        logger.debug("Row estimate unavailable, falling back to a count", exc_info=True)
+        return None
+
+
+def count(query, strategy=None):
+    """
+    Total rows for a list query.
+
+    "exact" runs COUNT(*) every time; "cached" (default) shares an exact
+    count across requests for PAGINATION_COUNT_SECONDS; "estimate" reads
+    the planner's row estimate on PostgreSQL and is cached the same way.
+    """
+    config = current_app.config
+    strategy = strategy or config.get("PAGINATION_COUNT_STRATEGY", "cached")
+    stmt = query.statement if hasattr(query, "statement") else query
+
+    if strategy == "exact":
+        return _exact(stmt)
+
+    key = (strategy,) + _statement_key(stmt)
+    total = _counts.get(key)
+    if total is None:
+        total = _estimate(stmt) if strategy == "estimate" else None
+        if total is None:
+            total = _exact(stmt)
+        _counts.set(key, total, config.get("PAGINATION_COUNT_SECONDS", 30))
+    return total
@@ -0,0 +1,82 @@
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from flask import current_app
+from werkzeug.security import check_password_hash, generate_password_hash
+
+# Werkzeug's default; the full spec (with cost parameters) is what gets
+# compared against stored hashes to decide whether to rehash on login
+DEFAULT_METHOD = "scrypt:32768:8:1"
+
+
+class HashingBusy(Exception):
+    """Raised when the hashing queue is full; callers should answer 503."""
+
+
+class PasswordHasher:
+    """
+    Runs password hashing on a bounded pool sized to the CPU count.
+
+    hashlib releases the GIL while hashing, so a login storm saturates at
+    most `workers` cores and everything else keeps being served. Work beyond
+    `workers + max_queue` in flight is refused immediately instead of queued.
+    """
+
+    def __init__(self, workers=None, max_queue=None):
+        self.workers = workers or os.cpu_count() or 1
+        self.max_queue = self.workers * 4 if max_queue is None else max_queue
+        self._slots = threading.BoundedSemaphore(self.workers + self.max_queue)
+        self._executor = ThreadPoolExecutor(
+            max_workers=self.workers, thread_name_prefix="password-hash"
+        )
+
+    def _run(self, fn, *args):
+        if not self._slots.acquire(blocking=False):
+            raise HashingBusy()
+        try:
+            future = self._executor.submit(fn, *args)
+        except BaseException:
+            self._slots.release()
+            raise
+        future.add_done_callback(lambda _: self._slots.release())
+        return future.result()
+
+    def hash(self, password, method):
+        return self._run(generate_password_hash, password, method)
+
+    def verify(self, password_hash, password):
+        return self._run(check_password_hash, password_hash, password)
+
+
+_hasher = None
+_hasher_lock = threading.Lock()
+
+
+def _get_hasher():
+    global _hasher
+    if _hasher is None:
+        with _hasher_lock:
+            if _hasher is None:
+                config = current_app.config
+                _hasher = PasswordHasher(
+                    workers=config.get("PASSWORD_HASH_WORKERS"),
+                    max_queue=config.get("PASSWORD_HASH_MAX_QUEUE")
+                )
+    return _hasher
+
+
+def hash_method():
+    return current_app.config.get("PASSWORD_HASH_METHOD") or DEFAULT_METHOD
+
+
+def hash_password(password):
+    return _get_hasher().hash(password, hash_method())
+
+
+def verify_password(password_hash, password):
+    return _get_hasher().verify(password_hash, password)
+
+
+def needs_rehash(password_hash):
+    return password_hash.split("$", 1)[0] != hash_method()
@@ -1,6 +1,11 @@
-def success_response(message, data=None):
-    return {
+def success_response(message, data=None, headers=None):
+    body = {
         "success": True,
         "message": message,
         "data": data
-    }, 200
+    }
+
+    if headers:
+        return body, 200, headers
+
+    return body, 200
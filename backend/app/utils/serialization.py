@@ -0,0 +1,115 @@
+import json
+from datetime import date, datetime
+from decimal import Decimal
+
+from flask.json.provider import JSONProvider
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - optional speedup
+    orjson = None
+
+
+# =====================
+# Encoder
+# =====================
+def _default(value):
+    # Same output as orjson for the types the API returns
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    if isinstance(value, Decimal):
+        return float(value)
+    if hasattr(value, "tolist"):  # numpy scalars and arrays
+        return value.tolist()
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+
+if orjson is not None:
+    _OPTIONS = orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY
+
+    def dumps(value):
+        return orjson.dumps(value, default=_default, option=_OPTIONS)
+
+    loads = orjson.loads
+else:
+    _encoder = json.JSONEncoder(default=_default, separators=(",", ":"), ensure_ascii=False)
+
+    def dumps(value):
+        return _encoder.encode(value).encode()
+
+    loads = json.loads
+
+
+class FastJSONProvider(JSONProvider):
+    """Flask JSON provider backed by orjson when installed, else the stdlib."""
+
+    def dumps(self, obj, **kwargs):
+        return dumps(obj).decode()
+
+    def loads(self, s, **kwargs):
+        return loads(s)
+
+    def response(self, *args, **kwargs):
+        return self._app.response_class(
+            dumps(self._prepare_response_obj(args, kwargs)), mimetype="application/json"
+        )
+
+
+# =====================
+# Row schemas
+# =====================
+class RowSchema:
+    """
+    Output shape for rows selected as plain column tuples.
+
+    Fields are (name, column) or (name, column, convert); a column of None
+    emits a constant null. Query with `*schema.columns` (extra columns may
+    follow) and turn rows into dicts with a per-schema function generated
+    once, so each row is a single dict display with no ORM instance, no
+    to_dict() call and no dict copying for computed fields.
+    """
+
+    def __init__(self, *fields):
+        self.columns = []
+        self._parts = []
+        self._namespace = {}
+
+        for name, column, *convert in fields:
+            if column is None:
+                self._parts.append(f"{name!r}: None")
+                continue
+
+            i = len(self.columns)
+            self.columns.append(column)
+            if convert:
+                self._namespace[f"c{i}"] = convert[0]
+                self._parts.append(f"{name!r}: c{i}(row[{i}])")
+            else:
+                self._parts.append(f"{name!r}: row[{i}]")
+
+        self._encoders = {}
+        self.to_dict = self._encoder(())
+
+    def _encoder(self, extras):
+        encoder = self._encoders.get(extras)
+        if encoder is None:
+            params = "".join(f", e{i}" for i in range(len(extras)))
+            parts = self._parts + [f"{name!r}: e{i}" for i, name in enumerate(extras)]
+            source = f"def encode(row{params}):\n    return {{{', '.join(parts)}}}\n"
+
+            namespace = dict(self._namespace)
+            exec(source, namespace)
+            encoder = self._encoders[extras] = namespace["encode"]
+        return encoder
+
+    def dicts(self, rows, **extras):
+        """
+        Rows -> list of dicts. Each keyword adds a field whose values are
+        given as a sequence aligned with rows (e.g. distanceKm=[...]).
+        """
+        if not extras:
+            encode = self.to_dict
+            return [encode(row) for row in rows]
+
+        encode = self._encoder(tuple(extras))
+        return [encode(row, *values) for row, values in zip(rows, zip(*extras.values()))]
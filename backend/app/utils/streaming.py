@@ -0,0 +1,98 @@
+import csv
+from itertools import islice
+
+from flask import Response, stream_with_context
+
+from app.utils.serialization import dumps
+
+# Rows fetched per server-side cursor round trip and encoded per write
+STREAM_BATCH_ROWS = 1000
+
+
+def batched(iterable, size=STREAM_BATCH_ROWS):
+    """Yield lists of up to size items without materialising iterable."""
+    iterator = iter(iterable)
+    while True:
+        batch = list(islice(iterator, size))
+        if not batch:
+            return
+        yield batch
+
+
+# =====================
+# JSON envelope
+# =====================
+def json_envelope(message, batches, key=None, summary=None):
+    """
+    Emit {"success": true, "message": ..., "data": [...]} piece by piece;
+    batches yields lists of already-serialisable items. With key, data is
+    {key: [...], **summary()} instead, summary being called once the list
+    is written so it can report totals counted along the way.
+    """
+    opening = b"[" if key is None else b"{" + dumps(key) + b":["
+    yield b'{"success":true,"message":' + dumps(message) + b',"data":' + opening
+    first = True
+    for batch in batches:
+        if not batch:
+            continue
+        chunk = b",".join(dumps(item) for item in batch)
+        yield chunk if first else b"," + chunk
+        first = False
+
+    if key is None:
+        yield b"]}"
+        return
+    fields = dumps(summary() if summary is not None else {})
+    yield b"]" + (b"," + fields[1:] if len(fields) > 2 else b"}") + b"}"
+
+
+def stream_success_response(message, batches, headers=None, key=None, summary=None):
+    """Streaming counterpart of success_response for unbounded lists."""
+    return Response(
+        stream_with_context(json_envelope(message, batches, key, summary)),
+        mimetype="application/json", headers=headers
+    )
+
+
+# =====================
+# Exports
+# =====================
+def ndjson_lines(batches):
+    for batch in batches:
+        if batch:
+            yield b"\n".join(dumps(item) for item in batch) + b"\n"
+
+
+class _LineBuffer:
+    """File-like sink for csv.writer that hands back what was written."""
+
+    def __init__(self):
+        self.parts = []
+
+    def write(self, text):
+        self.parts.append(text)
+
+    def drain(self):
+        data = "".join(self.parts).encode()
+        self.parts.clear()
+        return data
+
+
+def csv_lines(header, batches):
+    """header: column names; batches yields lists of row tuples."""
+    buffer = _LineBuffer()
+    writer = csv.writer(buffer)
+
+    writer.writerow(header)
+    yield buffer.drain()
+
+    for batch in batches:
+        writer.writerows(batch)
+        yield buffer.drain()
+
+
+def attachment(generator, mimetype, filename):
+    return Response(stream_with_context(generator), mimetype=mimetype, headers={
+        "Content-Disposition": f'attachment; filename="{filename}"',
+        "X-Accel-Buffering": "no"
+    })
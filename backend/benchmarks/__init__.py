@@ -0,0 +1,8 @@
+"""
+Benchmarks and load tests. They seed their own rows, so each one takes an
+explicit --database-url (or BENCHMARK_DATABASE_URL), refuses anything that
+is not SQLite or a database named as scratch, and deletes what it seeded
+when it finishes. Run from backend/:
+
+    python -m benchmarks.claims --database-url sqlite:////tmp/bench.db
+"""
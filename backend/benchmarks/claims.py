@@ -0,0 +1,108 @@
+"""Race NGOs for the same donations and check each has exactly one winner."""
+import random
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import click
+from flask import current_app
+from sqlalchemy import func
+from sqlalchemy.exc import OperationalError
+
+from benchmarks.harness import database_option, scratch_app, seeded_users
+
+
+def run(threads, donations):
+    """Seed, race and verify inside the current app context; seeded rows are removed."""
+    from app import db
+    from app.models.donation_model import Donation
+    from app.models.request_model import Request
+    from app.models.user_model import User, UserRole
+    from app.services.allocation_service import try_claim
+
+    app = current_app._get_current_object()
+    tag = f"claim-bench-{int(time.time() * 1000)}"
+
+    donor = User(name=tag, email=f"{tag}-donor@example.com", password_hash="x", role=UserRole.DONOR)
+    ngos = [
+        User(name=tag, email=f"{tag}-ngo{i}@example.com", password_hash="x", role=UserRole.NGO)
+        for i in range(threads)
+    ]
+
+    with seeded_users(donor, *ngos):
+        rows = [
+            Donation(donor_id=donor.id, food_type="Rice", quantity="1 kg", expiry_hours=4,
+                     pickup_address="benchmark", status="PENDING")
+            for _ in range(donations)
+        ]
+        db.session.add_all(rows)
+        db.session.commit()
+        donation_ids = [row.id for row in rows]
+        ngo_ids = [ngo.id for ngo in ngos]
+
+        start = threading.Barrier(threads)
+
+        def claim_all(ngo_id):
+            # Every NGO tries every donation, in its own order, as fast as it can
+            order = random.Random(ngo_id).sample(donation_ids, len(donation_ids))
+            wins = retries = 0
+            with app.app_context():
+                start.wait()
+                for donation_id in order:
+                    for _ in range(10):
+                        try:
+                            if try_claim(donation_id, ngo_id) is not None:
+                                db.session.commit()
+                                wins += 1
+                            else:
+                                db.session.rollback()
+                            break
+                        except OperationalError:
+                            # SQLite: writer lock timed out; PostgreSQL never lands here
+                            db.session.rollback()
+                            retries += 1
+                db.session.remove()
+            return wins, retries
+
+        began = time.perf_counter()
+        with ThreadPoolExecutor(threads) as pool:
+            results = list(pool.map(claim_all, ngo_ids))
+        elapsed = time.perf_counter() - began
+
+        wins = sum(w for w, _ in results)
+        retries = sum(r for _, r in results)
+        attempts = threads * donations
+
+        requests = dict(
+            db.session.query(Request.donation_id, func.count(Request.id))
+            .filter(Request.donation_id.in_(donation_ids))
+            .group_by(Request.donation_id)
+        )
+        allocated = db.session.query(func.count(Donation.id)).filter(
+            Donation.id.in_(donation_ids), Donation.status == "ALLOCATED"
+        ).scalar()
+
+    click.echo(f"{threads} threads x {donations} donations on {db.engine.dialect.name}: "
+               f"{attempts / elapsed:,.0f} attempts/s, {wins / elapsed:,.0f} claims/s, "
+               f"{retries} lock retries, {elapsed:.2f}s")
+
+    bad = [donation_id for donation_id in donation_ids if requests.get(donation_id) != 1]
+    if bad or wins != donations or allocated != donations:
+        raise click.ClickException(
+            f"{wins} wins, {allocated} allocated, {len(bad)} donations without exactly one request"
+        )
+    click.echo("OK: exactly one winner per donation")
+
+
+@click.command()
+@database_option
+@click.option("--threads", default=16, show_default=True)
+@click.option("--donations", default=200, show_default=True)
+def main(database_url, threads, donations):
+    """Race NGOs for the same donations and check each has exactly one winner."""
+    with scratch_app(database_url).app_context():
+        run(threads, donations)
+
+
+if __name__ == "__main__":
+    main()
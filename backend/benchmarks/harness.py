@@ -0,0 +1,83 @@
+import os
+from contextlib import contextmanager
+
+import click
+from sqlalchemy.engine import make_url
+
+# A non-SQLite database is only written to if its name contains one of these
+SCRATCH_MARKERS = ("scratch", "bench", "test")
+
+
+def check_scratch(database_url):
+    """Raise click.BadParameter unless database_url is SQLite or a scratch database."""
+    url = make_url(database_url)
+    if url.get_backend_name() == "sqlite":
+        return
+
+    if not any(marker in (url.database or "").lower() for marker in SCRATCH_MARKERS):
+        raise click.BadParameter(
+            f"{url.database!r} does not look like a scratch database; use SQLite or a "
+            f"database whose name contains one of: {', '.join(SCRATCH_MARKERS)}",
+            param_hint="--database-url"
+        )
+
+
+def database_option(command):
+    return click.option(
+        "--database-url", required=True, envvar="BENCHMARK_DATABASE_URL",
+        help="Throwaway database to seed: SQLite, or a name containing "
+             f"{'/'.join(SCRATCH_MARKERS)}."
+    )(command)
+
+
+def scratch_app(database_url):
+    """The app bound to database_url, with its tables created."""
+    check_scratch(database_url)
+
+    # Config is read at import time: point it at the scratch database first
+    os.environ["DATABASE_URL"] = database_url
+    from app import create_app, db
+
+    app = create_app()
+    with app.app_context():
+        db.create_all()
+    return app
+
+
+def delete_seeded(user_ids):
+    """Delete benchmark users and every row hanging off them, then recount the KPIs."""
+    from sqlalchemy import delete, or_, select
+    from app import db
+    from app.models.donation_model import Donation
+    from app.models.pickup_model import Pickup
+    from app.models.request_model import Request
+    from app.models.user_model import User
+    from app.services import kpi_service
+
+    donation_ids = select(Donation.id).where(Donation.donor_id.in_(user_ids)).scalar_subquery()
+    request_ids = select(Request.id).where(or_(
+        Request.ngo_id.in_(user_ids), Request.donation_id.in_(donation_ids)
+    )).scalar_subquery()
+
+    db.session.rollback()
+    db.session.execute(delete(Pickup).where(Pickup.request_id.in_(request_ids)))
+    db.session.execute(delete(Request).where(Request.id.in_(request_ids)))
+    db.session.execute(delete(Donation).where(Donation.donor_id.in_(user_ids)))
+    db.session.execute(delete(User).where(User.id.in_(user_ids)))
+    db.session.commit()
+
+    kpi_service.rebuild()
+
+
+@contextmanager
+def seeded_users(*users):
+    """Add and commit users; on exit delete them and everything they created."""
+    from app import db
+
+    db.session.add_all(users)
+    db.session.commit()
+    user_ids = [user.id for user in users]
+    try:
+        yield users
+    finally:
+        delete_seeded(user_ids)
@@ -0,0 +1,74 @@
+"""
+Rows/s of /api/donor/donations/bulk (JSON, NDJSON, CSV) against the
+single-item endpoint, in-process.
+"""
+import csv
+import io
+import json
+import time
+
+import click
+from flask import current_app
+
+from benchmarks.harness import database_option, scratch_app, seeded_users
+
+
+def _row(i):
+    return {"foodType": "Veg Biryani", "quantity": f"{1 + i % 20} kg",
+            "expiryHours": 1 + i % 12, "pickupAddress": "Salt Lake", "notes": f"line {i}"}
+
+
+def run(rows, single):
+    from app.models.user_model import User, UserRole
+    from app.utils.jwt_utils import issue_access_token
+
+    tag = f"ingest-bench-{int(time.time() * 1000)}"
+    donor = User(name=tag, email=f"{tag}@example.com", password_hash="x", role=UserRole.DONOR)
+
+    items = [_row(i) for i in range(rows)]
+    csv_body = io.StringIO()
+    writer = csv.DictWriter(csv_body, fieldnames=list(items[0]))
+    writer.writeheader()
+    writer.writerows(items)
+
+    bodies = (
+        ("bulk json", "application/json", json.dumps(items)),
+        ("bulk ndjson", "application/x-ndjson", "\n".join(json.dumps(item) for item in items)),
+        ("bulk csv", "text/csv", csv_body.getvalue()),
+    )
+
+    with seeded_users(donor):
+        client = current_app.test_client()
+        headers = {"Authorization": f"Bearer {issue_access_token(donor)}"}
+
+        for label, content_type, body in bodies:
+            began = time.perf_counter()
+            response = client.post("/api/donor/donations/bulk", data=body,
+                                   content_type=content_type, headers=headers)
+            result = json.loads(response.get_data())
+            elapsed = time.perf_counter() - began
+            click.echo(f"{label:12s} {result['data']['created'] / elapsed:9,.0f} rows/s  "
+                       f"({result['data']['created']} created, {result['data']['failed']} failed)")
+
+        began = time.perf_counter()
+        created = sum(
+            client.post("/api/donor/donations", json=_row(i), headers=headers).status_code == 200
+            for i in range(single)
+        )
+        elapsed = time.perf_counter() - began
+        click.echo(f"{'single':12s} {created / elapsed:9,.0f} rows/s  ({created} created)")
+
+
+@click.command()
+@database_option
+@click.option("--rows", default=5000, show_default=True, help="Rows per bulk upload.")
+@click.option("--single", default=300, show_default=True,
+              help="Donations posted one request at a time for comparison.")
+def main(database_url, rows, single):
+    """Bulk upload rows/s per format against single-item posts."""
+    with scratch_app(database_url).app_context():
+        run(rows, single)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,136 @@
+"""
+p50/p99 latency of /api/health and /api/ngo/dashboard. Starts
+`gunicorn -c gunicorn.conf.py` for every workers x pool-size pair (or uses
+--url) and loads it with keep-alive connections.
+"""
+import http.client
+import os
+import socket
+import subprocess
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urlsplit
+
+import click
+import numpy as np
+
+from benchmarks.harness import database_option, scratch_app, seeded_users
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def _hammer(host, port, path, headers, concurrency, seconds):
+    deadline = time.perf_counter() + seconds
+
+    def loop(_):
+        conn = http.client.HTTPConnection(host, port, timeout=30)
+        latencies, errors = [], 0
+        while time.perf_counter() < deadline:
+            began = time.perf_counter()
+            try:
+                conn.request("GET", path, headers=headers)
+                response = conn.getresponse()
+                response.read()
+                if response.status == 200:
+                    latencies.append(time.perf_counter() - began)
+                else:
+                    errors += 1
+            except (OSError, http.client.HTTPException):
+                errors += 1
+                conn.close()
+                conn = http.client.HTTPConnection(host, port, timeout=30)
+        conn.close()
+        return latencies, errors
+
+    with ThreadPoolExecutor(concurrency) as pool:
+        results = list(pool.map(loop, range(concurrency)))
+    ms = np.array([l for r in results for l in r[0]]) * 1000
+    return ms, sum(r[1] for r in results)
+
+
+def _report(label, host, port, endpoints, concurrency, seconds):
+    for name, path, headers in endpoints:
+        ms, errors = _hammer(host, port, path, headers, concurrency, seconds)
+        if not ms.size:
+            click.echo(f"{label:14s} {name:10s} no successful requests ({errors} errors)")
+            continue
+        click.echo(f"{label:14s} {name:10s} {ms.size / seconds:8.0f} req/s  "
+                   f"p50 {np.percentile(ms, 50):7.1f} ms  p99 {np.percentile(ms, 99):7.1f} ms  "
+                   f"{errors} errors")
+
+
+def _serve(worker_count, pool):
+    """Start gunicorn on a free port against the scratch database; returns (process, port)."""
+    with socket.socket() as probe:
+        probe.bind(("127.0.0.1", 0))
+        port = probe.getsockname()[1]
+
+    env = dict(os.environ, BIND=f"127.0.0.1:{port}", WEB_WORKERS=str(worker_count),
+               DB_POOL_SIZE=str(pool), LOG_LEVEL="warning",
+               EXPIRY_SCHEDULER_ENABLED="false", OUTBOX_WORKER="none", OUTBOX_DISPATCH="inline")
+    server = subprocess.Popen(
+        [sys.executable, "-m", "gunicorn", "-c", "gunicorn.conf.py", "--access-logfile", os.devnull],
+        cwd=BACKEND_DIR, env=env
+    )
+
+    for _ in range(300):
+        try:
+            with socket.create_connection(("127.0.0.1", port), timeout=0.1):
+                return server, port
+        except OSError:
+            if server.poll() is not None:
+                raise click.ClickException("gunicorn exited during startup")
+            time.sleep(0.1)
+
+    server.terminate()
+    raise click.ClickException("gunicorn did not start listening")
+
+
+def run(workers, pool_size, concurrency, seconds, url=None):
+    from app.models.user_model import User, UserRole
+    from app.utils.jwt_utils import issue_access_token
+
+    # The dashboard needs an NGO caller
+    tag = f"load-test-{int(time.time() * 1000)}"
+    ngo = User(name=tag, email=f"{tag}-ngo@example.com", password_hash="x", role=UserRole.NGO,
+               latitude=22.58, longitude=88.41, performance_score=50)
+
+    with seeded_users(ngo):
+        auth = {"Authorization": f"Bearer {issue_access_token(ngo)}"}
+        endpoints = (("health", "/api/health", {}), ("dashboard", "/api/ngo/dashboard", auth))
+
+        click.echo(f"{concurrency} concurrent keep-alive clients, {seconds:.0f}s per endpoint")
+
+        if url:
+            parts = urlsplit(url)
+            _report("external", parts.hostname, parts.port or 80, endpoints, concurrency, seconds)
+            return
+
+        for worker_count in workers:
+            for pool in pool_size:
+                server, port = _serve(worker_count, pool)
+                try:
+                    _report(f"w={worker_count} pool={pool}", "127.0.0.1", port,
+                            endpoints, concurrency, seconds)
+                finally:
+                    server.terminate()
+                    server.wait(timeout=30)
+
+
+@click.command()
+@database_option
+@click.option("--workers", "-w", multiple=True, type=int, default=(1, 4), show_default=True)
+@click.option("--pool-size", "-p", multiple=True, type=int, default=(2, 5), show_default=True)
+@click.option("--concurrency", "-c", default=32, show_default=True)
+@click.option("--seconds", default=10.0, show_default=True)
+@click.option("--url", default=None,
+              help="Load an already running server (sharing --database-url) instead of starting gunicorn.")
+def main(database_url, workers, pool_size, concurrency, seconds, url):
+    """p50/p99 latency of /api/health and /api/ngo/dashboard across worker and pool sizes."""
+    with scratch_app(database_url).app_context():
+        run(workers, pool_size, concurrency, seconds, url)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,92 @@
+"""
+Storm /api/auth/login in-process and report logins/s per hashing core,
+503s, and /api/health latency meanwhile.
+"""
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import click
+import numpy as np
+from flask import current_app
+
+from benchmarks.harness import database_option, scratch_app, seeded_users
+
+
+def _percentiles(label, ms):
+    if not ms.size:
+        click.echo(f"{label:10s} no successful requests")
+        return
+    click.echo(f"{label:10s} p50 {np.percentile(ms, 50):7.1f}  p99 {np.percentile(ms, 99):7.1f}")
+
+
+def run(clients, seconds):
+    from app.models.user_model import User, UserRole
+    from app.utils import password_hasher
+
+    app = current_app._get_current_object()
+    email = f"login-bench-{int(time.time() * 1000)}@example.com"
+    password = "benchmark-password"
+
+    user = User(name="login-bench", email=email, role=UserRole.DONOR)
+    user.set_password(password)
+
+    workers = password_hasher._get_hasher().workers
+    stop = threading.Event()
+
+    def storm(deadline):
+        client = app.test_client()
+        ok = busy = 0
+        latencies = []
+        while time.perf_counter() < deadline:
+            began = time.perf_counter()
+            status = client.post("/api/auth/login", json={"email": email, "password": password}).status_code
+            if status == 200:
+                latencies.append(time.perf_counter() - began)
+                ok += 1
+            elif status == 503:
+                # Back off like a real client instead of spinning on the CPU
+                busy += 1
+                time.sleep(0.02)
+        return ok, busy, latencies
+
+    def probe():
+        client = app.test_client()
+        latencies = []
+        while not stop.is_set():
+            began = time.perf_counter()
+            client.get("/api/health")
+            latencies.append(time.perf_counter() - began)
+            stop.wait(0.05)
+        return latencies
+
+    with seeded_users(user):
+        deadline = time.perf_counter() + seconds
+        with ThreadPoolExecutor(clients + 1) as pool:
+            health = pool.submit(probe)
+            results = list(pool.map(lambda _: storm(deadline), range(clients)))
+            stop.set()
+            health_ms = np.array(health.result()) * 1000
+
+    ok = sum(r[0] for r in results)
+    busy = sum(r[1] for r in results)
+    login_ms = np.array([l for r in results for l in r[2]]) * 1000
+
+    click.echo(f"method {password_hasher.hash_method()}, {workers} hashing workers, {clients} clients, {seconds:.0f}s")
+    click.echo(f"logins     {ok / seconds:8.1f}/s  ({ok / seconds / workers:.1f}/s per core), {busy} x 503")
+    _percentiles("login  ms", login_ms)
+    _percentiles("health ms", health_ms)
+
+
+@click.command()
+@database_option
+@click.option("--clients", default=32, show_default=True, help="Concurrent login loops.")
+@click.option("--seconds", default=10.0, show_default=True)
+def main(database_url, clients, seconds):
+    """Login throughput per hashing core under a login storm, and health latency meanwhile."""
+    with scratch_app(database_url).app_context():
+        run(clients, seconds)
+
+
+if __name__ == "__main__":
+    main()
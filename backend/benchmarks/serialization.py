@@ -0,0 +1,75 @@
+"""
+Per-row cost of a dashboard-sized response: ORM instances + to_dict() +
+stdlib json against column tuples + RowSchema + the fast encoder.
+"""
+import json
+import time
+
+import click
+
+from benchmarks.harness import database_option, scratch_app, seeded_users
+
+
+def run(rows, runs):
+    from app import db
+    from app.models.donation_model import DONATION_SUMMARY, Donation
+    from app.models.user_model import User, UserRole
+    from app.utils import serialization
+
+    tag = f"serialize-bench-{int(time.time() * 1000)}"
+    donor = User(name=tag, email=f"{tag}@example.com", password_hash="x", role=UserRole.DONOR)
+
+    with seeded_users(donor):
+        donor_id = donor.id
+        db.session.bulk_insert_mappings(Donation, [
+            {"donor_id": donor_id, "food_type": "Veg Biryani", "quantity": "3 kg", "quantity_kg": 3.0,
+             "expiry_hours": 1 + i % 12, "pickup_address": "Salt Lake", "status": "PENDING"}
+            for i in range(rows)
+        ])
+        db.session.commit()
+
+        def orm_path():
+            donations = Donation.query.filter_by(donor_id=donor_id).all()
+            built = time.perf_counter()
+            payload = [{**d.to_dict(), "distanceKm": 1.5, "priorityScore": 72.5} for d in donations]
+            return built, json.dumps({"success": True, "data": payload}).encode()
+
+        def row_path():
+            found = db.session.query(*DONATION_SUMMARY.columns).filter(Donation.donor_id == donor_id).all()
+            built = time.perf_counter()
+            payload = DONATION_SUMMARY.dicts(
+                found, distanceKm=[1.5] * len(found), priorityScore=[72.5] * len(found)
+            )
+            return built, serialization.dumps({"success": True, "data": payload})
+
+        encoder = "orjson" if serialization.orjson is not None else "stdlib json"
+        click.echo(f"{rows} rows, best of {runs}; fast path encoder: {encoder}")
+        click.echo("path               query us/row  build+encode us/row  total ms  bytes")
+
+        for label, path in (("to_dict + json", orm_path), ("RowSchema + fast", row_path)):
+            best = None
+            for _ in range(runs):
+                db.session.expunge_all()
+                began = time.perf_counter()
+                built, body = path()
+                done = time.perf_counter()
+                timing = (built - began, done - built)
+                if best is None or sum(timing) < sum(best):
+                    best = timing
+            query_s, encode_s = best
+            click.echo(f"{label:18s} {query_s / rows * 1e6:12.2f}  {encode_s / rows * 1e6:19.2f}  "
+                       f"{(query_s + encode_s) * 1000:8.1f}  {len(body)}")
+
+
+@click.command()
+@database_option
+@click.option("--rows", default=10000, show_default=True)
+@click.option("--runs", default=5, show_default=True)
+def main(database_url, rows, runs):
+    """Per-row cost of the ORM path against the RowSchema + fast encoder path."""
+    with scratch_app(database_url).app_context():
+        run(rows, runs)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,35 @@
+# Production serving profile: gunicorn -c gunicorn.conf.py
+#
+# Each worker process holds its own SQLAlchemy pool, so the database sees up
+# to workers * (DB_POOL_SIZE + DB_MAX_OVERFLOW) connections; keep that below
+# PostgreSQL's max_connections. Threads per worker should not exceed
+# DB_POOL_SIZE + DB_MAX_OVERFLOW or requests will wait on the pool.
+import multiprocessing
+import os
+
+wsgi_app = "run:app"
+bind = os.getenv("BIND", "0.0.0.0:5000")
+
+workers = int(os.getenv("WEB_WORKERS", multiprocessing.cpu_count() * 2 + 1))
+# gthread holds one thread per open /api/ngo/stream connection; use
+# WEB_WORKER_CLASS=gevent when many NGOs keep the event stream open
+worker_class = os.getenv("WEB_WORKER_CLASS", "gthread")
+threads = int(os.getenv("WEB_THREADS", 4))
+
+# Load the app once in the master; create_app disposes inherited engines in
+# each child so pooled connections are never shared across processes.
+# Threads started in the master (expiry scheduler, outbox worker) stay
+# there, so their stream events reach workers through EVENT_BROKER=postgres
+preload_app = True
+
+timeout = int(os.getenv("WEB_TIMEOUT", 30))
+graceful_timeout = 30
+keepalive = 5
+
+# Recycle workers periodically to bound memory growth
+max_requests = int(os.getenv("WEB_MAX_REQUESTS", 2000))
+max_requests_jitter = 200
+
+accesslog = "-"
+errorlog = "-"
+loglevel = os.getenv("LOG_LEVEL", "info")
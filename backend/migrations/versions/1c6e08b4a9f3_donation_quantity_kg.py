@@ -0,0 +1,27 @@
+"""donation quantity_kg
+
+Revision ID: 1c6e08b4a9f3
+Revises: f08c5a7b31d2
+Create Date: 2026-10-18 19:02:11.846203
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '1c6e08b4a9f3'
+down_revision = 'f08c5a7b31d2'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # Existing rows are filled by `flask quantity-backfill`
+    with op.batch_alter_table('donations', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('quantity_kg', sa.Float(), nullable=True))
+
+
+def downgrade():
+    with op.batch_alter_table('donations', schema=None) as batch_op:
+        batch_op.drop_column('quantity_kg')
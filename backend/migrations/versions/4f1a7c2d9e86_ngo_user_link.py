@@ -0,0 +1,48 @@
+"""link ngos to their user account; requests.ngo_id references users
+
+Revision ID: 4f1a7c2d9e86
+Revises: a3c9e5f17b20
+Create Date: 2026-10-18 23:05:12.441907
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '4f1a7c2d9e86'
+down_revision = 'a3c9e5f17b20'
+branch_labels = None
+depends_on = None
+
+# Names SQLite's reflected, unnamed foreign keys get inside batch mode
+NAMING = {"fk": "fk_%(table_name)s_%(column_0_name)s_%(referred_table_name)s"}
+
+
+def _requests_fk(referred):
+    if op.get_bind().dialect.name == 'postgresql' and referred == 'ngos':
+        return 'requests_ngo_id_fkey'
+    return f'fk_requests_ngo_id_{referred}'
+
+
+def upgrade():
+    with op.batch_alter_table('ngos', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('user_id', sa.Integer(), nullable=True))
+        batch_op.create_unique_constraint('uq_ngos_user_id', ['user_id'])
+        batch_op.create_foreign_key('fk_ngos_user_id_users', 'users', ['user_id'], ['id'])
+
+    # Every claim path has always written the NGO user's id here
+    with op.batch_alter_table('requests', schema=None, naming_convention=NAMING) as batch_op:
+        batch_op.drop_constraint(_requests_fk('ngos'), type_='foreignkey')
+        batch_op.create_foreign_key(_requests_fk('users'), 'users', ['ngo_id'], ['id'])
+
+
+def downgrade():
+    with op.batch_alter_table('requests', schema=None, naming_convention=NAMING) as batch_op:
+        batch_op.drop_constraint(_requests_fk('users'), type_='foreignkey')
+        batch_op.create_foreign_key(_requests_fk('ngos'), 'ngos', ['ngo_id'], ['id'])
+
+    with op.batch_alter_table('ngos', schema=None) as batch_op:
+        batch_op.drop_constraint('fk_ngos_user_id_users', type_='foreignkey')
+        batch_op.drop_constraint('uq_ngos_user_id', type_='unique')
+        batch_op.drop_column('user_id')
@@ -0,0 +1,30 @@
+"""kpi counters
+
+Revision ID: 5d92e17ab3f0
+Revises: c41f0a8e6b27
+Create Date: 2026-10-18 14:03:52.118407
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '5d92e17ab3f0'
+down_revision = 'c41f0a8e6b27'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('kpi_counters',
+    sa.Column('name', sa.String(length=100), nullable=False),
+    sa.Column('value', sa.Float(), nullable=False),
+    sa.Column('updated_at', sa.DateTime(), nullable=True),
+    sa.PrimaryKeyConstraint('name')
+    )
+    # Populate with `flask kpi-rebuild` after upgrading
+
+
+def downgrade():
+    op.drop_table('kpi_counters')
@@ -0,0 +1,38 @@
+"""keyset pagination indexes
+
+Revision ID: 7b4d1e9a0c58
+Revises: 1c6e08b4a9f3
+Create Date: 2026-10-18 19:41:08.552730
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '7b4d1e9a0c58'
+down_revision = '1c6e08b4a9f3'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # Add id as the tie-breaker so (created_at, id) cursors are a pure index seek
+    op.drop_index('ix_donations_donor_created', table_name='donations')
+    op.create_index(
+        'ix_donations_donor_created', 'donations',
+        ['donor_id', sa.text('created_at DESC'), sa.text('id DESC')]
+    )
+    op.create_index(
+        'ix_requests_ngo_created', 'requests',
+        ['ngo_id', sa.text('created_at DESC'), sa.text('id DESC')]
+    )
+
+
+def downgrade():
+    op.drop_index('ix_requests_ngo_created', table_name='requests')
+    op.drop_index('ix_donations_donor_created', table_name='donations')
+    op.create_index(
+        'ix_donations_donor_created', 'donations',
+        ['donor_id', sa.text('created_at DESC')]
+    )
@@ -0,0 +1,46 @@
+"""impact rollups and dated predictions
+
+Revision ID: 8a6d3f5c2e19
+Revises: 5d92e17ab3f0
+Create Date: 2026-10-18 15:26:10.774301
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '8a6d3f5c2e19'
+down_revision = '5d92e17ab3f0'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('impact_rollups',
+    sa.Column('day', sa.Date(), nullable=False),
+    sa.Column('saved_kg', sa.Float(), nullable=False),
+    sa.Column('wasted_kg', sa.Float(), nullable=False),
+    sa.Column('predicted_kg', sa.Float(), nullable=False),
+    sa.Column('donations', sa.Integer(), nullable=False),
+    sa.Column('refreshed_at', sa.DateTime(), nullable=True),
+    sa.PrimaryKeyConstraint('day')
+    )
+
+    with op.batch_alter_table('predictions', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('period_start', sa.Date(), nullable=True))
+        batch_op.create_index('ix_predictions_period_start', ['period_start'])
+
+    op.create_index('ix_donations_created_at', 'donations', ['created_at'])
+    op.create_index('ix_pickups_verified_at', 'pickups', ['verified_at'])
+
+
+def downgrade():
+    op.drop_index('ix_pickups_verified_at', table_name='pickups')
+    op.drop_index('ix_donations_created_at', table_name='donations')
+
+    with op.batch_alter_table('predictions', schema=None) as batch_op:
+        batch_op.drop_index('ix_predictions_period_start')
+        batch_op.drop_column('period_start')
+
+    op.drop_table('impact_rollups')
@@ -0,0 +1,41 @@
+"""full-text search indexes
+
+Revision ID: 9c3e5b8a1f47
+Revises: 4f1a7c2d9e86
+Create Date: 2026-10-18 23:41:37.902115
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '9c3e5b8a1f47'
+down_revision = '4f1a7c2d9e86'
+branch_labels = None
+depends_on = None
+
+# Must stay identical to search_service.search_document for the planner to use them
+SEARCH_INDEXES = [
+    ('ix_donations_search', 'donations', (
+        "setweight(to_tsvector('simple'::regconfig, coalesce(food_type, '')), 'A') || "
+        "setweight(to_tsvector('simple'::regconfig, coalesce(notes, '')), 'B')"
+    )),
+    ('ix_ngos_search', 'ngos', (
+        "setweight(to_tsvector('simple'::regconfig, coalesce(name, '')), 'A') || "
+        "setweight(to_tsvector('simple'::regconfig, coalesce(area, '')), 'B')"
+    )),
+]
+
+
+def upgrade():
+    # Other databases search through the in-memory fallback
+    if op.get_bind().dialect.name == 'postgresql':
+        for name, table, document in SEARCH_INDEXES:
+            op.create_index(name, table, [sa.text(f'({document})')], postgresql_using='gin')
+
+
+def downgrade():
+    if op.get_bind().dialect.name == 'postgresql':
+        for name, table, _ in reversed(SEARCH_INDEXES):
+            op.drop_index(name, table_name=table)
@@ -0,0 +1,40 @@
+"""outbox jobs
+
+Revision ID: a3c9e5f17b20
+Revises: 7b4d1e9a0c58
+Create Date: 2026-10-18 21:12:40.318224
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'a3c9e5f17b20'
+down_revision = '7b4d1e9a0c58'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('outbox_jobs',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('topic', sa.String(length=100), nullable=False),
+    sa.Column('payload', sa.Text(), nullable=False),
+    sa.Column('idempotency_key', sa.String(length=200), nullable=False),
+    sa.Column('status', sa.String(length=20), nullable=False),
+    sa.Column('attempts', sa.Integer(), nullable=False),
+    sa.Column('available_at', sa.DateTime(), nullable=False),
+    sa.Column('claimed_by', sa.String(length=32), nullable=True),
+    sa.Column('last_error', sa.Text(), nullable=True),
+    sa.Column('created_at', sa.DateTime(), nullable=False),
+    sa.Column('processed_at', sa.DateTime(), nullable=True),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('idempotency_key')
+    )
+    op.create_index('ix_outbox_jobs_status_available', 'outbox_jobs', ['status', 'available_at'])
+
+
+def downgrade():
+    op.drop_index('ix_outbox_jobs_status_available', table_name='outbox_jobs')
+    op.drop_table('outbox_jobs')
@@ -0,0 +1,56 @@
+"""indexes for hot filter paths
+
+Revision ID: c41f0a8e6b27
+Revises: 3b7e2c91d4a5
+Create Date: 2026-10-18 11:47:05.631920
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'c41f0a8e6b27'
+down_revision = '3b7e2c91d4a5'
+branch_labels = None
+depends_on = None
+
+# (index, table, column) for the ilike('%term%') searches
+TRIGRAM_INDEXES = [
+    ('ix_donations_food_type_trgm', 'donations', 'food_type'),
+    ('ix_ngos_name_trgm', 'ngos', 'name'),
+    ('ix_ngos_area_trgm', 'ngos', 'area'),
+]
+
+
+def upgrade():
+    op.create_index('ix_donations_status', 'donations', ['status'])
+    op.create_index(
+        'ix_donations_donor_created', 'donations',
+        ['donor_id', sa.text('created_at DESC')]
+    )
+    op.create_index('ix_donations_donor_status', 'donations', ['donor_id', 'status'])
+    op.create_index('ix_requests_ngo_id', 'requests', ['ngo_id'])
+    op.create_index('ix_pickups_request_id', 'pickups', ['request_id'])
+
+    # Substring search only benefits from trigram indexes on PostgreSQL
+    if op.get_bind().dialect.name == 'postgresql':
+        op.execute('CREATE EXTENSION IF NOT EXISTS pg_trgm')
+        for name, table, column in TRIGRAM_INDEXES:
+            op.create_index(
+                name, table, [column],
+                postgresql_using='gin',
+                postgresql_ops={column: 'gin_trgm_ops'}
+            )
+
+
+def downgrade():
+    if op.get_bind().dialect.name == 'postgresql':
+        for name, table, _ in reversed(TRIGRAM_INDEXES):
+            op.drop_index(name, table_name=table)
+
+    op.drop_index('ix_pickups_request_id', table_name='pickups')
+    op.drop_index('ix_requests_ngo_id', table_name='requests')
+    op.drop_index('ix_donations_donor_status', table_name='donations')
+    op.drop_index('ix_donations_donor_created', table_name='donations')
+    op.drop_index('ix_donations_status', table_name='donations')
@@ -0,0 +1,40 @@
+"""drop trigram indexes superseded by full-text search
+
+Revision ID: d5a8f2c6b390
+Revises: 9c3e5b8a1f47
+Create Date: 2026-10-19 00:08:54.317260
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'd5a8f2c6b390'
+down_revision = '9c3e5b8a1f47'
+branch_labels = None
+depends_on = None
+
+# Nothing filters these columns with ilike any more; search uses the
+# tsvector indexes, so these only cost writes
+TRIGRAM_INDEXES = [
+    ('ix_donations_food_type_trgm', 'donations', 'food_type'),
+    ('ix_ngos_name_trgm', 'ngos', 'name'),
+    ('ix_ngos_area_trgm', 'ngos', 'area'),
+]
+
+
+def upgrade():
+    if op.get_bind().dialect.name == 'postgresql':
+        for name, table, _ in TRIGRAM_INDEXES:
+            op.drop_index(name, table_name=table)
+
+
+def downgrade():
+    if op.get_bind().dialect.name == 'postgresql':
+        for name, table, column in TRIGRAM_INDEXES:
+            op.create_index(
+                name, table, [column],
+                postgresql_using='gin',
+                postgresql_ops={column: 'gin_trgm_ops'}
+            )
@@ -0,0 +1,40 @@
+"""forecast models and per-area predictions
+
+Revision ID: e27b94c0d6a1
+Revises: 8a6d3f5c2e19
+Create Date: 2026-10-18 16:40:33.902516
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'e27b94c0d6a1'
+down_revision = '8a6d3f5c2e19'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('forecast_models',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('area', sa.String(length=100), nullable=False),
+    sa.Column('kind', sa.String(length=20), nullable=False),
+    sa.Column('coefficients', sa.Text(), nullable=False),
+    sa.Column('last_values', sa.Text(), nullable=False),
+    sa.Column('trained_through', sa.Date(), nullable=False),
+    sa.Column('fitted_at', sa.DateTime(), nullable=True),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('area', 'kind', name='uq_forecast_models_area_kind')
+    )
+
+    with op.batch_alter_table('predictions', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('area', sa.String(length=100), nullable=True))
+
+
+def downgrade():
+    with op.batch_alter_table('predictions', schema=None) as batch_op:
+        batch_op.drop_column('area')
+
+    op.drop_table('forecast_models')
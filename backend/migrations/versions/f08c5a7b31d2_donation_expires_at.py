@@ -0,0 +1,41 @@
+"""donation expires_at
+
+Revision ID: f08c5a7b31d2
+Revises: e27b94c0d6a1
+Create Date: 2026-10-18 18:05:47.310552
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'f08c5a7b31d2'
+down_revision = 'e27b94c0d6a1'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('donations', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('expires_at', sa.DateTime(), nullable=True))
+
+    if op.get_bind().dialect.name == 'postgresql':
+        op.execute(
+            "UPDATE donations SET expires_at = created_at + expiry_hours * INTERVAL '1 hour' "
+            "WHERE created_at IS NOT NULL"
+        )
+    else:
+        op.execute(
+            "UPDATE donations SET expires_at = datetime(created_at, '+' || expiry_hours || ' hours') "
+            "WHERE created_at IS NOT NULL"
+        )
+
+    op.create_index('ix_donations_status_expires', 'donations', ['status', 'expires_at'])
+
+
+def downgrade():
+    op.drop_index('ix_donations_status_expires', table_name='donations')
+
+    with op.batch_alter_table('donations', schema=None) as batch_op:
+        batch_op.drop_column('expires_at')
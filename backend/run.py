@@ -2,5 +2,6 @@ from app import create_app
 
 app = create_app()
 
+# Production: gunicorn -c gunicorn.conf.py (see gunicorn.conf.py)
 if __name__ == "__main__":
-    app.run(debug=True, use_reloader=False)  # 👈 important
+    app.run(debug=app.config["DEBUG"], use_reloader=False)  # 👈 important
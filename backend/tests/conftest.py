@@ -0,0 +1,123 @@
+import itertools
+import os
+import tempfile
+
+# Config is read at import time: point it at a throwaway database first.
+# TEST_DATABASE_URL=postgresql://... runs the suite against PostgreSQL.
+_db_dir = tempfile.mkdtemp(prefix="wastefoodlink-tests-")
+os.environ["DATABASE_URL"] = os.getenv(
+    "TEST_DATABASE_URL", f"sqlite:///{os.path.join(_db_dir, 'test.db')}"
+)
+os.environ.setdefault("JWT_SECRET_KEY", "test-jwt-secret-key-of-32-bytes!!")
+os.environ["HTTP_CACHE_ENABLED"] = "false"
+os.environ["EVENT_BROKER"] = "memory"
+os.environ.setdefault("PASSWORD_HASH_METHOD", "pbkdf2:sha256:1000")
+
+import pytest
+from sqlalchemy import event
+
+from app import create_app, db
+from app.models.donation_model import Donation
+from app.models.user_model import User, UserRole
+from app.utils.jwt_utils import issue_access_token
+
+_ids = itertools.count(1)
+
+
+@pytest.fixture(scope="session")
+def app():
+    app = create_app()
+    app.config["TESTING"] = True
+
+    with app.app_context():
+        db.drop_all()
+        db.create_all()
+
+    yield app
+
+    with app.app_context():
+        db.session.remove()
+        db.drop_all()
+
+
+@pytest.fixture
+def ctx(app):
+    with app.app_context():
+        yield
+        db.session.remove()
+
+
+@pytest.fixture
+def client(app):
+    return app.test_client()
+
+
+# =====================
+# Data helpers
+# =====================
+# Tests share one database, so every helper makes fresh rows and tests only
+# assert on what they created.
+@pytest.fixture
+def make_user(ctx):
+    def make(role="DONOR", **fields):
+        n = next(_ids)
+        fields.setdefault("latitude", 22.58)
+        fields.setdefault("longitude", 88.41)
+        user = User(
+            name=f"{role.lower()}-{n}",
+            email=f"{role.lower()}-{n}-{os.getpid()}@example.com",
+            password_hash="x",
+            role=UserRole(role),
+            **fields
+        )
+        db.session.add(user)
+        db.session.commit()
+        return user
+    return make
+
+
+@pytest.fixture
+def auth():
+    def headers(user):
+        return {"Authorization": f"Bearer {issue_access_token(user)}"}
+    return headers
+
+
+@pytest.fixture
+def make_donations(ctx):
+    def make(donor, count, status="PENDING", **fields):
+        donations = []
+        for i in range(count):
+            donation = Donation(
+                donor_id=donor.id,
+                food_type=fields.get("food_type", "Veg Biryani"),
+                quantity=fields.get("quantity", "3 kg"),
+                expiry_hours=fields.get("expiry_hours", 1 + i % 6),
+                pickup_address="Salt Lake",
+                latitude=22.58 + (i % 10) * 0.001,
+                longitude=88.41,
+                status=status
+            )
+            donation.set_expiry()
+            donation.set_quantity_kg()
+            donations.append(donation)
+        db.session.add_all(donations)
+        db.session.commit()
+        return donations
+    return make
+
+
+# =====================
+# SQL capture
+# =====================
+@pytest.fixture
+def statements(ctx):
+    """Every SQL statement the engine runs while the test body is active."""
+    captured = []
+
+    def record(conn, cursor, statement, parameters, context, executemany):
+        captured.append((statement, parameters))
+
+    event.listen(db.engine, "before_cursor_execute", record)
+    yield captured
+    event.remove(db.engine, "before_cursor_execute", record)
@@ -0,0 +1,22 @@
+"""Batch allocation claims under the NGO user's id, like a claim from the route."""
+from app import db
+from app.models.ngo_model import NGO
+from app.services.batch_allocation_service import BatchAllocator
+
+
+def test_batch_claims_reach_the_ngo_user(client, auth, make_user, make_donations):
+    ngo_user = make_user("NGO", performance_score=60)
+    db.session.add(NGO(name="Batch NGO", area="22.58,88.41", capacity=100000, is_verified=True, user=ngo_user))
+    db.session.commit()
+    donation = make_donations(make_user("DONOR"), 1)[0]
+
+    allocator = BatchAllocator()
+    assert (donation.id, ngo_user.id) in {(d, n) for d, n, _ in allocator.solve()}
+    allocator.commit()
+
+    response = client.get("/api/ngo/requests", headers=auth(ngo_user))
+    assert response.status_code == 200
+    assert donation.id in [row["id"] for row in response.get_json()["data"]]
+
+    # Claimed kg now counts against the same NGO's capacity
+    assert BatchAllocator()._load_ngos()[ngo_user.id] == 100000 - donation.quantity_kg
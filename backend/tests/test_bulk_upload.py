@@ -0,0 +1,20 @@
+"""The streamed bulk upload response is one well-formed JSON envelope."""
+import json
+
+
+def test_bulk_upload_reports_every_row(client, auth, make_user):
+    donor = make_user("DONOR")
+    rows = [
+        '{"foodType": "Rice", "quantity": "2 kg", "expiryHours": 4, "pickupAddress": "Salt Lake"}',
+        '{"foodType": "Dal", "quantity": "1 kg", "expiryHours": 0, "pickupAddress": "Salt Lake"}',
+        '{"foodType": "Roti", "quantity": "30 pcs", "expiryHours": 2, "pickupAddress": "Salt Lake"}',
+    ]
+
+    response = client.post("/api/donor/donations/bulk", data="\n".join(rows),
+                           content_type="application/x-ndjson", headers=auth(donor))
+
+    body = json.loads(response.get_data())
+    assert body["success"] is True
+    assert body["data"]["created"] == 2 and body["data"]["failed"] == 1
+    assert [r["row"] for r in body["data"]["results"]] == [1, 2, 3]
+    assert "error" in body["data"]["results"][1]
@@ -0,0 +1,22 @@
+"""Concurrent claims: however many NGOs race, each donation has one winner."""
+from app.models.user_model import User
+from benchmarks import claims
+
+
+def test_racing_claims_have_one_winner(ctx, capsys):
+    claims.run(threads=8, donations=40)
+
+    assert "exactly one winner per donation" in capsys.readouterr().out
+    # The benchmark removes the users and donations it seeded
+    assert User.query.filter(User.email.like("claim-bench-%")).count() == 0
+
+
+def test_claim_route_rejects_second_claim(client, auth, make_user, make_donations):
+    donation = make_donations(make_user("DONOR"), 1)[0]
+    first, second = make_user("NGO"), make_user("NGO")
+
+    assert client.post(f"/api/ngo/claim/{donation.id}", headers=auth(first)).status_code == 200
+
+    response = client.post(f"/api/ngo/claim/{donation.id}", headers=auth(second))
+    assert response.status_code == 400
+    assert response.get_json()["message"] == "Donation already claimed"
@@ -0,0 +1,13 @@
+"""Integer settings keep an explicit 0 and default only when unset."""
+from app.config import _env_int
+
+
+def test_env_int(monkeypatch):
+    monkeypatch.delenv("WFL_TEST_INT", raising=False)
+    assert _env_int("WFL_TEST_INT") is None
+
+    monkeypatch.setenv("WFL_TEST_INT", "")
+    assert _env_int("WFL_TEST_INT", 7) == 7
+
+    monkeypatch.setenv("WFL_TEST_INT", "0")
+    assert _env_int("WFL_TEST_INT", 7) == 0
@@ -0,0 +1,52 @@
+"""Events from one commit reach the broker together, not one message per row."""
+import io
+
+import pytest
+
+from app.services import event_bus, ingest_service
+from app.services.event_bus import InProcessBroker, PostgresBroker
+
+
+class RecordingBroker(InProcessBroker):
+    def __init__(self):
+        super().__init__()
+        self.batches = []
+
+    def publish_many(self, channel, events):
+        self.batches.append(list(events))
+        super().publish_many(channel, events)
+
+
+@pytest.fixture
+def broker():
+    previous = event_bus.get_broker()
+    recording = RecordingBroker()
+    event_bus.set_broker(recording)
+    yield recording
+    event_bus.set_broker(previous)
+
+
+def test_ingest_publishes_once_per_chunk(broker, make_user):
+    donor = make_user("DONOR")
+    upload = b"".join(
+        b'{"foodType": "Rice", "quantity": "2 kg", "expiryHours": 4, "pickupAddress": "Salt Lake"}\n'
+        for _ in range(5)
+    )
+
+    results = list(ingest_service.ingest(donor.id, io.BytesIO(upload), ingest_service.NDJSON, chunk_size=2))
+
+    assert all("id" in result for result in results)
+    assert [len(batch) for batch in broker.batches] == [2, 2, 1]
+    assert [e["data"]["id"] for batch in broker.batches for e in batch] == [r["id"] for r in results]
+
+
+def test_postgres_batches_fit_the_notify_cap():
+    events = [{"type": event_bus.DONATION_CLAIMED, "data": {"id": i, "pad": "x" * 500}} for i in range(40)]
+
+    batches = list(PostgresBroker(engine=None)._batches(events))
+
+    assert 1 < len(batches) < len(events)
+    assert [e for batch in batches for e in batch] == events
+    for batch in batches:
+        payload = event_bus.dumps({"channel": event_bus.MARKETPLACE, "events": batch})
+        assert len(payload) < 8000
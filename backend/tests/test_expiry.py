@@ -0,0 +1,17 @@
+"""Expiry scheduling must not depend on donations committing in id order."""
+from app.services.expiry_service import ExpiryScheduler
+
+
+def test_rescan_schedules_rows_behind_the_watermark(make_user, make_donations):
+    earlier, later = make_donations(make_user("DONOR"), 2)
+    scheduler = ExpiryScheduler(rescan_seconds=3600)
+
+    # The later id was seen first, as if the earlier one committed after it
+    scheduler.schedule(later.id, later.expires_at)
+    scheduler._scanned_at = float("inf")
+    scheduler.sync()
+    assert earlier.id not in scheduler._scheduled
+
+    scheduler._scanned_at = 0.0
+    scheduler.sync()
+    assert earlier.id in scheduler._scheduled
@@ -0,0 +1,35 @@
+"""Forecasts report which period their model was fitted through."""
+import json
+from datetime import timedelta
+
+from app import db
+from app.models.forecast_model import ForecastModel
+from app.services import ml_service
+
+
+def _model(area, trained_through):
+    db.session.add(ForecastModel(
+        area=area, kind="waste", trained_through=trained_through,
+        coefficients=json.dumps([1.0, 0.5]), last_values=json.dumps([4.0])
+    ))
+
+
+def test_forecast_carries_fit_period(ctx):
+    last_closed = ml_service.current_period() - timedelta(weeks=1)
+    _model("forecast-fresh", last_closed)
+    _model("forecast-old", last_closed - timedelta(weeks=3))
+    db.session.commit()
+    ml_service.invalidate()
+
+    kg, trained_through = ml_service.forecast("waste", "forecast-fresh")
+    assert kg == 3.0 and not ml_service.is_stale(trained_through)
+
+    _, trained_through = ml_service.forecast("waste", "forecast-old")
+    assert ml_service.is_stale(trained_through)
+
+    # Across areas the oldest model decides
+    forecasts, trained_through = ml_service.forecast("waste")
+    assert forecasts["forecast-fresh"] == 3.0
+    assert ml_service.is_stale(trained_through)
+
+    assert ml_service.forecast("waste", "nowhere") == (0.0, None)
@@ -0,0 +1,52 @@
+"""Cache invalidations must reach every process sharing the event broker."""
+import time
+from datetime import datetime, timedelta
+
+import pytest
+
+from app.services.event_bus import InProcessBroker
+from app.services.expiry_service import ExpiryScheduler
+from app.utils import http_cache
+
+
+def _wait_for(predicate, timeout=2.0):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if predicate():
+            return True
+        time.sleep(0.01)
+    return predicate()
+
+
+@pytest.fixture
+def backends():
+    """Two workers' backends on one broker; the first serves this process."""
+    broker = InProcessBroker()
+    local, remote = http_cache.BrokerBackend(broker), http_cache.BrokerBackend(broker)
+    remote.versions(["donations"])  # starts its listener
+
+    previous = http_cache.get_backend()
+    http_cache.set_backend(local)
+    yield local, remote
+    http_cache.set_backend(previous)
+
+
+def test_bump_reaches_other_backends(backends):
+    local, remote = backends
+    before = remote.versions(["donations"])
+
+    local.bump({"donations"})
+
+    assert _wait_for(lambda: remote.versions(["donations"]) != before)
+
+
+def test_expiry_tick_invalidates_other_workers(backends, make_user, make_donations):
+    _, remote = backends
+    donation, = make_donations(make_user("DONOR"), 1)
+    before = remote.versions(["donations"])
+
+    scheduler = ExpiryScheduler()
+    scheduler.schedule(donation.id, datetime.utcnow() - timedelta(minutes=1))
+    assert scheduler.tick() == 1
+
+    assert _wait_for(lambda: remote.versions(["donations"]) != before)
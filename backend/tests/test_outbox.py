@@ -0,0 +1,19 @@
+"""OUTBOX_DISPATCH and OUTBOX_WORKER must not leave jobs unwritten or undrained."""
+import pytest
+
+from app.services.outbox_service import check_config
+
+
+@pytest.mark.parametrize("dispatch, worker", [
+    ("inline", "none"), ("queue", "process"), ("queue", "thread")
+])
+def test_consistent_settings_pass(dispatch, worker):
+    check_config({"OUTBOX_DISPATCH": dispatch, "OUTBOX_WORKER": worker})
+
+
+@pytest.mark.parametrize("dispatch, worker", [
+    ("queue", "none"), ("inline", "process"), ("inline", "thread"), ("later", "none")
+])
+def test_inconsistent_settings_fail(dispatch, worker):
+    with pytest.raises(RuntimeError):
+        check_config({"OUTBOX_DISPATCH": dispatch, "OUTBOX_WORKER": worker})
@@ -0,0 +1,76 @@
+"""
+Each hot route's queries must reach donations, requests and pickups through
+an index. SQLite is checked with EXPLAIN QUERY PLAN; on PostgreSQL
+(TEST_DATABASE_URL) sequential scans are disabled for the EXPLAIN so the
+planner has to show an index path if one exists, whatever the table size.
+"""
+import re
+
+import pytest
+
+from app import db
+from app.services.allocation_service import try_claim
+
+HOT_TABLES = ("donations", "requests", "pickups")
+
+ROUTES = [
+    ("DONOR", "/api/donor/donations"),
+    ("DONOR", "/api/donor/donations?status=PENDING"),
+    ("DONOR", "/api/donor/dashboard"),
+    ("DONOR", "/api/donor/overview"),
+    ("NGO", "/api/ngo/dashboard"),
+    ("NGO", "/api/ngo/overview"),
+    ("NGO", "/api/ngo/browse"),
+    ("NGO", "/api/ngo/requests"),
+]
+
+_SQLITE_FULL_SCAN = re.compile(rf"^SCAN ({'|'.join(HOT_TABLES)})\b")
+_PG_FULL_SCAN = re.compile(rf"Seq Scan on ({'|'.join(HOT_TABLES)})\b")
+
+
+def _full_scans(statement, parameters):
+    driver = db.session.connection().connection.driver_connection
+
+    if db.engine.dialect.name == "postgresql":
+        with driver.cursor() as cursor:
+            cursor.execute("SET LOCAL enable_seqscan = off")
+            cursor.execute("EXPLAIN " + statement, parameters)
+            plan = [row[0] for row in cursor.fetchall()]
+        return [line.strip() for line in plan if _PG_FULL_SCAN.search(line)]
+
+    plan = driver.execute("EXPLAIN QUERY PLAN " + statement, parameters).fetchall()
+    return [row[3] for row in plan if _SQLITE_FULL_SCAN.match(row[3])]
+
+
+@pytest.fixture
+def seeded(make_user, make_donations):
+    donor = make_user("DONOR")
+    ngo = make_user("NGO", performance_score=60)
+
+    make_donations(donor, 150)
+    make_donations(donor, 50, status="EXPIRED")
+    make_donations(make_user("DONOR"), 100)
+
+    claimed = make_donations(donor, 20)
+    for donation in claimed:
+        try_claim(donation.id, ngo.id)
+    db.session.commit()
+
+    return {"DONOR": donor, "NGO": ngo}
+
+
+@pytest.mark.parametrize("role, url", ROUTES)
+def test_route_queries_use_indexes(client, auth, seeded, statements, role, url):
+    response = client.get(url, headers=auth(seeded[role]))
+    assert response.status_code == 200, response.get_json()
+
+    hot = [
+        (statement, parameters) for statement, parameters in statements
+        if statement.lstrip().upper().startswith(("SELECT", "WITH"))
+        and any(table in statement for table in HOT_TABLES)
+    ]
+    assert hot, f"{url} ran no queries against {HOT_TABLES}"
+
+    scans = {statement: _full_scans(statement, parameters) for statement, parameters in hot}
+    offenders = {statement[:120]: plan for statement, plan in scans.items() if plan}
+    assert not offenders, f"{url} scans whole tables: {offenders}"
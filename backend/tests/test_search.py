@@ -0,0 +1,31 @@
+"""Search hits are narrowed in SQL to what the caller may see."""
+
+
+def _ids(response):
+    assert response.status_code == 200, response.get_json()
+    data = response.get_json()["data"]
+    rows = data["items"] if isinstance(data, dict) else data
+    return {row["id"] for row in rows}
+
+
+def test_donor_search_sees_only_own_donations(client, auth, make_user, make_donations):
+    mine, theirs = make_user("DONOR"), make_user("DONOR")
+    own = make_donations(mine, 2, food_type="Paneer Tikka")
+    other = make_donations(theirs, 2, food_type="Paneer Tikka")
+
+    found = _ids(client.get("/api/donor/donations?search=paneer", headers=auth(mine)))
+
+    assert {d.id for d in own} <= found
+    assert not found & {d.id for d in other}
+
+
+def test_browse_search_sees_only_pending(client, auth, make_user, make_donations):
+    donor = make_user("DONOR")
+    pending = make_donations(donor, 2, food_type="Masala Dosa")
+    expired = make_donations(donor, 2, status="EXPIRED", food_type="Masala Dosa")
+
+    ngo = make_user("NGO", performance_score=60)
+    found = _ids(client.get("/api/ngo/browse?search=dosa", headers=auth(ngo)))
+
+    assert {d.id for d in pending} <= found
+    assert not found & {d.id for d in expired}
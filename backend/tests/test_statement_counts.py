@@ -0,0 +1,56 @@
+"""
+Guards against N+1 queries: each endpoint is called for a small and a large
+result, and must run the same number of SQL statements for both. Every
+call is a different user's first, so per-user caches cannot hide a query.
+"""
+import pytest
+
+from app import db
+from app.services.allocation_service import try_claim
+
+SMALL, LARGE = 2, 25
+
+
+def _count(client, statements, url, headers):
+    statements.clear()
+    response = client.get(url, headers=headers)
+    assert response.status_code == 200, response.get_json()
+    return len(statements)
+
+
+def _claimed_ngo(make_user, make_donations, count):
+    donor = make_user("DONOR")
+    ngo = make_user("NGO", performance_score=60)
+    for donation in make_donations(donor, count):
+        try_claim(donation.id, ngo.id)
+    db.session.commit()
+    return donor, ngo
+
+
+@pytest.mark.parametrize("url, role", [
+    ("/api/ngo/requests", "NGO"),
+    ("/api/ngo/route", "NGO"),
+    ("/api/donor/donations", "DONOR"),
+    ("/api/donor/dashboard", "DONOR"),
+    ("/api/donor/overview", "DONOR"),
+])
+def test_per_user_lists_do_not_grow(client, auth, statements, make_user, make_donations, url, role):
+    counts = []
+    for size in (SMALL, LARGE):
+        donor, ngo = _claimed_ngo(make_user, make_donations, size)
+        user = ngo if role == "NGO" else donor
+        counts.append(_count(client, statements, url, auth(user)))
+
+    assert counts[0] == counts[1], f"{url}: {counts[0]} statements for {SMALL} rows, {counts[1]} for {LARGE}"
+
+
+@pytest.mark.parametrize("url", ["/api/ngo/dashboard", "/api/ngo/overview", "/api/ngo/browse"])
+def test_marketplace_does_not_grow(client, auth, statements, make_user, make_donations, url):
+    donor = make_user("DONOR")
+    make_donations(donor, SMALL)
+    small = _count(client, statements, url, auth(make_user("NGO", performance_score=60)))
+
+    make_donations(donor, LARGE)
+    large = _count(client, statements, url, auth(make_user("NGO", performance_score=60)))
+
+    assert small == large, f"{url}: {small} statements, then {large} with {LARGE} more donations"
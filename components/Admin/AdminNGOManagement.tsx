@@ -1,6 +1,6 @@
 import React, { useEffect, useState } from "react";
 import { Button, Card, Input } from "../UI";
-import api from "../../api/client";
+import api, { getPage } from "../../api/client";
 
 interface NGO {
   id: number;
@@ -15,6 +15,8 @@ interface NGO {
 const AdminNGOManagement: React.FC = () => {
   const [selectedNGO, setSelectedNGO] = useState<NGO | null>(null);
   const [ngos, setNgos] = useState<NGO[]>([]);
+  const [nextCursor, setNextCursor] = useState<string | null>(null);
+  const [loadingMore, setLoadingMore] = useState(false);
   const [search, setSearch] = useState("");
   const [status, setStatus] = useState<string>("");
   const [loading, setLoading] = useState(true);
@@ -25,24 +27,44 @@ const AdminNGOManagement: React.FC = () => {
       setLoading(true);
       setError(null);
 
-      const res = await api.get("/api/admin/ngos", {
-        params: {
-          search,
-          status: status || undefined,
-        },
+      const page = await getPage<NGO>("/api/admin/ngos", {
+        search,
+        status: status || undefined,
       });
 
-      const list = res.data?.data;
-      setNgos(Array.isArray(list) ? list : []);
+      setNgos(page.items);
+      setNextCursor(page.nextCursor);
     } catch (err) {
       console.error("Failed to load NGOs", err);
       setError("Failed to load NGOs");
       setNgos([]);
+      setNextCursor(null);
     } finally {
       setLoading(false);
     }
   };
 
+  const loadMore = async () => {
+    if (!nextCursor) return;
+    try {
+      setLoadingMore(true);
+
+      const page = await getPage<NGO>(
+        "/api/admin/ngos",
+        { search, status: status || undefined },
+        nextCursor
+      );
+
+      setNgos((prev) => [...prev, ...page.items]);
+      setNextCursor(page.nextCursor);
+    } catch (err) {
+      console.error("Failed to load more NGOs", err);
+      alert("Failed to load more NGOs");
+    } finally {
+      setLoadingMore(false);
+    }
+  };
+
   useEffect(() => {
     fetchNGOs();
     // eslint-disable-next-line react-hooks/exhaustive-deps
@@ -175,6 +197,14 @@ const AdminNGOManagement: React.FC = () => {
               </tbody>
             </table>
           </div>
+
+          {!loading && nextCursor && (
+            <div className="p-4 border-t border-slate-100 text-center">
+              <Button variant="outline" size="sm" onClick={loadMore} disabled={loadingMore}>
+                {loadingMore ? "Loading..." : "Load more"}
+              </Button>
+            </div>
+          )}
         </Card>
 
         {/* Details Panel */}
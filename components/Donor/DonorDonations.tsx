@@ -13,6 +13,13 @@ interface Donation {
   createdAt: string;
 }
 
+interface PickupQR {
+  donationId: number;
+  foodType: string;
+  token: string;
+  expiresAt: string;
+}
+
 interface DonorDonationsProps {
   onAddClick: () => void;
 }
@@ -25,6 +32,8 @@ const DonorDonations: React.FC<DonorDonationsProps> = ({ onAddClick }) => {
   const [items, setItems] = useState<Donation[]>([]);
   const [total, setTotal] = useState(0);
   const [loading, setLoading] = useState(true);
+  const [qr, setQr] = useState<PickupQR | null>(null);
+  const [copied, setCopied] = useState(false);
 
   const perPage = 10;
 
@@ -53,6 +62,28 @@ const DonorDonations: React.FC<DonorDonationsProps> = ({ onAddClick }) => {
     // eslint-disable-next-line react-hooks/exhaustive-deps
   }, [search, filter, page]);
 
+  const handleViewQr = async (donation: Donation) => {
+    try {
+      const res = await api.get(`/api/donor/donations/${donation.id}/qr`);
+      const { token, expiresAt } = res.data.data;
+      setCopied(false);
+      setQr({ donationId: donation.id, foodType: donation.foodType, token, expiresAt });
+    } catch (err: any) {
+      console.error("Failed to load pickup QR", err);
+      alert(err.response?.data?.message || "Failed to load pickup QR");
+    }
+  };
+
+  const handleCopy = async () => {
+    if (!qr) return;
+    try {
+      await navigator.clipboard.writeText(qr.token);
+      setCopied(true);
+    } catch (err) {
+      console.error("Copy failed", err);
+    }
+  };
+
   const totalPages = Math.ceil(total / perPage);
 
   return (
@@ -100,6 +131,35 @@ const DonorDonations: React.FC<DonorDonationsProps> = ({ onAddClick }) => {
         </div>
       </Card>
 
+      {/* Pickup QR */}
+      {qr && (
+        <Card className="p-4 space-y-3 border-emerald-200 bg-emerald-50/50">
+          <div className="flex justify-between items-start gap-4">
+            <div>
+              <h3 className="font-bold text-slate-900">Pickup code: {qr.foodType}</h3>
+              <p className="text-xs text-slate-500">
+                Show or send this code to the NGO at pickup. Valid until{" "}
+                {new Date(qr.expiresAt + "Z").toLocaleString()}.
+              </p>
+            </div>
+            <Button variant="outline" size="sm" className="h-8" onClick={() => setQr(null)}>
+              Close
+            </Button>
+          </div>
+          <div className="flex gap-2">
+            <Input
+              readOnly
+              value={qr.token}
+              onFocus={(e: any) => e.target.select()}
+              className="bg-white font-mono text-xs"
+            />
+            <Button size="sm" className="h-10" onClick={handleCopy}>
+              {copied ? "Copied" : "Copy"}
+            </Button>
+          </div>
+        </Card>
+      )}
+
       {/* Full Table */}
       <Card className="overflow-hidden border-slate-200">
         <div className="overflow-x-auto">
@@ -149,11 +209,12 @@ const DonorDonations: React.FC<DonorDonationsProps> = ({ onAddClick }) => {
                         <Button variant="outline" size="sm" className="h-8">
                           Details
                         </Button>
-                        {d.status !== DonationStatus.PICKED_UP && (
+                        {d.status === DonationStatus.ALLOCATED && (
                           <Button
                             variant="outline"
                             size="sm"
                             className="h-8 border-emerald-200 text-emerald-600"
+                            onClick={() => handleViewQr(d)}
                           >
                             View QR
                           </Button>
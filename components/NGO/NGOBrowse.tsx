@@ -1,7 +1,7 @@
 import React, { useState, useEffect, useMemo } from "react";
 import { User, DonationStatus } from "../../types";
 import { Button, Card, Input } from "../../components/UI";
-import api from "../../api/client";
+import api, { getPage } from "../../api/client";
 
 interface Donation {
   id: number;
@@ -24,17 +24,18 @@ const NGOBrowse: React.FC<NGOBrowseProps> = ({ user }) => {
   const [search, setSearch] = useState("");
   const [sort, setSort] = useState<"RANK" | "DISTANCE" | "EXPIRY">("RANK");
   const [items, setItems] = useState<Donation[]>([]);
+  const [nextCursor, setNextCursor] = useState<string | null>(null);
   const [loading, setLoading] = useState(true);
+  const [loadingMore, setLoadingMore] = useState(false);
   const [error, setError] = useState<string | null>(null);
 
   const fetchDonations = async () => {
     setLoading(true);
     setError(null);
     try {
-      const res = await api.get("/api/ngo/browse", {
-        params: { search },
-      });
-      setItems(res.data.data || []);
+      const page = await getPage<Donation>("/api/ngo/browse", { search });
+      setItems(page.items);
+      setNextCursor(page.nextCursor);
     } catch (err: any) {
       console.error("Failed to load marketplace", err);
       setError("Failed to load marketplace");
@@ -43,6 +44,21 @@ const NGOBrowse: React.FC<NGOBrowseProps> = ({ user }) => {
     }
   };
 
+  const loadMore = async () => {
+    if (!nextCursor) return;
+    setLoadingMore(true);
+    try {
+      const page = await getPage<Donation>("/api/ngo/browse", { search }, nextCursor);
+      setItems((prev) => [...prev, ...page.items]);
+      setNextCursor(page.nextCursor);
+    } catch (err: any) {
+      console.error("Failed to load more donations", err);
+      alert("Failed to load more donations");
+    } finally {
+      setLoadingMore(false);
+    }
+  };
+
   useEffect(() => {
     fetchDonations();
     // eslint-disable-next-line react-hooks/exhaustive-deps
@@ -200,6 +216,14 @@ const NGOBrowse: React.FC<NGOBrowseProps> = ({ user }) => {
           ))}
         </div>
       )}
+
+      {!loading && !error && nextCursor && (
+        <div className="text-center">
+          <Button variant="outline" onClick={loadMore} disabled={loadingMore}>
+            {loadingMore ? "Loading..." : "Load more"}
+          </Button>
+        </div>
+      )}
     </div>
   );
 };
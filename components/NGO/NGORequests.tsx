@@ -1,7 +1,7 @@
 import React, { useEffect, useState } from "react";
 import { DonationStatus } from "../../types";
 import { Button, Card, StatusBadge } from "../../components/UI";
-import api from "../../api/client";
+import api, { getPage } from "../../api/client";
 
 interface NGORequestItem {
   requestId: number;
@@ -20,15 +20,18 @@ interface NGORequestsProps {
 
 const NGORequests: React.FC<NGORequestsProps> = ({ onScan }) => {
   const [items, setItems] = useState<NGORequestItem[]>([]);
+  const [nextCursor, setNextCursor] = useState<string | null>(null);
   const [loading, setLoading] = useState(true);
+  const [loadingMore, setLoadingMore] = useState(false);
   const [error, setError] = useState<string | null>(null);
 
   const fetchRequests = async () => {
     setLoading(true);
     setError(null);
     try {
-      const res = await api.get("/api/ngo/requests");
-      setItems(res.data.data || []);
+      const page = await getPage<NGORequestItem>("/api/ngo/requests");
+      setItems(page.items);
+      setNextCursor(page.nextCursor);
     } catch (err: any) {
       console.error("Failed to load requests", err);
       setError("Failed to load active requests");
@@ -37,13 +40,31 @@ const NGORequests: React.FC<NGORequestsProps> = ({ onScan }) => {
     }
   };
 
+  const loadMore = async () => {
+    if (!nextCursor) return;
+    setLoadingMore(true);
+    try {
+      const page = await getPage<NGORequestItem>("/api/ngo/requests", {}, nextCursor);
+      setItems((prev) => [...prev, ...page.items]);
+      setNextCursor(page.nextCursor);
+    } catch (err: any) {
+      console.error("Failed to load more requests", err);
+      alert("Failed to load more requests");
+    } finally {
+      setLoadingMore(false);
+    }
+  };
+
   useEffect(() => {
     fetchRequests();
   }, []);
 
   const handleVerify = async (requestId: number) => {
+    const token = window.prompt("Scan or paste the donor's pickup QR code");
+    if (!token) return;
+
     try {
-      await api.post(`/api/ngo/verify/${requestId}`);
+      await api.post(`/api/ngo/verify/${requestId}`, { token: token.trim() });
       alert("Pickup verified successfully!");
       fetchRequests(); // refresh list
     } catch (err: any) {
@@ -169,6 +190,14 @@ const NGORequests: React.FC<NGORequestsProps> = ({ onScan }) => {
             </Card>
           ))}
 
+          {nextCursor && (
+            <div className="text-center">
+              <Button variant="outline" onClick={loadMore} disabled={loadingMore}>
+                {loadingMore ? "Loading..." : "Load more"}
+              </Button>
+            </div>
+          )}
+
           {items.length === 0 && (
             <div className="py-20 text-center space-y-4">
               <div className="w-16 h-16 bg-slate-100 rounded-full mx-auto flex items-center justify-center text-slate-300">
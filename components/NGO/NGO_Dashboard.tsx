@@ -1,6 +1,6 @@
 import React, { useEffect, useState } from "react";
 import { Button, Card } from "../../components/UI";
-import api from "../../api/client";
+import { getPage } from "../../api/client";
 
 interface DonationItem {
   id: number;
@@ -19,15 +19,18 @@ interface NGODashboardProps {
 
 const NGODashboard: React.FC<NGODashboardProps> = ({ onScanClick }) => {
   const [items, setItems] = useState<DonationItem[]>([]);
+  const [nextCursor, setNextCursor] = useState<string | null>(null);
   const [loading, setLoading] = useState(true);
+  const [loadingMore, setLoadingMore] = useState(false);
   const [error, setError] = useState<string | null>(null);
 
   const fetchDashboard = async () => {
     setLoading(true);
     setError(null);
     try {
-      const res = await api.get("/api/ngo/dashboard");
-      setItems(res.data.data || []);
+      const page = await getPage<DonationItem>("/api/ngo/dashboard");
+      setItems(page.items);
+      setNextCursor(page.nextCursor);
     } catch (err: any) {
       console.error("Failed to load NGO dashboard", err);
       setError("Failed to load dashboard data");
@@ -36,6 +39,21 @@ const NGODashboard: React.FC<NGODashboardProps> = ({ onScanClick }) => {
     }
   };
 
+  const loadMore = async () => {
+    if (!nextCursor) return;
+    setLoadingMore(true);
+    try {
+      const page = await getPage<DonationItem>("/api/ngo/dashboard", {}, nextCursor);
+      setItems((prev) => [...prev, ...page.items]);
+      setNextCursor(page.nextCursor);
+    } catch (err: any) {
+      console.error("Failed to load more donations", err);
+      alert("Failed to load more donations");
+    } finally {
+      setLoadingMore(false);
+    }
+  };
+
   useEffect(() => {
     fetchDashboard();
   }, []);
@@ -115,6 +133,14 @@ const NGODashboard: React.FC<NGODashboardProps> = ({ onScanClick }) => {
           )}
         </div>
       )}
+
+      {!loading && !error && nextCursor && (
+        <div className="text-center">
+          <Button variant="outline" onClick={loadMore} disabled={loadingMore}>
+            {loadingMore ? "Loading..." : "Load more"}
+          </Button>
+        </div>
+      )}
     </div>
   );
 };